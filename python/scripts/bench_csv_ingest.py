@@ -0,0 +1,91 @@
+"""Benchmark panel CSV ingest: legacy inference read vs explicit-schema read.
+
+"legacy" is the previous ``read_panel`` (all columns, type inference, generic
+datetime parsing); "typed" is the current one with each available engine.
+The synthetic panel mimics the bundled file (Date,Ticker,Name,OHLC).
+
+Example:
+    python -m scripts.bench_csv_ingest --panel_csv ../kospi_top20_ohlc_5y.csv --synthetic_rows 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ta_tf.csv_ingest import detect_encoding, resolve_engine
+from ta_tf.data_provider import PanelCsvProvider
+
+
+def _legacy_read(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, encoding=detect_encoding(path))
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["Ticker"] = df["Ticker"].astype(str).str.strip()
+    return df
+
+
+def write_synthetic_panel(path: Path, n_rows: int, n_tickers: int = 500, seed: int = 0, chunk_rows: int = 1_000_000) -> None:
+    rng = np.random.default_rng(seed)
+    n_days = -(-int(n_rows) // int(n_tickers))
+    dates = pd.bdate_range("1990-01-01", periods=n_days).strftime("%Y-%m-%d").to_numpy()
+    tickers = np.array([str(100000 + 7 * i) for i in range(n_tickers)])
+    with open(path, "w", encoding="cp949", newline="") as f:
+        f.write("Date,Ticker,Name,Open,High,Low,Close\n")
+        for lo in range(0, int(n_rows), chunk_rows):
+            idx = np.arange(lo, min(int(n_rows), lo + chunk_rows))
+            close = np.round(rng.lognormal(10.0, 1.0, len(idx)), -1)
+            df = pd.DataFrame(
+                {
+                    "Date": dates[idx // n_tickers],
+                    "Ticker": tickers[idx % n_tickers],
+                    "Name": "종목",
+                    "Open": close,
+                    "High": close + 10,
+                    "Low": close - 10,
+                    "Close": close,
+                }
+            )
+            df.to_csv(f, header=False, index=False)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(path: Path, repeat: int) -> None:
+    engines = ["c"] + (["pyarrow"] if resolve_engine("auto") == "pyarrow" else [])
+    base = _time(lambda: _legacy_read(path), repeat)
+    print(f"{path.name}: legacy {base:.3f}s")
+    for eng in engines:
+        t = _time(lambda: PanelCsvProvider.read_panel(path, engine=eng), repeat)
+        print(f"{path.name}: typed[{eng}] {t:.3f}s  ({base / t:.2f}x)")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--synthetic_rows", type=int, default=10_000_000, help="0 skips the synthetic panel.")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    if args.panel_csv:
+        bench(Path(args.panel_csv), args.repeat)
+    if args.synthetic_rows > 0:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / f"synthetic_panel_{args.synthetic_rows}.csv"
+            write_synthetic_panel(path, args.synthetic_rows)
+            bench(path, max(1, args.repeat // 3))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,6 @@ import argparse
 import json
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 
 
@@ -70,6 +69,7 @@ def main():
     from ta_tf.data_manager import OhlcvDataManager
     from ta_tf.trader import TickerTraderStep1
     from ta_tf.backtest import run_yfinance
+    from ta_tf.parity import curve_errors
 
     strat_cfg = StrategyConfig()
     if args.opt_xlsx:
@@ -117,20 +117,12 @@ def main():
     refn = refa / refa.iloc[0]
     simn = sima / sima.iloc[0]
 
-    diff = simn - refn
-    rmse = float(np.sqrt(np.mean(diff**2)))
-    mae = float(np.mean(np.abs(diff)))
-    max_abs = float(np.max(np.abs(diff)))
-
-    corr = float("nan")
-    if len(idx) > 2:
-        corr = float(np.corrcoef(refn.values, simn.values)[0, 1])
-
+    err = curve_errors(sim["Equity"], ref["Equity"])
     print(f"Aligned points: {len(idx)}")
-    print(f"RMSE: {rmse:.6f}")
-    print(f"MAE: {mae:.6f}")
-    print(f"MaxAbs: {max_abs:.6f}")
-    print(f"Corr: {corr:.6f}")
+    print(f"RMSE: {err['RMSE']:.6f}")
+    print(f"MAE: {err['MAE']:.6f}")
+    print(f"MaxAbs: {err['MaxAbs']:.6f}")
+    print(f"Corr: {err['Corr']:.6f}")
 
     if args.plot:
         import matplotlib.pyplot as plt
@@ -0,0 +1,95 @@
+"""Re-score one Step-1 strategy under a grid of cost assumptions.
+
+The signal path is simulated once; every cost scenario is an accounting-only
+replay of the recorded tape (see ta_tf.replay).
+
+Example:
+    python -m scripts.cost_sweep \
+      --panel_csv ../kospi_top20_ohlc_5y.csv --symbol 005930.KS \
+      --params outputs_opt_2020_2024/best_params.json \
+      --start 2022-01-01 --end 2024-12-31 \
+      --stt_rates 0.0015,0.0018,0.0020,0.0023 --borrow_rates 0.02,0.04,0.08
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ta_tf.config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from ta_tf.data_manager import OhlcvDataManager
+from ta_tf.data_provider import CsvProvider, PanelCsvProvider
+from ta_tf.replay import record_tape, sweep_costs
+from ta_tf.universe import load_params_file
+
+
+def _floats(s: str) -> list[float]:
+    return [float(x) for x in s.split(",") if x.strip()]
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--csv", type=str, default=None)
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--params", type=str, default=None, help="StrategyConfig JSON.")
+    p.add_argument("--start", type=str, default=None)
+    p.add_argument("--end", type=str, default=None)
+    p.add_argument("--dd_penalty", type=float, default=0.50)
+
+    # cost grid (cartesian product)
+    p.add_argument("--stt_rates", type=str, default="0.0018")
+    p.add_argument("--commission_rates", type=str, default="0.0")
+    p.add_argument("--borrow_rates", type=str, default="0.04")
+    p.add_argument("--short_borrow_day_count", type=int, default=365)
+    p.add_argument("--accounting", type=str, default="FLOAT", choices=["FLOAT", "KRW"], help="KRW: integer-won cash with exchange rounding.")
+    p.add_argument("--out", type=str, default="outputs_cost_sweep")
+    args = p.parse_args()
+
+    if args.panel_csv:
+        frame = PanelCsvProvider().fetch(args.panel_csv, args.symbol)
+    elif args.csv:
+        frame = CsvProvider().fetch(csv_path=args.csv, symbol=args.symbol)
+    else:
+        raise SystemExit("Provide --panel_csv or --csv.")
+
+    strat_cfg = load_params_file(args.params) if args.params else StrategyConfig()
+    if isinstance(strat_cfg, dict):
+        raise SystemExit("--params must hold a single StrategyConfig.")
+
+    grid = [
+        CostConfig(stt_rate=s, commission_rate=c, short_borrow_annual_rate=b, short_borrow_day_count=int(args.short_borrow_day_count))
+        for s, c, b in itertools.product(_floats(args.stt_rates), _floats(args.commission_rates), _floats(args.borrow_rates))
+    ]
+
+    dm = OhlcvDataManager(frame, IndicatorConfig())
+    bt_cfg = BacktestConfig(
+        symbol=frame.symbol, initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0, accounting=args.accounting
+    )
+
+    t0 = time.perf_counter()
+    tape = record_tape(dm, strat_cfg, grid[0], bt_cfg)
+    t1 = time.perf_counter()
+    start_dt = pd.to_datetime(args.start) if args.start else None
+    end_dt = pd.to_datetime(args.end) if args.end else None
+    if (start_dt is None) != (end_dt is None):
+        raise SystemExit("Provide both --start and --end, or neither.")
+    table = sweep_costs(tape, grid, start_dt, end_dt, dd_penalty=float(args.dd_penalty))
+    t2 = time.perf_counter()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"cost_sweep_{args.symbol.replace('.', '_')}.csv"
+    table.to_csv(out_path, index=False, encoding="utf-8")
+
+    print(table.to_string(index=False))
+    print(f"signal pass {t1 - t0:.3f}s; {len(grid)} cost scenarios in {t2 - t1:.3f}s")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Nightly incremental Step-1 update from a snapshot.
+
+First run (no snapshot yet): full backtest over the available history, then
+write the snapshot. Later runs: load the snapshot, append only bars newer than
+the last processed one, step them and rewrite the snapshot and equity curve.
+``--plan`` also writes the next-bar action plan (target, stop levels) for
+pre-staging orders before the open.
+
+Example:
+    python -m scripts.incremental_update \
+      --panel_csv kospi_top100_ohlc_30y.csv --symbol 005930.KS \
+      --params outputs_opt_2020_2024/best_params.json \
+      --snapshot state/005930.json.gz --out outputs_live
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ta_tf.config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from ta_tf.data_manager import OhlcvDataManager
+from ta_tf.data_provider import CsvProvider, PanelCsvProvider
+from ta_tf.next_bar import plan_next_bar
+from ta_tf.snapshot import load_snapshot, resume, save_snapshot
+from ta_tf.trader import TickerTraderStep1
+from ta_tf.universe import load_params_file
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--snapshot", type=str, required=True, help="Snapshot file (.json.gz); created if missing.")
+    p.add_argument("--params", type=str, default=None, help="StrategyConfig JSON (only used when creating the snapshot).")
+    p.add_argument("--start", type=str, default=None, help="History start for the initial full run.")
+    p.add_argument("--csv", type=str, default=None)
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--plan", action="store_true", help="Write the next-bar action plan JSON.")
+    p.add_argument("--out", type=str, default="outputs_incremental")
+    args = p.parse_args()
+
+    if args.panel_csv:
+        frame = PanelCsvProvider().fetch(args.panel_csv, args.symbol, start=args.start)
+    elif args.csv:
+        frame = CsvProvider().fetch(csv_path=args.csv, symbol=args.symbol)
+    else:
+        raise SystemExit("Provide --panel_csv or --csv.")
+
+    snap = Path(args.snapshot)
+    t0 = time.perf_counter()
+    if snap.exists():
+        trader = load_snapshot(snap)
+        n_new = resume(trader, frame.df)
+        mode = "incremental"
+    else:
+        strat_cfg = load_params_file(args.params) if args.params else StrategyConfig()
+        if isinstance(strat_cfg, dict):
+            raise SystemExit("--params must hold a single StrategyConfig.")
+        dm = OhlcvDataManager(frame, IndicatorConfig())
+        bt_cfg = BacktestConfig(symbol=frame.symbol, initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0)
+        trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=CostConfig(stt_rate=float(args.stt_rate)), bt_cfg=bt_cfg)
+        trader.run_full_backtest()
+        n_new = len(trader.equity_curve)
+        mode = "full"
+    save_snapshot(snap, trader)
+    dt = time.perf_counter() - t0
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    eq = pd.DataFrame(trader.equity_curve, columns=["Date", "Equity"]).set_index("Date")
+    eq_path = out_dir / f"equity_{args.symbol.replace('.', '_')}.csv"
+    eq.to_csv(eq_path, encoding="utf-8")
+
+    last = eq.index[-1] if len(eq) else None
+    print(f"{mode}: {n_new} bars processed in {dt * 1e3:.1f} ms; last bar {last}; equity {trader.equity:.6f}")
+    print("Saved:", eq_path, "and", snap)
+
+    if args.plan:
+        plan = plan_next_bar(trader)
+        plan_path = out_dir / f"plan_{args.symbol.replace('.', '_')}.json"
+        plan_path.write_text(json.dumps(plan.to_dict(), indent=2), encoding="utf-8")
+        print(f"Next bar after {plan.after}: pos {plan.pos} -> target {plan.target}; saved {plan_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Offline live-loop run: replay bars over a localhost socket into the asyncio runner.
+
+Bars before ``--live_from`` are the history the traders start from; later
+bars are streamed by a local replay server at ``--speed`` x real time (0: as
+fast as possible) and consumed by ``LiveRunner``, which stages order intents
+on a simulated broker. Prints throughput and stage latencies, writes the
+intents; ``--metrics`` exports telemetry snapshots (JSON + Prometheus text)
+every ``--metrics_interval_s`` while running.
+
+Example:
+    python -m scripts.live_replay --csv ../005930_intraday_2h_20251101_20260101.csv \
+      --symbol 005930.KS --live_from 2025-12-01 --speed 1000 --max_gap_s 7200 \
+      --metrics outputs_live/metrics
+
+    python -m scripts.live_replay --panel_csv ../kospi_top20_ohlc_5y.csv \
+      --live_from 2025-01-01 --params a.json --params b.json --broker_latency_ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ta_tf.config import CostConfig, IndicatorConfig, StrategyConfig
+from ta_tf.data_provider import CsvProvider, PanelCsvProvider
+from ta_tf.fanout import FanoutHost
+from ta_tf.live import LiveRunner, SimulatedBroker, read_feed, replay_bars, serve_replay
+from ta_tf.telemetry import TelemetryExporter
+from ta_tf.universe import load_params_file
+
+
+async def _run(args, host: FanoutHost, bars) -> tuple[LiveRunner, SimulatedBroker, float]:
+    server = await serve_replay(bars, port=int(args.port), speed=float(args.speed), max_gap_s=args.max_gap_s)
+    port = server.sockets[0].getsockname()[1]
+    broker = SimulatedBroker(latency_s=float(args.broker_latency_ms) / 1e3)
+    runner = LiveRunner(host, broker, broker_tasks=int(args.broker_tasks))
+    exporter = None
+    if args.metrics:
+        exporter = TelemetryExporter(
+            runner.telemetry,
+            json_path=f"{args.metrics}.json",
+            prom_path=f"{args.metrics}.prom",
+            interval_s=float(args.metrics_interval_s),
+        )
+    t0 = time.perf_counter()
+    async with server:
+        await runner.run(read_feed("127.0.0.1", port), exporter=exporter)
+    return runner, broker, time.perf_counter() - t0
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv", type=str, default=None, help="Single-symbol OHLCV CSV (e.g. 005930_intraday_2h_*.csv).")
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--symbols", type=str, default=None, help="Comma-separated panel subset.")
+    p.add_argument("--live_from", type=str, required=True, help="First streamed bar; earlier bars are history.")
+    p.add_argument("--params", type=str, action="append", default=None, help="StrategyConfig JSON; repeat for fan-out variants.")
+    p.add_argument("--speed", type=float, default=0.0, help="x real time (0: as fast as possible).")
+    p.add_argument("--max_gap_s", type=float, default=None, help="Cap on the simulated gap between bars (seconds).")
+    p.add_argument("--port", type=int, default=0)
+    p.add_argument("--broker_latency_ms", type=float, default=0.0)
+    p.add_argument("--broker_tasks", type=int, default=4)
+    p.add_argument("--metrics", type=str, default=None, help="Telemetry path prefix (writes <prefix>.json and <prefix>.prom).")
+    p.add_argument("--metrics_interval_s", type=float, default=5.0)
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--out", type=str, default="outputs_live")
+    args = p.parse_args()
+
+    if args.csv:
+        frames = {args.symbol: CsvProvider().fetch(args.csv, args.symbol)}
+    elif args.panel_csv:
+        symbols = [x.strip() for x in args.symbols.split(",")] if args.symbols else None
+        frames = PanelCsvProvider().fetch_all(args.panel_csv, symbols=symbols)
+    else:
+        raise SystemExit("Provide --csv or --panel_csv.")
+
+    variants: dict[str, object] = {}
+    for path in args.params or []:
+        variants[Path(path).stem] = load_params_file(path)
+    if not variants:
+        variants["default"] = StrategyConfig()
+
+    live_from = pd.Timestamp(args.live_from)
+    host = FanoutHost(IndicatorConfig(), CostConfig(stt_rate=float(args.stt_rate)))
+    live = []
+    for sym, fr in frames.items():
+        idx = fr.df.index
+        cut = int(idx.searchsorted(live_from.tz_localize(idx.tz) if idx.tz is not None else live_from))
+        if cut < 3:
+            continue
+        host.add_symbol(dataclasses.replace(fr, df=fr.df.iloc[:cut]))
+        for name, cfg in variants.items():
+            if isinstance(cfg, dict):
+                cfg = cfg.get(sym) or cfg.get(sym.lstrip("0"))
+                if cfg is None:
+                    continue
+            host.attach(sym, name, cfg)
+        live.append(dataclasses.replace(fr, df=fr.df.iloc[cut:]))
+    bars = replay_bars(live)
+    if not bars:
+        raise SystemExit("No bars at or after --live_from.")
+
+    runner, broker, wall = asyncio.run(_run(args, host, bars))
+
+    gaps = np.diff(np.array([b.timestamp.value for b in bars], dtype=np.int64)) / 1e9
+    span = float(np.minimum(gaps, args.max_gap_s).sum() if args.max_gap_s is not None else gaps.sum())
+    snap = runner.telemetry.snapshot()
+    c = snap["counters"]
+    print(f"bars {c['bars']} (skipped {c['skipped_bars']})  trades {c['trades']} (stops {c['stops']})  intents {c['intents']} (broker errors {c['broker_errors']})  wall {wall:.2f}s  ({c['bars'] / max(wall, 1e-9):.0f} bars/s)")
+    if args.speed > 0 and wall > 0:
+        print(f"simulated span {span:.0f}s -> {span / wall:.0f}x real time")
+    for stage, h in snap["latency_us"].items():
+        if not h["count"]:
+            print(f"  {stage:<11} n {0:>6}")
+            continue
+        print(f"  {stage:<11} n {h['count']:>6}  p50 {h['p50']:>9.0f}us  p99 {h['p99']:>9.0f}us  max {h['max']:>9.0f}us")
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows = [
+        {
+            "after": it.after,
+            "symbol": it.symbol,
+            "strategy": it.strategy,
+            "kind": it.kind,
+            "side": it.side,
+            "from_pos": it.from_pos,
+            "target_pos": it.target_pos,
+            "ack_us": lat * 1e6,
+        }
+        for it, lat in broker.acked
+    ]
+    pd.DataFrame(rows).to_csv(out_dir / "intents.csv", index=False, encoding="utf-8")
+    host.summary().to_csv(out_dir / "traders.csv", index=False, encoding="utf-8")
+    print("Saved:", out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Maintain the local SQLite market-data store.
+
+Examples:
+    # initial bulk load from the panel CSV
+    python -m scripts.market_db load --db data/market.db --panel_csv ../kospi_top20_ohlc_5y.csv
+
+    # daily append: upsert just the new rows (same panel layout); re-running is harmless
+    python -m scripts.market_db load --db data/market.db --panel_csv today.csv
+
+    python -m scripts.market_db info --db data/market.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from ta_tf.local_db import LocalDbProvider
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    sub = p.add_subparsers(dest="cmd", required=True)
+    ld = sub.add_parser("load", help="Upsert rows of a panel CSV (Date,Ticker,Open,High,Low,Close,[Volume]).")
+    ld.add_argument("--db", type=str, required=True)
+    ld.add_argument("--panel_csv", type=str, required=True)
+    ld.add_argument("--batch_rows", type=int, default=50_000)
+    info = sub.add_parser("info", help="List tickers with their bar count and date range.")
+    info.add_argument("--db", type=str, required=True)
+    args = p.parse_args()
+
+    db = LocalDbProvider(args.db)
+    if args.cmd == "load":
+        t0 = time.perf_counter()
+        n = db.load_panel_csv(args.panel_csv, batch_rows=args.batch_rows)
+        print(f"Upserted {n} rows into {args.db} in {time.perf_counter() - t0:.2f}s")
+        return
+
+    for ticker in db.tickers():
+        df = db.fetch(ticker).df
+        print(f"{ticker:>8}  {len(df):6d} bars  {df.index[0].date()} .. {df.index[-1].date()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,27 @@ This script is intentionally simple and self-contained:
 - loads OHLC data (panel CSV recommended; yfinance optional)
 - runs a small random-search over a hand-picked parameter grid
 - scores each run on the TRAIN window only (warmup data is used for indicators)
-- writes results to CSV and the best params to JSON
+- streams one row per evaluation to a single results file (CSV or Parquet)
+- keeps equity/trade CSVs only for the top-K configs, and the best params in JSON
+
+--sample_indicators also samples IndicatorConfig windows; indicator columns
+come from a shared IndicatorBank (prefix sums + per-span EMA cache), so a new
+window combination reuses cached columns instead of recomputing every
+rolling mean and EMA.
+
+With --queue, configs are evaluated by `scripts.sweep_worker` processes on any
+host that can reach the queue (shared SQLite file or TCP broker).
+
+Re-running with --resume continues from the rows already in the results file
+(same seed => the same config sequence; --n_evals may be raised).
+
+--halving_eta N switches to successive halving (ta_tf.halving): all configs
+are scored on the first --halving_min_days of the train window, the best 1/N
+are promoted to an N-times longer window, and only the finalists run on the
+full span (--hyperband adds brackets that start at longer windows). Lower
+rungs start flat at train_start (indicators still warm up on the history
+before it); the finalists' scores are the regular ones. Every rung is recorded
+in halving_rungs.csv.
 
 Example (panel CSV):
     python -m scripts.optimize_2020_2024_single \
@@ -16,11 +36,21 @@ Example (yfinance daily):
     python -m scripts.optimize_2020_2024_single \
       --symbol 005930.KS --train_start 2020-01-01 --train_end 2024-12-31 \
       --n_evals 400 --out outputs_opt_2020_2024 --use_yfinance
+
+Example (successive halving, 2430 configs for the bars of ~700 full runs):
+    python -m scripts.optimize_2020_2024_single \
+      --panel_csv kospi_top100_ohlc_30y.csv --n_evals 2430 --halving_eta 3
+
+Example (long run, Parquet summary, resumable):
+    python -m scripts.optimize_2020_2024_single \
+      --panel_csv kospi_top100_ohlc_30y.csv --n_evals 100000 \
+      --results_format parquet --top_k 20 --resume
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import random
 from dataclasses import asdict, replace
@@ -30,7 +60,13 @@ import pandas as pd
 
 from ta_tf.config import CostConfig, IndicatorConfig, StrategyConfig
 from ta_tf.data_provider import PanelCsvProvider, YfinanceProvider, OhlcvFrame
-from ta_tf.backtest import _run_core
+from ta_tf.artifacts import ResultsWriter, TopK, load_results
+from ta_tf.backtest import run_step1_on, write_step1_outputs
+from ta_tf.data_manager import OhlcvDataManager
+from ta_tf.halving import batch_evaluator, hyperband, rung_ends, successive_halving
+from ta_tf.indicator_bank import IndicatorBank
+from ta_tf.indicator_plan import plan_indicators, warmup_days
+from ta_tf.jobqueue import distributed_evaluate, make_item, open_queue, sweep_context
 from ta_tf.metrics import cagr, max_drawdown
 
 
@@ -42,13 +78,6 @@ def _warmup_start(train_start: pd.Timestamp, warmup_days: int) -> pd.Timestamp:
     return (train_start - pd.Timedelta(days=int(warmup_days))).tz_localize(None)
 
 
-def _score(eq: pd.Series, dd_penalty: float) -> tuple[float, float, float]:
-    g = cagr(eq)
-    mdd = max_drawdown(eq)
-    score = float(g) - float(dd_penalty) * float(mdd)
-    return score, float(g), float(mdd)
-
-
 def _sample_params(rng: random.Random) -> StrategyConfig:
     """Sample one StrategyConfig from a small grid.
 
@@ -124,6 +153,29 @@ def _sample_params(rng: random.Random) -> StrategyConfig:
     return cfg
 
 
+# Indicator windows sampled by --sample_indicators (sampling order = field order).
+_INDICATOR_CHOICES = {
+    "sma_week": [3, 5, 7, 10],
+    "sma_fast": [15, 20, 25, 30],
+    "sma_slow": [40, 50, 60],
+    "sma_long_term": [120, 180, 240],
+    "long_trend_lookback": [10, 20, 40],
+    "atr_window": [10, 14, 20],
+    "macd_fast": [8, 12],
+    "macd_slow": [21, 26, 34],
+    "macd_signal": [7, 9],
+}
+
+
+def _sample_indicators(rng: random.Random) -> IndicatorConfig:
+    """Sample indicator windows around the MATLAB defaults (5/20/40/180, MACD 12/26/9)."""
+    cfg = IndicatorConfig(**{k: int(rng.choice(v)) for k, v in _INDICATOR_CHOICES.items()})
+    # Keep the MA stack ordered (week < fast < slow).
+    if not (cfg.sma_week < cfg.sma_fast < cfg.sma_slow):
+        cfg = replace(cfg, sma_fast=IndicatorConfig().sma_fast, sma_slow=IndicatorConfig().sma_slow)
+    return cfg
+
+
 def _load_frame(args) -> OhlcvFrame:
     if args.use_yfinance:
         prov = YfinanceProvider()
@@ -135,16 +187,106 @@ def _load_frame(args) -> OhlcvFrame:
     return prov.fetch(args.panel_csv, args.symbol, start=args.fetch_start, end=args.train_end)
 
 
+def _run_halving(args, frame, dm, cost_cfg, train_start, train_end, rng, queue, writer, top, configs) -> None:
+    """Successive halving / Hyperband over sampled configs; fills ``top`` and ``configs``."""
+    if queue is not None:
+
+        def evaluate(cfgs, end, flat_start):
+            context = sweep_context(
+                frame.symbol, args.train_start, end.strftime("%Y-%m-%d"), cost_cfg, float(args.dd_penalty),
+                panel_csv=str(Path(args.panel_csv).resolve()), fetch_start=args.fetch_start, flat_start=flat_start,
+            )
+            got = distributed_evaluate(queue, context, [make_item(c) for c in cfgs], batch_size=int(args.queue_batch))
+            return [(r["score"], r["cagr"], r["max_dd"]) for r in got]
+
+    else:
+        evaluate = batch_evaluator(dm, cost_cfg, train_start, dd_penalty=float(args.dd_penalty))
+
+    eta = int(args.halving_eta)
+    ends = rung_ends(dm.df.index, train_start, train_end, eta=eta, min_span_days=int(args.halving_min_days))
+    print("Rung windows:", ", ".join(f"{args.train_start}~{e:%Y-%m-%d}" for e in ends))
+    if args.hyperband:
+        n_base = sum(len(ends) / (s + 1) * eta**s for s in range(len(ends)))
+        sampled, res = hyperband(
+            dm, lambda: _sample_params(rng), evaluate, train_start, ends, eta=eta, n_scale=int(args.n_evals) / n_base
+        )
+    else:
+        sampled = [_sample_params(rng) for _ in range(int(args.n_evals))]
+        res = successive_halving(dm, sampled, evaluate, train_start, ends, eta=eta)
+
+    res.records.to_csv(Path(args.out) / "halving_rungs.csv", index=False, encoding="utf-8")
+    # one results row per config, at the longest window it reached
+    last = res.records.sort_values(["config_id", "rung"], kind="mergesort").groupby("config_id", sort=True).tail(1)
+    for rec in last.itertuples(index=False):
+        row = {"eval_id": int(rec.config_id)}
+        row.update(asdict(sampled[rec.config_id]))
+        row.update({"score": rec.score, "cagr": rec.cagr, "max_dd": rec.max_dd, "rung": int(rec.rung), "rung_end": str(rec.rung_end.date())})
+        writer.append(row)
+    for sc, k in res.finalists:
+        if top.push(sc, k, None):
+            configs[k] = (sampled[k], IndicatorConfig())
+
+    n_full = len(sampled) * int(dm.window(None, train_end).stop)
+    print(f"Evaluated {len(sampled)} configs, {len(res.finalists)} on the full window")
+    print(f"Bars simulated: {res.bars_simulated} ({n_full / max(1, res.bars_simulated):.2f}x fewer than full-window runs)")
+    if res.best() is not None:
+        print(f"best_score={res.best()[0]:.6f}")
+
+
+def _write_top_k(top, configs, dm_for, cost_cfg, train_start, train_end, out_dir: Path, sample_indicators: bool) -> None:
+    """Full artifacts for the top-K only (re-run: the engine is deterministic)."""
+    ranked = top.best()
+    rows = []
+    for rank, (sc, k, _) in enumerate(ranked, start=1):
+        cfg, k_ind = configs[k]
+        res = run_step1_on(dm_for(k_ind), cfg, cost_cfg, start_dt=train_start, end_dt=train_end)
+        write_step1_outputs(res, out_dir / "top_k" / f"rank_{rank:03d}_eval_{k:05d}")
+        row = {"rank": rank, "eval_id": k, "score": sc}
+        row.update(asdict(cfg))
+        if sample_indicators:
+            row.update({f"ind_{key}": v for key, v in asdict(k_ind).items()})
+        rows.append(row)
+    if rows:
+        pd.DataFrame(rows).to_csv(out_dir / "top_k.csv", index=False, encoding="utf-8")
+        best_score, best_k, _ = ranked[0]
+        best_cfg, best_ind = configs[best_k]
+        (out_dir / "best_params.json").write_text(json.dumps(asdict(best_cfg), indent=2), encoding="utf-8")
+        if sample_indicators:
+            (out_dir / "best_indicators.json").write_text(json.dumps(asdict(best_ind), indent=2), encoding="utf-8")
+        (out_dir / "best_score.txt").write_text(f"{best_score}\n", encoding="utf-8")
+        print("Best params saved to:", out_dir / "best_params.json")
+        print(f"Top-{len(rows)} artifacts under:", out_dir / "top_k")
+        print("Best score (train):", best_score)
+
+
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument("--symbol", type=str, default="005930.KS")
     p.add_argument("--train_start", type=str, default="2020-01-01")
     p.add_argument("--train_end", type=str, default="2024-12-31")
-    p.add_argument("--warmup_days", type=int, default=900, help="Days of warmup history before train_start.")
+    p.add_argument("--warmup_days", type=int, default=None, help="Days of warmup history before train_start (default: what the widest indicator setup needs).")
     p.add_argument("--n_evals", type=int, default=800)
     p.add_argument("--seed", type=int, default=7)
     p.add_argument("--dd_penalty", type=float, default=0.50)
     p.add_argument("--out", type=str, default="outputs_opt_2020_2024")
+    p.add_argument("--sample_indicators", action="store_true", help="Sample IndicatorConfig jointly with StrategyConfig.")
+
+    # artifact policy
+    p.add_argument("--top_k", type=int, default=10, help="Write equity/trade CSVs for the K best configs.")
+    p.add_argument("--results_format", type=str, default="csv", choices=["csv", "parquet"])
+    p.add_argument("--flush_rows", type=int, default=256, help="Rows per chunk handed to the writer thread.")
+    p.add_argument("--save_all_evals", action="store_true", help="Also write eval_XXXXX/ CSVs for every evaluation.")
+    p.add_argument("--resume", action="store_true", help="Continue from an existing results file in --out.")
+
+    # distributed evaluation (see scripts.sweep_worker)
+    p.add_argument("--queue", type=str, default=None, help="Job queue: sqlite:PATH (shared volume) or tcp://HOST:PORT (broker).")
+    p.add_argument("--queue_block", type=int, default=1024, help="Configs submitted per round trip.")
+    p.add_argument("--queue_batch", type=int, default=32, help="Configs per job claimed by a worker.")
+
+    # multi-fidelity scheduling (see ta_tf.halving)
+    p.add_argument("--halving_eta", type=int, default=0, help="Successive halving: keep 1/eta per rung (0 = off).")
+    p.add_argument("--halving_min_days", type=int, default=365, help="Window of the first rung (days from train_start).")
+    p.add_argument("--hyperband", action="store_true", help="Run Hyperband brackets (n_evals scales the brackets).")
 
     # data source
     p.add_argument("--panel_csv", type=str, default=None, help="Panel OHLC CSV (Date,Ticker,Open,High,Low,Close,...)")
@@ -157,10 +299,20 @@ def main() -> None:
     p.add_argument("--short_borrow_day_count", type=int, default=365)
 
     args = p.parse_args()
+    # flag conflicts first: nothing in --out is touched before these pass
+    if args.queue and (args.save_all_evals or args.use_yfinance):
+        raise SystemExit("--queue needs --panel_csv and does not support --save_all_evals.")
+    if args.halving_eta and (args.sample_indicators or args.resume or args.save_all_evals):
+        raise SystemExit("--halving_eta does not support --sample_indicators, --resume or --save_all_evals.")
 
     train_start = _parse_date(args.train_start)
     train_end = _parse_date(args.train_end)
-    fetch_start = _warmup_start(train_start, args.warmup_days)
+    days = args.warmup_days
+    if days is None:
+        # sampled configs may switch on any indicator group (and widest windows)
+        widest = IndicatorConfig(**{k: max(v) for k, v in _INDICATOR_CHOICES.items()}) if args.sample_indicators else IndicatorConfig()
+        days = warmup_days(plan_indicators(widest).warmup_bars)
+    fetch_start = _warmup_start(train_start, days)
     args.fetch_start = fetch_start.strftime("%Y-%m-%d")
 
     out_dir = Path(args.out)
@@ -176,13 +328,15 @@ def main() -> None:
     )
 
     frame = _load_frame(args)
+    if args.sample_indicators:
+        # one data manager per distinct window combination, built from shared columns
+        dm_for = functools.lru_cache(maxsize=128)(IndicatorBank(frame).dm_for)
+    else:
+        dm = OhlcvDataManager(frame, ind_cfg)
+        dm_for = lambda _cfg: dm  # noqa: E731
 
     rng = random.Random(int(args.seed))
 
-    results = []
-    best = None
-    best_score = -1e99
-
     # metadata
     meta = {
         "symbol": args.symbol,
@@ -195,48 +349,97 @@ def main() -> None:
         "data_source": "yfinance" if args.use_yfinance else "panel_csv",
         "panel_csv": args.panel_csv,
         "cost_cfg": asdict(cost_cfg),
+        "sample_indicators": bool(args.sample_indicators),
+        "halving_eta": int(args.halving_eta),
+        "hyperband": bool(args.hyperband),
     }
-    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
-
-    # run
-    for k in range(int(args.n_evals)):
-        strat_cfg = _sample_params(rng)
-        eval_dir = out_dir / f"eval_{k:05d}"
-        paths = _run_core(
-            frame=frame,
-            output_dir=eval_dir,
-            ind_cfg=ind_cfg,
-            strat_cfg=strat_cfg,
-            cost_cfg=cost_cfg,
-            start_dt=train_start,
-            end_dt=train_end,
+    results_path = out_dir / f"opt_results.{args.results_format}"
+    meta_path = out_dir / "meta.json"
+
+    top = TopK(int(args.top_k))
+    n_done = 0
+    if args.resume and results_path.exists():
+        old_meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        for key in ("symbol", "train_start", "train_end", "fetch_start", "seed", "dd_penalty", "cost_cfg", "sample_indicators"):
+            if key in old_meta and old_meta[key] != meta[key]:
+                hint = " (the trader runs through the warmup: pass the original --warmup_days)" if key == "fetch_start" else ""
+                raise SystemExit(f"--resume: '{key}' differs from {meta_path} ({old_meta[key]!r} != {meta[key]!r}){hint}")
+        prev = load_results(results_path)
+        n_done = int(prev["eval_id"].max()) + 1 if len(prev) else 0
+        for rec in prev.itertuples(index=False):
+            top.push(float(rec.score), int(rec.eval_id), None)
+        print(f"Resuming after {n_done} evals from {results_path}")
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    configs: dict[int, tuple[StrategyConfig, IndicatorConfig]] = {}  # configs of the current top-K only
+    resumed_top = {e for _, e, _ in top.best()}
+    n_evals = int(args.n_evals)
+    writer = ResultsWriter(results_path, chunk_rows=int(args.flush_rows), resume=bool(args.resume))
+    queue = open_queue(args.queue) if args.queue else None
+    if queue is not None:
+        context = sweep_context(
+            frame.symbol, args.train_start, args.train_end, cost_cfg, float(args.dd_penalty),
+            panel_csv=str(Path(args.panel_csv).resolve()) if args.panel_csv else None, fetch_start=args.fetch_start,
         )
-        eq = pd.read_csv(paths["equity"], parse_dates=["Date"]).set_index("Date")["Equity"]
-        sc, g, mdd = _score(eq, dd_penalty=float(args.dd_penalty))
-
-        row = strat_cfg.__dict__.copy()
-        row.update({"score": sc, "cagr": g, "max_dd": mdd, "final_equity": float(eq.iloc[-1]) if len(eq) else float("nan")})
-        results.append(row)
-
-        if sc > best_score:
-            best_score = sc
-            best = strat_cfg
-            # write best-so-far
-            (out_dir / "best_params.json").write_text(json.dumps(best.__dict__, indent=2), encoding="utf-8")
-            (out_dir / "best_score.txt").write_text(f"{best_score}\n", encoding="utf-8")
-
-        if (k + 1) % max(1, int(args.n_evals) // 20) == 0:
-            print(f"[{k+1}/{args.n_evals}] best_score={best_score:.6f}")
-
-    df = pd.DataFrame(results).sort_values("score", ascending=False)
-    df.to_csv(out_dir / "opt_results.csv", index=False, encoding="utf-8")
-    print(f"Saved: {out_dir / 'opt_results.csv'}")
-    if best is not None:
-        print("Best params saved to:", out_dir / "best_params.json")
-        print("Best final equity (train):", df.iloc[0]["final_equity"])
-        print("Best CAGR (train):", df.iloc[0]["cagr"])
-        print("Best MaxDD (train):", df.iloc[0]["max_dd"])
-
+    if args.halving_eta:
+        _run_halving(args, frame, dm, cost_cfg, train_start, train_end, rng, queue, writer, top, configs)
+        writer.close()
+        print(f"Saved: {results_path}")
+        _write_top_k(top, configs, dm_for, cost_cfg, train_start, train_end, out_dir, args.sample_indicators)
+        return
+
+    block = max(1, int(args.queue_block)) if queue is not None else 1
+    try:
+        for lo in range(0, n_evals, block):
+            todo = []
+            for k in range(lo, min(n_evals, lo + block)):
+                # The sequence is a pure function of the seed: replay it up to the resume point.
+                strat_cfg = _sample_params(rng)
+                k_ind = _sample_indicators(rng) if args.sample_indicators else ind_cfg
+                if k < n_done:
+                    if k in resumed_top:
+                        configs[k] = (strat_cfg, k_ind)
+                    continue
+                todo.append((k, strat_cfg, k_ind))
+            if not todo:
+                continue
+
+            if queue is not None:
+                # remote workers: (cagr, max_dd, final_equity) per config
+                got = distributed_evaluate(queue, context, [make_item(c, i) for _, c, i in todo], batch_size=int(args.queue_batch))
+                outcomes = [(r["cagr"], r["max_dd"], r["final_equity"]) for r in got]
+            else:
+                outcomes = []
+                for k, strat_cfg, k_ind in todo:
+                    res = run_step1_on(dm_for(k_ind), strat_cfg, cost_cfg, start_dt=train_start, end_dt=train_end)
+                    eq = res.equity
+                    if args.save_all_evals:
+                        write_step1_outputs(res, out_dir / f"eval_{k:05d}")
+                    outcomes.append((cagr(eq), max_drawdown(eq), float(eq.iloc[-1]) if len(eq) else float("nan")))
+
+            for (k, strat_cfg, k_ind), (g, mdd, final_eq) in zip(todo, outcomes):
+                sc = float(g) - float(args.dd_penalty) * float(mdd)
+                row = {"eval_id": k}
+                row.update(asdict(strat_cfg))
+                if args.sample_indicators:
+                    row.update({f"ind_{key}": v for key, v in asdict(k_ind).items()})
+                row.update({"score": sc, "cagr": float(g), "max_dd": float(mdd), "final_equity": final_eq})
+                writer.append(row)
+
+                if top.push(sc, k, None):
+                    configs[k] = (strat_cfg, k_ind)
+                    kept = {e for _, e, _ in top.best()}
+                    for e in [e for e in configs if e not in kept]:
+                        del configs[e]
+
+                if (k + 1) % max(1, n_evals // 20) == 0:
+                    best_now = top.best()
+                    print(f"[{k+1}/{n_evals}] best_score={best_now[0][0] if best_now else float('nan'):.6f}")
+    finally:
+        writer.close()
+    print(f"Saved: {results_path}")
+
+    _write_top_k(top, configs, dm_for, cost_cfg, train_start, train_end, out_dir, args.sample_indicators)
 
 if __name__ == "__main__":
     main()
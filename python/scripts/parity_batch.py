@@ -0,0 +1,114 @@
+"""Batch parity check: every row of MATLAB opt_results_*.xlsx vs the Python port.
+
+Each workbook is read once; all ParamsJson rows run in parallel on one cached
+data manager. Writes one table per workbook (MATLAB vs Python TotRet/CAGR/MaxDD/
+trades per row, and curve RMSE/MAE/MaxAbs/Corr where a MATLAB equity curve
+export exists) plus a summary of the errors across rows.
+
+Example:
+  python -m scripts.parity_batch ../new_arch/opt_results_*.xlsx \\
+      --panel_csv ../kospi_top20_ohlc_5y.csv --workers 8
+
+  # with MATLAB curve exports (Time,Data CSVs) per row:
+  python -m scripts.parity_batch ../new_arch/opt_results_samsung_5y_MACD_OFF_portfolio.xlsx \\
+      --panel_csv ../kospi_top20_ohlc_5y.csv --ref_curves "curves/{stem}/eval_{eval}.csv"
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.compare_to_reference import load_reference
+from ta_tf.config import BacktestConfig, CostConfig, IndicatorConfig
+from ta_tf.data_manager import OhlcvDataManager
+from ta_tf.data_provider import PanelCsvProvider, YfinanceProvider
+from ta_tf.parity import parity_summary, read_opt_results, run_parity
+
+
+def _ref_curves(template: str | None, xlsx: Path, results: pd.DataFrame) -> dict[int, pd.Series]:
+    """Reference curves keyed by rank; ``{stem}``, ``{rank}`` and ``{eval}`` are filled per row."""
+    if not template:
+        return {}
+    out = {}
+    evals = results["Eval"] if "Eval" in results.columns else results["Rank"]
+    for rank, ev in zip(results["Rank"], evals):
+        path = Path(template.format(stem=xlsx.stem, rank=int(rank), eval=int(ev)))
+        if path.exists():
+            out[int(rank)] = load_reference(str(path))["Equity"]
+    return out
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("xlsx", nargs="+", help="MATLAB optimizer result workbooks (ParamsJson column).")
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--start", type=str, default="2020-01-01")
+    p.add_argument("--end", type=str, default="2024-12-31")
+    p.add_argument("--warmup_days", type=int, default=900)
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--use_yfinance", action="store_true")
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--valuation_mode", type=str, default="CLOSE", help='"CLOSE" or "NEXT_OPEN"')
+    p.add_argument("--ref_curves", type=str, default=None, help="Path template of MATLAB curve CSVs ({stem}, {rank}, {eval}).")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--out", type=str, default="outputs_parity")
+    args = p.parse_args()
+
+    if not args.panel_csv and not args.use_yfinance:
+        raise SystemExit("Provide --panel_csv (recommended) or use --use_yfinance.")
+
+    start_dt = pd.to_datetime(args.start)
+    end_dt = pd.to_datetime(args.end)
+    fetch_start = (start_dt - pd.Timedelta(days=int(args.warmup_days))).strftime("%Y-%m-%d")
+    if args.use_yfinance:
+        frame = YfinanceProvider().fetch(args.symbol, start=fetch_start, end=args.end, interval="1d")
+    else:
+        frame = PanelCsvProvider().fetch(args.panel_csv, args.symbol, start=fetch_start, end=args.end)
+    dm = OhlcvDataManager(frame, IndicatorConfig())
+    cost_cfg = CostConfig(stt_rate=float(args.stt_rate))
+    bt_cfg = BacktestConfig(
+        symbol=frame.symbol,
+        initial_capital=1_000_000_000.0,
+        valuation_mode=str(args.valuation_mode).upper(),
+        initial_equity=1.0,
+    )
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    summaries = []
+    for path in map(Path, args.xlsx):
+        t0 = time.perf_counter()
+        results = read_opt_results(path)
+        table = run_parity(
+            dm,
+            results,
+            cost_cfg,
+            bt_cfg,
+            start_dt,
+            end_dt,
+            ref_curves=_ref_curves(args.ref_curves, path, results),
+            workers=int(args.workers),
+        )
+        dt = time.perf_counter() - t0
+        table.to_csv(out_dir / f"parity_{path.stem}.csv", index=False, encoding="utf-8")
+        summ = parity_summary(table)
+        n_curves = int(table["Aligned"].notna().sum())
+        if n_curves:
+            curve = table[["RMSE", "MAE", "MaxAbs"]].max().to_dict()
+            summ.loc[len(summ)] = {"metric": "curve(worst row)", "N": float(n_curves), **curve, "Corr": table["Corr"].min()}
+        summ.insert(0, "workbook", path.name)
+        summaries.append(summ)
+
+        print(f"\n{path.name}: {len(results)} rows in {dt:.1f}s")
+        print(summ.drop(columns=["workbook"]).to_string(index=False, float_format=lambda x: f"{x:.6f}"))
+
+    pd.concat(summaries, ignore_index=True).to_csv(out_dir / "parity_summary.csv", index=False, encoding="utf-8")
+    print(f"\nSaved: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
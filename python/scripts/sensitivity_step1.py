@@ -0,0 +1,120 @@
+"""Check whether a parameter set sits on a plateau or a spike.
+
+Builds a +-k grid-step neighborhood around `best_params.json`, evaluates it as
+one batch on a shared data manager and writes per-point scores and
+per-parameter gradients.
+
+Example:
+    python -m scripts.sensitivity_step1 \
+      --panel_csv kospi_top100_ohlc_30y.csv --symbol 005930.KS \
+      --params outputs_opt_2020_2024/best_params.json \
+      --start 2020-01-01 --end 2024-12-31 --k 2 --n_joint 200 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ta_tf.config import CostConfig, IndicatorConfig
+from ta_tf.data_manager import OhlcvDataManager
+from ta_tf.data_provider import PanelCsvProvider, YfinanceProvider
+from ta_tf.indicator_plan import plan_indicators, warmup_days
+from ta_tf.sensitivity import neighborhood_sensitivity
+from ta_tf.universe import load_params_file
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--params", type=str, default="outputs_opt_2020_2024/best_params.json")
+    p.add_argument("--start", type=str, default="2020-01-01")
+    p.add_argument("--end", type=str, default="2024-12-31")
+    p.add_argument("--warmup_days", type=int, default=None, help="Days of warmup history before --start (default: what the indicators of the params need).")
+    p.add_argument("--k", type=int, default=1, help="Grid steps on each side of the center value.")
+    p.add_argument("--n_joint", type=int, default=0, help="Extra random joint perturbations.")
+    p.add_argument("--tol", type=float, default=0.02, help="Score tolerance for the robustness ratio.")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument(
+        "--checkpoint_every",
+        type=int,
+        default=0,
+        help="Resume neighbors from checkpoints of the center run (bars between checkpoints; 0 = off, single process).",
+    )
+    p.add_argument("--dd_penalty", type=float, default=0.50)
+    p.add_argument("--out", type=str, default="outputs_sensitivity")
+
+    # data source
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--use_yfinance", action="store_true")
+
+    # costs (should match optimization)
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--commission_rate", type=float, default=0.0)
+    p.add_argument("--short_borrow_annual_rate", type=float, default=0.04)
+    p.add_argument("--short_borrow_day_count", type=int, default=365)
+
+    args = p.parse_args()
+
+    if not args.use_yfinance and not args.panel_csv:
+        raise SystemExit("Provide --panel_csv (recommended) or use --use_yfinance.")
+
+    center = load_params_file(args.params)
+    if isinstance(center, dict):
+        raise SystemExit("--params must hold a single StrategyConfig.")
+
+    start_dt = pd.to_datetime(args.start)
+    end_dt = pd.to_datetime(args.end)
+    days = args.warmup_days if args.warmup_days is not None else warmup_days(plan_indicators(IndicatorConfig(), center).warmup_bars)
+    fetch_start = (start_dt - pd.Timedelta(days=int(days))).strftime("%Y-%m-%d")
+    if args.use_yfinance:
+        frame = YfinanceProvider().fetch(args.symbol, start=fetch_start, end=args.end, interval="1d")
+    else:
+        frame = PanelCsvProvider().fetch(args.panel_csv, args.symbol, start=fetch_start, end=args.end)
+
+    cost_cfg = CostConfig(
+        stt_rate=float(args.stt_rate),
+        commission_rate=float(args.commission_rate),
+        short_borrow_annual_rate=float(args.short_borrow_annual_rate),
+        short_borrow_day_count=int(args.short_borrow_day_count),
+    )
+    dm = OhlcvDataManager(frame, IndicatorConfig())
+
+    t0 = time.perf_counter()
+    rep = neighborhood_sensitivity(
+        dm,
+        center,
+        cost_cfg=cost_cfg,
+        start_dt=start_dt,
+        end_dt=end_dt,
+        dd_penalty=float(args.dd_penalty),
+        k=int(args.k),
+        n_joint=int(args.n_joint),
+        tol=float(args.tol),
+        seed=int(args.seed),
+        workers=int(args.workers),
+        checkpoint_every=int(args.checkpoint_every),
+    )
+    dt = time.perf_counter() - t0
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rep.points.to_csv(out_dir / "sensitivity_points.csv", index=False, encoding="utf-8")
+    rep.gradients.to_csv(out_dir / "sensitivity_gradients.csv", index=False, encoding="utf-8")
+    (out_dir / "sensitivity_summary.json").write_text(
+        json.dumps({"center_score": rep.center_score, "robustness": rep.robustness, "n_points": int(len(rep.points))}, indent=2),
+        encoding="utf-8",
+    )
+
+    print(rep.gradients.to_string(index=False))
+    print(f"Center score: {rep.center_score:.6f}  robustness: {rep.robustness:.3f}  points: {len(rep.points)}  ({dt:.1f}s)")
+    print("Saved outputs to:", out_dir)
+
+
+if __name__ == "__main__":
+    main()
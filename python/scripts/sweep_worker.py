@@ -0,0 +1,74 @@
+"""Worker (and optional broker) for distributed optimizer sweeps.
+
+Workers are stateless: they claim a batch of configs from the queue, run it
+with the in-memory engine and push the scores back. Start as many as you like
+on any host that sees the queue; the panel CSV path in the job must be
+readable there too.
+
+Examples:
+    # shared volume
+    python -m scripts.sweep_worker --queue sqlite:/shared/sweep.db --workers 32
+
+    # TCP broker on one host, workers anywhere
+    python -m scripts.sweep_worker --serve 0.0.0.0:5555
+    python -m scripts.sweep_worker --queue tcp://head-node:5555 --workers 32
+
+    # driver
+    python -m scripts.optimize_2020_2024_single --panel_csv /shared/kospi.csv \
+      --n_evals 100000 --queue tcp://head-node:5555
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import socket
+
+from ta_tf.jobqueue import DEFAULT_MAX_ATTEMPTS, MemoryJobQueue, QueueBroker, open_queue, run_worker
+
+
+def _work(spec: str, worker_id: str, lease_s: float, idle_exit_s: float | None, max_attempts: int) -> None:
+    n = run_worker(open_queue(spec, max_attempts=max_attempts), worker_id, lease_s=lease_s, idle_exit_s=idle_exit_s)
+    print(f"{worker_id}: {n} jobs", flush=True)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--queue", type=str, default=None, help="sqlite:PATH or tcp://HOST:PORT")
+    p.add_argument("--serve", type=str, default=None, help="Run an in-memory broker on HOST:PORT instead.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--lease_s", type=float, default=600.0, help="Seconds before an unfinished job is handed out again.")
+    p.add_argument("--max_attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Claims before a failing job is marked failed.")
+    p.add_argument("--idle_exit_s", type=float, default=None, help="Exit after this long without work (default: never).")
+    args = p.parse_args()
+
+    if args.serve:
+        host, port = args.serve.rsplit(":", 1)
+        broker = QueueBroker(MemoryJobQueue(max_attempts=args.max_attempts), host=host, port=int(port))
+        print("Broker listening on %s:%d" % broker.address, flush=True)
+        try:
+            broker.serve_forever()
+        except KeyboardInterrupt:
+            broker.stop()
+        return
+
+    if not args.queue:
+        raise SystemExit("Provide --queue (or --serve).")
+    tag = f"{socket.gethostname()}:{os.getpid()}"
+    procs = [
+        mp.Process(target=_work, args=(args.queue, f"{tag}/{i}", float(args.lease_s), args.idle_exit_s, int(args.max_attempts)))
+        for i in range(max(1, int(args.workers)))
+    ]
+    for pr in procs:
+        pr.start()
+    try:
+        for pr in procs:
+            pr.join()
+    except KeyboardInterrupt:
+        for pr in procs:
+            pr.terminate()
+
+
+if __name__ == "__main__":
+    main()
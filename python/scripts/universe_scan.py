@@ -0,0 +1,123 @@
+"""Run Step-1 on every ticker of a panel CSV and rank the results.
+
+The panel is read once; tickers are simulated in parallel worker processes,
+or (``--engine cross``) all together in one process by the cross-sectional
+engine, which also writes the equal-sleeve portfolio equity.
+
+Example:
+    python -m scripts.universe_scan \
+      --panel_csv ../kospi_top20_ohlc_5y.csv \
+      --params outputs_opt_2020_2024/best_params.json \
+      --start 2022-01-01 --end 2024-12-31 --workers 8 --out outputs_universe
+
+    python -m scripts.universe_scan --panel_csv ../kospi_top20_ohlc_5y.csv \
+      --start 2022-01-01 --end 2024-12-31 --engine cross
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ta_tf.config import CostConfig, IndicatorConfig, StrategyConfig
+from ta_tf.data_provider import PanelCsvProvider
+from ta_tf.indicator_plan import plan_indicators, warmup_days
+from ta_tf.universe import load_params_file, scan_universe, scan_universe_cross
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--panel_csv", type=str, required=True, help="Panel OHLC CSV (Date,Ticker,Open,High,Low,Close,...)")
+    p.add_argument("--params", type=str, default=None, help="StrategyConfig JSON, or per-ticker {ticker: params} JSON.")
+    p.add_argument("--start", type=str, default=None)
+    p.add_argument("--end", type=str, default=None)
+    p.add_argument("--warmup_days", type=int, default=None, help="Days of warmup history before --start (default: what the indicators of the params need).")
+    p.add_argument("--symbols", type=str, default=None, help="Comma-separated subset of tickers.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--prefetch", type=int, default=2, help="Extra tickers queued ahead of the busy workers.")
+    p.add_argument("--dd_penalty", type=float, default=0.50)
+    p.add_argument("--engine", type=str, default="trader", choices=["trader", "cross"], help="Per-ticker traders or one cross-sectional engine.")
+    p.add_argument("--save_curves", action="store_true", help="Write one equity CSV per ticker.")
+    p.add_argument("--out", type=str, default="outputs_universe")
+
+    # costs
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--commission_rate", type=float, default=0.0)
+    p.add_argument("--short_borrow_annual_rate", type=float, default=0.04)
+    p.add_argument("--short_borrow_day_count", type=int, default=365)
+
+    args = p.parse_args()
+
+    strat_cfg = load_params_file(args.params) if args.params else StrategyConfig()
+    cost_cfg = CostConfig(
+        stt_rate=float(args.stt_rate),
+        commission_rate=float(args.commission_rate),
+        short_borrow_annual_rate=float(args.short_borrow_annual_rate),
+        short_borrow_day_count=int(args.short_borrow_day_count),
+    )
+
+    fetch_start = None
+    if args.start:
+        days = args.warmup_days
+        if days is None:
+            cfgs = [strat_cfg] if isinstance(strat_cfg, StrategyConfig) else list(strat_cfg.values())
+            days = warmup_days(max(plan_indicators(IndicatorConfig(), c).warmup_bars for c in cfgs))
+        fetch_start = (pd.to_datetime(args.start) - pd.Timedelta(days=int(days))).strftime("%Y-%m-%d")
+    symbols = [x.strip() for x in args.symbols.split(",")] if args.symbols else None
+
+    t0 = time.perf_counter()
+    frames = PanelCsvProvider().fetch_all(args.panel_csv, start=fetch_start, end=args.end, symbols=symbols)
+    t1 = time.perf_counter()
+
+    engine = None
+    if args.engine == "cross":
+        res, engine = scan_universe_cross(
+            frames.values(),
+            strat_cfg=strat_cfg,
+            ind_cfg=IndicatorConfig(),
+            cost_cfg=cost_cfg,
+            start=args.start,
+            end=args.end,
+            dd_penalty=float(args.dd_penalty),
+            keep_curves=bool(args.save_curves),
+        )
+    else:
+        res = scan_universe(
+            frames.values(),
+            strat_cfg=strat_cfg,
+            ind_cfg=IndicatorConfig(),
+            cost_cfg=cost_cfg,
+            start=args.start,
+            end=args.end,
+            dd_penalty=float(args.dd_penalty),
+            workers=int(args.workers),
+            prefetch=int(args.prefetch),
+            keep_curves=bool(args.save_curves),
+        )
+    t2 = time.perf_counter()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if engine is not None:
+        port = engine.portfolio_equity()
+        if args.start:
+            port = port.loc[pd.to_datetime(args.start) :]
+        port.rename_axis("Date").to_frame("Equity").to_csv(out_dir / "portfolio_equity.csv", encoding="utf-8")
+    res.summary.to_csv(out_dir / "universe_summary.csv", index=False, encoding="utf-8")
+    if args.save_curves:
+        curve_dir = out_dir / "curves"
+        curve_dir.mkdir(parents=True, exist_ok=True)
+        for sym, eq in res.curves.items():
+            eq.to_frame("Equity").to_csv(curve_dir / f"equity_{sym.replace('.', '_')}.csv", encoding="utf-8")
+
+    print(res.summary.head(20).to_string(index=False))
+    print(f"Tickers: {len(res.summary)}  load: {t1 - t0:.2f}s  simulate: {t2 - t1:.2f}s")
+    print("Saved:", out_dir / "universe_summary.csv")
+
+
+if __name__ == "__main__":
+    main()
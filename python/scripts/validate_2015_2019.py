@@ -21,8 +21,10 @@ import pandas as pd
 
 from ta_tf.config import CostConfig, IndicatorConfig, StrategyConfig
 from ta_tf.data_provider import PanelCsvProvider, YfinanceProvider
+from ta_tf.indicator_plan import plan_indicators, warmup_days
 from ta_tf.backtest import _run_core
 from ta_tf.metrics import cagr, max_drawdown
+from ta_tf.robustness import daily_returns, stationary_block_bootstrap, trade_returns, trade_shuffle_bootstrap
 
 
 def _parse_date(s: str) -> pd.Timestamp:
@@ -51,7 +53,7 @@ def main() -> None:
     p.add_argument("--symbol", type=str, default="005930.KS")
     p.add_argument("--valid_start", type=str, default="2015-01-01")
     p.add_argument("--valid_end", type=str, default="2019-12-31")
-    p.add_argument("--warmup_days", type=int, default=900)
+    p.add_argument("--warmup_days", type=int, default=None, help="Days of warmup history before --valid_start (default: what the indicators of the params need).")
     p.add_argument("--params", type=str, default="outputs_opt_2020_2024/best_params.json")
     p.add_argument("--out", type=str, default="outputs_valid_2015_2019")
 
@@ -65,6 +67,12 @@ def main() -> None:
     p.add_argument("--short_borrow_annual_rate", type=float, default=0.04)
     p.add_argument("--short_borrow_day_count", type=int, default=365)
 
+    # robustness (optional)
+    p.add_argument("--bootstrap", type=int, default=0, help="Number of resampled paths (0 = off).")
+    p.add_argument("--block_len", type=float, default=20.0, help="Mean block length (bars) for the block bootstrap.")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--dd_penalty", type=float, default=0.50)
+
     args = p.parse_args()
 
     if not args.use_yfinance and not args.panel_csv:
@@ -72,12 +80,13 @@ def main() -> None:
 
     valid_start = _parse_date(args.valid_start)
     valid_end = _parse_date(args.valid_end)
-    fetch_start = _warmup_start(valid_start, args.warmup_days).strftime("%Y-%m-%d")
-
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     strat_cfg = _load_params(args.params)
+    ind_cfg = IndicatorConfig()
+    days = args.warmup_days if args.warmup_days is not None else warmup_days(plan_indicators(ind_cfg, strat_cfg).warmup_bars)
+    fetch_start = _warmup_start(valid_start, days).strftime("%Y-%m-%d")
 
     cost_cfg = CostConfig(
         stt_rate=float(args.stt_rate),
@@ -85,7 +94,6 @@ def main() -> None:
         short_borrow_annual_rate=float(args.short_borrow_annual_rate),
         short_borrow_day_count=int(args.short_borrow_day_count),
     )
-    ind_cfg = IndicatorConfig()
 
     frame = _load_frame(args, fetch_start=fetch_start, end=args.valid_end)
 
@@ -104,6 +112,24 @@ def main() -> None:
     print("VALID CAGR:", cagr(eq))
     print("VALID MaxDD:", max_drawdown(eq))
 
+    if args.bootstrap > 0 and len(eq) > 2:
+        years = (eq.index[-1].date() - eq.index[0].date()).days / 365.0
+        runs = [
+            stationary_block_bootstrap(
+                daily_returns(eq), n_paths=args.bootstrap, mean_block=args.block_len,
+                years=years, dd_penalty=args.dd_penalty, seed=args.seed,
+            )
+        ]
+        tr_rets = trade_returns(pd.read_csv(paths["trades"]), initial_equity=float(eq.iloc[0]))
+        if len(tr_rets) > 1:
+            runs.append(
+                trade_shuffle_bootstrap(tr_rets, years=years, n_paths=args.bootstrap, dd_penalty=args.dd_penalty, seed=args.seed)
+            )
+        ci = pd.concat({r.method: r.ci(0.90) for r in runs}, names=["method", "metric"])
+        ci.to_csv(out_dir / "bootstrap_ci.csv", encoding="utf-8")
+        print("Bootstrap 90% intervals:")
+        print(ci.to_string())
+
     (out_dir / "used_params.json").write_text(json.dumps(strat_cfg.__dict__, indent=2), encoding="utf-8")
     print("Saved outputs to:", out_dir)
 
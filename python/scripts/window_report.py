@@ -0,0 +1,92 @@
+"""Per-window report (calendar years, fixed splits, rolling windows) from ONE run.
+
+The strategy is simulated once over the whole available history; every window
+is then measured on that curve (see ta_tf.metrics.window_metrics) instead of
+re-running the backtest per window.
+
+Example:
+    python -m scripts.window_report \
+      --panel_csv kospi_top100_ohlc_30y.csv --symbol 005930.KS \
+      --params outputs_opt_2020_2024/best_params.json \
+      --split train:2020-01-01:2024-12-31 --split valid:2015-01-01:2019-12-31 \
+      --rolling_years 3 --out outputs_windows
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ta_tf.backtest import run_step1
+from ta_tf.config import CostConfig, IndicatorConfig, StrategyConfig
+from ta_tf.data_provider import CsvProvider, PanelCsvProvider
+from ta_tf.metrics import calendar_year_windows, rolling_windows, window_metrics
+from ta_tf.universe import load_params_file
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbol", type=str, default="005930.KS")
+    p.add_argument("--csv", type=str, default=None)
+    p.add_argument("--panel_csv", type=str, default=None)
+    p.add_argument("--params", type=str, default=None, help="StrategyConfig JSON.")
+    p.add_argument("--split", action="append", default=[], help="Extra window as label:start:end (repeatable).")
+    p.add_argument("--rolling_years", type=int, default=3, help="Rolling window length in years (0 = off).")
+    p.add_argument("--step_months", type=int, default=1)
+    p.add_argument("--dd_penalty", type=float, default=0.50)
+    p.add_argument("--out", type=str, default="outputs_windows")
+
+    # costs
+    p.add_argument("--stt_rate", type=float, default=0.0018)
+    p.add_argument("--commission_rate", type=float, default=0.0)
+    p.add_argument("--short_borrow_annual_rate", type=float, default=0.04)
+    p.add_argument("--short_borrow_day_count", type=int, default=365)
+    args = p.parse_args()
+
+    if args.panel_csv:
+        frame = PanelCsvProvider().fetch(args.panel_csv, args.symbol)
+    elif args.csv:
+        frame = CsvProvider().fetch(csv_path=args.csv, symbol=args.symbol)
+    else:
+        raise SystemExit("Provide --panel_csv or --csv.")
+
+    strat_cfg = load_params_file(args.params) if args.params else StrategyConfig()
+    if isinstance(strat_cfg, dict):
+        raise SystemExit("--params must hold a single StrategyConfig.")
+    cost_cfg = CostConfig(
+        stt_rate=float(args.stt_rate),
+        commission_rate=float(args.commission_rate),
+        short_borrow_annual_rate=float(args.short_borrow_annual_rate),
+        short_borrow_day_count=int(args.short_borrow_day_count),
+    )
+
+    t0 = time.perf_counter()
+    res = run_step1(frame, IndicatorConfig(), strat_cfg, cost_cfg)
+    t1 = time.perf_counter()
+
+    idx = res.equity.index
+    windows = [("full", idx[0], idx[-1])] if len(idx) else []
+    for spec in args.split:
+        label, start, end = spec.split(":")
+        windows.append((label, pd.Timestamp(start), pd.Timestamp(end)))
+    windows += calendar_year_windows(idx)
+    if args.rolling_years > 0:
+        windows += rolling_windows(idx, years=int(args.rolling_years), step_months=int(args.step_months))
+    table = window_metrics(res.equity, windows, dd_penalty=float(args.dd_penalty), trades=res.trades)
+    t2 = time.perf_counter()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"windows_{args.symbol.replace('.', '_')}.csv"
+    table.to_csv(out_path, index=False, encoding="utf-8")
+
+    print(table.head(len(args.split) + 1 + len(calendar_year_windows(idx))).to_string(index=False))
+    print(f"simulation {t1 - t0:.3f}s; {len(windows)} windows in {(t2 - t1) * 1e3:.1f} ms")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
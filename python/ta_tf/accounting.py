@@ -0,0 +1,178 @@
+"""Cash/share fill arithmetic shared by the trader and the accounting replay.
+
+Both paths must produce bit-identical numbers, so the float operations live in
+one place.
+
+Integer KRW mode (``BacktestConfig.accounting="KRW"``) keeps cash in whole won:
+fills execute on the KRX tick grid (buys rounded up, sells down), commission,
+sell tax and daily borrow interest are truncated to the won, and equity is
+normalized from the exact integer value with a single rounding.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from math import ceil, floor
+from typing import Optional
+
+import numpy as np
+
+from .cost_model import CostBreakdown
+
+
+@dataclass(frozen=True)
+class Fill:
+    """Result of one executed order."""
+
+    cash: float  # cash after the fill
+    shares: int  # signed shares after the fill
+    qty: int  # signed shares traded
+    notional: float
+    fee: float
+    tax: float
+    price: float  # executed price (tick-rounded in KRW mode)
+
+
+def fill_rebalance(cash: float, shares: int, side: str, price: float, frac: float, rates: CostBreakdown) -> Optional[Fill]:
+    """Trade ``frac`` of current equity at ``price``; None if nothing can be bought/sold."""
+    eq_val = float(cash + float(shares) * float(price))
+    alloc = eq_val * frac
+    if not bool(np.isfinite(price)) or price <= 0 or alloc <= 0:
+        return None
+
+    qty_abs = int(alloc // float(price))
+    if qty_abs <= 0:
+        return None
+
+    notional = float(qty_abs) * float(price)
+    fee = float(rates.fee_rate) * notional
+    tax = float(rates.tax_rate) * notional
+
+    if side == "BUY":
+        # Buy shares (either long entry, or short cover add if ever used)
+        return Fill(cash=cash - (notional + fee + tax), shares=shares + qty_abs, qty=qty_abs, notional=notional, fee=fee, tax=tax, price=float(price))
+    # Sell shares (either long exit add? or short entry/add)
+    return Fill(cash=cash + (notional - fee - tax), shares=shares - qty_abs, qty=-qty_abs, notional=notional, fee=fee, tax=tax, price=float(price))
+
+
+def fill_flatten(cash: float, shares: int, side: str, price: float, rates: CostBreakdown) -> Optional[Fill]:
+    """Close the whole position at ``price``; None if already flat."""
+    if shares == 0:
+        return None
+    qty_abs = abs(int(shares))
+    notional = float(qty_abs) * float(price)
+    fee = float(rates.fee_rate) * notional
+    tax = float(rates.tax_rate) * notional
+
+    if side == "SELL":
+        # sell long holdings
+        return Fill(cash=cash + (notional - fee - tax), shares=0, qty=-qty_abs, notional=notional, fee=fee, tax=tax, price=float(price))
+    # buy to cover short
+    return Fill(cash=cash - (notional + fee + tax), shares=0, qty=qty_abs, notional=notional, fee=fee, tax=tax, price=float(price))
+
+
+# ---------- integer KRW mode ----------
+
+# KRX tick sizes (2023 schedule): (upper price bound, tick)
+_KRX_TICKS = ((2_000, 1), (5_000, 5), (20_000, 10), (50_000, 50), (200_000, 100), (500_000, 500))
+
+
+def krx_tick_size(price: float) -> int:
+    for bound, tick in _KRX_TICKS:
+        if price < bound:
+            return tick
+    return 1_000
+
+
+def krw_price(price: float, side: str) -> Optional[int]:
+    """Executable integer price: on-grid prices unchanged, others rounded to the
+    tick against the trader (BUY up, SELL down). None for NaN / non-positive."""
+    if not bool(np.isfinite(price)) or price <= 0:
+        return None
+    tick = krx_tick_size(price)
+    if float(price).is_integer() and int(price) % tick == 0:
+        return int(price)
+    steps = ceil(price / tick) if side == "BUY" else floor(price / tick)
+    return max(tick, int(steps) * tick)
+
+
+@lru_cache(maxsize=None)
+def exact_rate(rate: float) -> Fraction:
+    """Decimal rate as written (``0.0018`` -> 9/5000), not its binary float value."""
+    return Fraction(repr(float(rate)))
+
+
+def krw_charge(amount: int, rate: Fraction) -> int:
+    """Fee / tax / interest on an integer won amount, truncated to the won."""
+    return (int(amount) * rate.numerator) // rate.denominator
+
+
+def krw_borrow_costs(abs_shares: int, closes: np.ndarray, daily_rate: Fraction) -> np.ndarray:
+    """Daily borrow interest per bar (int64 won); NaN closes accrue nothing."""
+    c = np.asarray(closes, dtype=float)
+    ok = np.isfinite(c)
+    out = np.zeros(len(c), dtype=np.int64)
+    if not ok.any():
+        return out
+    num, den = daily_rate.numerator, daily_rate.denominator
+    cv = c[ok]
+    if np.all(cv == np.floor(cv)) and float(abs_shares) * float(cv.max()) * num < 2.0**62:
+        out[ok] = (int(abs_shares) * cv.astype(np.int64) * num) // den
+    else:
+        # off-grid closes or huge notionals: exact rational arithmetic
+        out[ok] = [floor(int(abs_shares) * Fraction(float(x)) * daily_rate) for x in cv]
+    return out
+
+
+def equity_value(cash, shares: int, price: float):
+    """Cash + shares at ``price``; exact int when cash is int and the price is on the grid."""
+    if isinstance(cash, int) and float(price).is_integer():
+        return cash + int(shares) * int(price)
+    return float(cash + float(shares) * float(price))
+
+
+def equity_path(cash_path: np.ndarray, shares: int, px: np.ndarray, initial_equity: float, base) -> np.ndarray:
+    """Normalized equity over bars with constant shares (array form of ``equity_value``)."""
+    if cash_path.dtype.kind != "i":
+        return initial_equity * ((cash_path + float(shares) * px) / base)
+    on_grid = np.isfinite(px) & (px == np.floor(px))
+    exact = cash_path + int(shares) * np.where(on_grid, px, 0.0).astype(np.int64)
+    out = initial_equity * (exact / base)
+    if not on_grid.all():
+        out = np.where(on_grid, out, initial_equity * ((cash_path + float(shares) * px) / base))
+    return out
+
+
+def fill_rebalance_krw(cash: int, shares: int, side: str, price: float, frac: float, rates: CostBreakdown) -> Optional[Fill]:
+    """Integer-won ``fill_rebalance``."""
+    px = krw_price(price, side)
+    if px is None:
+        return None
+    alloc = int((cash + shares * px) * frac)
+    qty_abs = alloc // px if alloc > 0 else 0
+    if qty_abs <= 0:
+        return None
+    notional = qty_abs * px
+    fee = krw_charge(notional, exact_rate(rates.fee_rate))
+    tax = krw_charge(notional, exact_rate(rates.tax_rate))
+    if side == "BUY":
+        return Fill(cash=cash - (notional + fee + tax), shares=shares + qty_abs, qty=qty_abs, notional=notional, fee=fee, tax=tax, price=px)
+    return Fill(cash=cash + (notional - fee - tax), shares=shares - qty_abs, qty=-qty_abs, notional=notional, fee=fee, tax=tax, price=px)
+
+
+def fill_flatten_krw(cash: int, shares: int, side: str, price: float, rates: CostBreakdown) -> Optional[Fill]:
+    """Integer-won ``fill_flatten``."""
+    if shares == 0:
+        return None
+    px = krw_price(price, side)
+    if px is None:
+        return None
+    qty_abs = abs(int(shares))
+    notional = qty_abs * px
+    fee = krw_charge(notional, exact_rate(rates.fee_rate))
+    tax = krw_charge(notional, exact_rate(rates.tax_rate))
+    if side == "SELL":
+        return Fill(cash=cash + (notional - fee - tax), shares=0, qty=-qty_abs, notional=notional, fee=fee, tax=tax, price=px)
+    return Fill(cash=cash - (notional + fee + tax), shares=0, qty=qty_abs, notional=notional, fee=fee, tax=tax, price=px)
@@ -0,0 +1,174 @@
+"""Output policy for long optimizer runs.
+
+- ``TopK``: bounded min-heap of the best configs (full artifacts are written
+  only for these, at the end of the run)
+- ``ResultsWriter``: one results file (CSV or Parquet) that rows are appended
+  to in chunks by a background thread
+- ``load_results``: read that file back to resume an interrupted run
+
+CSV is appended and flushed chunk by chunk, so a killed run can be resumed
+from everything written so far. Parquet needs ``pyarrow`` and is only
+readable after the writer was closed (Ctrl-C closes it cleanly).
+"""
+
+from __future__ import annotations
+
+import heapq
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+
+class TopK:
+    """Keep the ``k`` highest-scoring items; ties keep the earlier eval."""
+
+    def __init__(self, k: int):
+        self.k = max(0, int(k))
+        self._heap: list[tuple[float, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, score: float, eval_id: int, item: Any) -> bool:
+        """Offer an item; returns True if it is (currently) kept."""
+        if self.k == 0 or score != score:  # NaN never ranks
+            return False
+        # Larger -eval_id wins ties in the min-heap, i.e. the earlier eval stays.
+        entry = (float(score), -int(eval_id), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] <= self._heap[0][:2]:
+            return False
+        heapq.heapreplace(self._heap, entry)
+        return True
+
+    def best(self) -> list[tuple[float, int, Any]]:
+        """``(score, eval_id, item)`` sorted best-first."""
+        return [(s, -e, x) for s, e, x in sorted(self._heap, key=lambda t: t[:2], reverse=True)]
+
+
+def _truncate_partial_line(path: Path) -> None:
+    # A killed writer may leave half a CSV row; drop it before appending.
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load_results(path: str | Path) -> pd.DataFrame:
+    """Read a results file written by ``ResultsWriter`` (empty if missing)."""
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return pd.DataFrame()
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    _truncate_partial_line(path)
+    return pd.read_csv(path, encoding="utf-8", float_precision="round_trip")
+
+
+class ResultsWriter:
+    """Append result rows to one file from a background thread.
+
+    ``append`` buffers rows and hands a chunk to the writer thread every
+    ``chunk_rows`` rows; ``close`` flushes the rest and re-raises any writer
+    error. With ``resume=True`` an existing file is extended instead of
+    replaced.
+    """
+
+    def __init__(self, path: str | Path, chunk_rows: int = 256, resume: bool = False, max_pending: int = 8):
+        self.path = Path(path)
+        self.fmt = "parquet" if self.path.suffix == ".parquet" else "csv"
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._buf: list[dict] = []
+        self._columns: Optional[list[str]] = None
+        self._error: Optional[BaseException] = None
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(max_pending)))
+
+        self._existing: Optional[pd.DataFrame] = None
+        if resume and self.path.exists() and self.path.stat().st_size > 0:
+            self._existing = load_results(self.path)
+            self._columns = list(self._existing.columns)
+        elif self.path.exists():
+            self.path.unlink()
+
+        self._pq_writer = None
+        self._thread = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._thread.start()
+
+    # -- main thread -------------------------------------------------------
+    def append(self, row: dict) -> None:
+        self._raise_if_failed()
+        self._buf.append(row)
+        if len(self._buf) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Queue buffered rows for writing (blocks if the writer falls behind)."""
+        if self._buf:
+            self._q.put(self._buf)
+            self._buf = []
+
+    def close(self) -> None:
+        self.flush()
+        self._q.put(None)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"results writer failed: {self._error!r}") from self._error
+
+    # -- writer thread -----------------------------------------------------
+    def _run(self) -> None:
+        try:
+            while True:
+                rows = self._q.get()
+                if rows is None:
+                    break
+                if self._error is None:
+                    self._write(pd.DataFrame(rows))
+        except BaseException as e:  # surfaced on the main thread
+            self._error = e
+        finally:
+            try:
+                if self._pq_writer is not None:
+                    self._pq_writer.close()
+                    Path(str(self.path) + ".tmp").replace(self.path)
+            except BaseException as e:
+                self._error = self._error or e
+
+    def _write(self, df: pd.DataFrame) -> None:
+        if self._columns is None:
+            self._columns = list(df.columns)
+        df = df.reindex(columns=self._columns)
+        if self.fmt == "csv":
+            header = not self.path.exists() or self.path.stat().st_size == 0
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                df.to_csv(f, index=False, header=header)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._pq_writer is None:
+            # Parquet cannot be appended in place: rewrite the old rows first
+            # into a temporary file that replaces the original on close.
+            first = df if self._existing is None else pd.concat([self._existing, df], ignore_index=True)
+            table = pa.Table.from_pandas(first, preserve_index=False)
+            self._pq_writer = pq.ParquetWriter(str(self.path) + ".tmp", table.schema)
+            self._pq_writer.write_table(table)
+            self._existing = None
+            return
+        self._pq_writer.write_table(pa.Table.from_pandas(df, preserve_index=False, schema=self._pq_writer.schema))
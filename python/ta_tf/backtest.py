@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Optional
 
@@ -10,7 +10,8 @@ import pandas as pd
 
 from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
 from .data_manager import OhlcvDataManager
-from .data_provider import CsvProvider, OhlcvFrame, YfinanceProvider
+from .data_provider import CsvProvider, OhlcvFrame, YfinanceProvider, resolve_window
+from .indicator_plan import plan_indicators, warmup_days
 from .trader import TickerTraderStep1
 
 
@@ -42,22 +43,15 @@ def run_step1_from_yfinance(
 ) -> dict[str, Path]:
     """Convenience runner using yfinance."""
     # Mirror MATLAB DM behavior: when a backtest window is specified, include
-    # extra warmup bars before `start` so indicators (esp. long-term trend)
-    # are computed on a longer history, then trim outputs back to the window.
+    # extra warmup bars before `start` so the indicators the strategy uses
+    # (see ta_tf.indicator_plan) are settled, then trim outputs back to the window.
     start_dt = pd.to_datetime(start)
     end_dt = pd.to_datetime(end)
 
     warmup_start = start_dt
     if include_warmup:
-        warmup_bars = max(
-            int(ind_cfg.sma_long_term),
-            int(ind_cfg.atr_window),
-            int(ind_cfg.sma_slow),
-            int(ind_cfg.macd_slow + 3 * ind_cfg.macd_signal),
-            250,
-        )
-        # calendar days approximation (weekends/holidays) for daily bars
-        warmup_start = start_dt - pd.Timedelta(days=int(warmup_bars * 2))
+        bars = plan_indicators(ind_cfg, strat_cfg).warmup_bars
+        warmup_start = start_dt - pd.Timedelta(days=warmup_days(bars))
 
     frame = YfinanceProvider().fetch(
         symbol=symbol,
@@ -81,37 +75,85 @@ def run_step1_from_csv(
     return _run_core(frame, output_dir, ind_cfg, strat_cfg, cost_cfg)
 
 
-def _run_core(
+@dataclass(frozen=True)
+class Step1Result:
+    """In-memory result of a single Step-1 run (already trimmed to the window)."""
+
+    symbol: str
+    equity: pd.Series  # normalized equity indexed by Date
+    trades: pd.DataFrame
+
+
+def run_step1(
     frame: OhlcvFrame,
-    output_dir: str | Path,
     ind_cfg: IndicatorConfig,
     strat_cfg: StrategyConfig,
     cost_cfg: CostConfig,
     start_dt: Optional[pd.Timestamp] = None,
     end_dt: Optional[pd.Timestamp] = None,
-) -> dict[str, Path]:
-    out_dir = Path(output_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+) -> Step1Result:
+    """Run one backtest and return the curves without touching the disk."""
+    return run_step1_on(OhlcvDataManager(frame, ind_cfg), strat_cfg, cost_cfg, start_dt=start_dt, end_dt=end_dt)
 
-    dm = OhlcvDataManager(frame, ind_cfg)
-    bt_cfg = BacktestConfig(symbol=frame.symbol, initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0)
+
+def run_step1_on(
+    dm: OhlcvDataManager,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    jump: bool = True,
+    flat_start: bool = False,
+) -> Step1Result:
+    """Same as :func:`run_step1` on an already-built data manager (indicators reused).
+
+    ``jump`` selects the event-jump driver (bit-identical, fewer Python steps).
+    ``flat_start`` starts flat at ``start_dt`` instead of trading through the
+    warmup (see ``TickerTraderStep1.run_full_backtest``).
+    """
+    bt_cfg = BacktestConfig(symbol=dm.symbol, initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0)
+
+    trimmed = start_dt is not None and end_dt is not None
+    window = dm.window(start_dt, end_dt) if trimmed else None
 
     trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=cost_cfg, bt_cfg=bt_cfg)
-    trader.run_full_backtest()
+    trader.run_full_backtest(window=window, jump=jump, flat_start=flat_start)
 
     eq = pd.DataFrame(trader.equity_curve, columns=["Date", "Equity"]).set_index("Date")
 
-    # Trim to requested window (exclude indicator warmup segment).
-    if start_dt is not None and end_dt is not None:
-        eq = eq.loc[(eq.index >= start_dt) & (eq.index <= end_dt)]
+    # Trim to requested window (exclude indicator warmup segment). Equity and
+    # trade timestamps are sorted, so offsets come from a binary search.
+    if trimmed:
+        eq = eq.iloc[resolve_window(eq.index, start_dt, end_dt).as_slice()]
     trades = pd.DataFrame([asdict(x) for x in trader.trade_log])
-    if start_dt is not None and end_dt is not None and not trades.empty:
+    if trimmed and not trades.empty:
         trades["timestamp"] = pd.to_datetime(trades["timestamp"])
-        trades = trades.loc[(trades["timestamp"] >= start_dt) & (trades["timestamp"] <= end_dt)]
+        trades = trades.iloc[resolve_window(pd.DatetimeIndex(trades["timestamp"]), start_dt, end_dt).as_slice()]
+
+    return Step1Result(symbol=dm.symbol, equity=eq["Equity"], trades=trades)
+
+
+def _run_core(
+    frame: OhlcvFrame,
+    output_dir: str | Path,
+    ind_cfg: IndicatorConfig,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+) -> dict[str, Path]:
+    res = run_step1(frame, ind_cfg, strat_cfg, cost_cfg, start_dt=start_dt, end_dt=end_dt)
+    return write_step1_outputs(res, output_dir)
+
+
+def write_step1_outputs(res: Step1Result, output_dir: str | Path) -> dict[str, Path]:
+    """Write ``equity_<symbol>.csv`` and ``trades_<symbol>.csv`` under ``output_dir``."""
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    eq_path = out_dir / f"equity_{frame.symbol.replace('.', '_')}.csv"
-    tr_path = out_dir / f"trades_{frame.symbol.replace('.', '_')}.csv"
-    eq.to_csv(eq_path, encoding="utf-8")
-    trades.to_csv(tr_path, index=False, encoding="utf-8")
+    eq_path = out_dir / f"equity_{res.symbol.replace('.', '_')}.csv"
+    tr_path = out_dir / f"trades_{res.symbol.replace('.', '_')}.csv"
+    res.equity.to_frame("Equity").to_csv(eq_path, encoding="utf-8")
+    res.trades.to_csv(tr_path, index=False, encoding="utf-8")
 
     return {"equity": eq_path, "trades": tr_path}
@@ -0,0 +1,224 @@
+"""Checkpointed reference run with divergence-point resume.
+
+Neighboring configs (sensitivity lattices, local search) usually behave like
+the reference config for a long stretch: a tighter stop changes nothing until
+the first bar where it is hit. ``CheckpointedReference`` runs the reference
+once, keeping a compact state checkpoint every ``every`` bars plus a per-bar
+trace of the position state. For a neighbor, ``divergence_bar`` finds the first
+bar where its step could differ from the reference's (stop hit/price, target
+position, entries blocked by a different cooldown, sizing), ``run`` restores the last
+checkpoint at or before it and simulates only from there. Results are
+identical to a full run of the neighbor.
+
+Only StrategyConfig may differ; data, costs and BacktestConfig are shared.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import BacktestConfig, CostConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .data_provider import BarWindow
+from .decision_codegen import decision_source
+from .event_jump import DecisionArrays, decision_arrays, run_event_jump
+from .optimize import score_trader
+from .trader import TickerTraderStep1
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Trader state before bar ``bar`` of the reference run."""
+
+    bar: int
+    cash: float
+    shares: int
+    equity: float
+    next_bar: int
+    state: object  # copy of the trader's position state
+    n_equity: int  # equity_curve / trade_log prefixes shared with the reference
+    n_trades: int
+
+
+def _capture(trader: TickerTraderStep1, bar: int) -> Checkpoint:
+    return Checkpoint(
+        bar=int(bar),
+        cash=trader.cash,
+        shares=int(trader.shares),
+        equity=trader.equity,
+        next_bar=int(trader.next_bar),
+        state=replace(trader.state),
+        n_equity=len(trader.equity_curve),
+        n_trades=len(trader.trade_log),
+    )
+
+
+def _stop_params(cfg: StrategyConfig) -> tuple:
+    return (cfg.long_daily_stop, cfg.long_trail_stop, cfg.short_daily_stop, cfg.short_trail_stop)
+
+
+def _first(mask: np.ndarray, default: int) -> int:
+    return int(np.argmax(mask)) if mask.any() else default
+
+
+class CheckpointedReference:
+    """Reference run of ``strat_cfg`` that neighbors can resume from."""
+
+    def __init__(
+        self,
+        dm: OhlcvDataManager,
+        strat_cfg: StrategyConfig,
+        cost_cfg: CostConfig,
+        bt_cfg: BacktestConfig,
+        window: Optional[BarWindow] = None,
+        every: int = 64,
+    ):
+        self.dm = dm
+        self.strat_cfg = strat_cfg
+        self.cost_cfg = cost_cfg
+        self.bt_cfg = bt_cfg
+        self.window = window
+        self.every = max(1, int(every))
+        n = len(dm)
+        self.stop = max(0, n - 1 if window is None else min(n - 1, int(window.stop)))
+
+        # Per-bar state before step(t) and position after it.
+        m = self.stop
+        self.pos0 = np.zeros(m, dtype=np.int8)
+        self.pos1 = np.zeros(m, dtype=np.int8)
+        self.entry0 = np.full(m, -1, dtype=np.int64)
+        self.cool0 = np.full(m, -1, dtype=np.int64)
+        self.hist_max0 = np.full(m, -np.inf)
+        self.hist_min0 = np.full(m, np.inf)
+        self.forced = np.zeros(m, dtype=bool)
+        self.checkpoints: list[Checkpoint] = []
+
+        trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=cost_cfg, bt_cfg=bt_cfg)
+        for t in range(m):
+            st = trader.state
+            if t % self.every == 0:
+                self.checkpoints.append(_capture(trader, t))
+            self.pos0[t] = st.pos
+            self.entry0[t] = -1 if st.entry_index is None else st.entry_index
+            self.cool0[t] = st.cooldown_until_index
+            self.hist_max0[t] = st.hist_max
+            self.hist_min0[t] = st.hist_min
+            n_trades = len(trader.trade_log)
+            trader.step(t)
+            self.pos1[t] = trader.state.pos
+            self.forced[t] = any(x.reason == "FORCED_COVER_MAXHOLD" for x in trader.trade_log[n_trades:])
+        self.checkpoints.append(_capture(trader, m))
+        self.trader = trader
+
+        self._cool_ref = np.append(self.cool0, trader.state.cooldown_until_index)
+        self._arrays: DecisionArrays = decision_arrays(dm, strat_cfg)
+        self._ref_stops = self._stops(strat_cfg)
+        self._ref_targets = self._targets(strat_cfg, self._arrays, self._cool_ref)
+        self.bars_simulated = 0  # by neighbors, for reporting
+
+    # -- divergence ----------------------------------------------------------
+    def _stops(self, cfg: StrategyConfig) -> tuple[np.ndarray, np.ndarray]:
+        """Stop hit and stop price per bar on the reference state path (Python max/min semantics)."""
+        dm, m = self.dm, self.stop
+        O, H, L, C = (dm.column(c)[:m] for c in ("Open", "High", "Low", "Close"))
+        with np.errstate(invalid="ignore"):
+            oc_max = np.where(C > O, C, O)
+            oc_min = np.where(C < O, C, O)
+            hmax = np.where(oc_max > self.hist_max0, oc_max, self.hist_max0)
+            hmin = np.where(oc_min < self.hist_min0, oc_min, self.hist_min0)
+            l_daily = O * (1.0 - cfg.long_daily_stop)
+            l_trail = hmax * (1.0 - cfg.long_trail_stop)
+            l_px = np.where(l_trail > l_daily, l_trail, l_daily)
+            s_daily = O * (1.0 + cfg.short_daily_stop)
+            s_trail = hmin * (1.0 + cfg.short_trail_stop)
+            s_px = np.where(s_trail < s_daily, s_trail, s_daily)
+            hit = np.where(self.pos0 == 1, L <= l_px, np.where(self.pos0 == -1, H >= s_px, False))
+        px = np.where(self.pos0 == 1, l_px, s_px)
+        return hit & ~self.forced, px
+
+    def _cooldowns(self, cooldown_bars: int) -> np.ndarray:
+        """``cooldown_until_index`` before each bar (and after the last) if the
+        reference path's exits had set it with ``cooldown_bars``."""
+        cd = max(0, int(cooldown_bars))
+        if cd == max(0, int(self.strat_cfg.cooldown_bars)):
+            return self._cool_ref
+        m = self.stop
+        exits = (self.pos0 != 0) & (self.pos1 != self.pos0)
+        last = np.maximum.accumulate(np.where(exits, np.arange(m), -1))
+        last = np.concatenate([[-1], last])  # last exit strictly before bar t
+        return np.where(last >= 0, last + cd, self._cool_ref)
+
+    def _targets(self, cfg: StrategyConfig, arr: DecisionArrays, cool: np.ndarray) -> np.ndarray:
+        """Target of the decision (``decision_codegen.decision_source``) per bar on the reference state path."""
+        m = self.stop
+        t = np.arange(m)
+        flat = np.where(t <= cool[:m], 0, np.where(arr.long_entry[:m], 1, np.where(arr.short_entry[:m], -1, 0)))
+        held = np.where(self.entry0 >= 0, t - self.entry0, 0)
+        can_exit = held >= max(0, int(cfg.min_hold_bars))
+        long_t = np.where(can_exit & arr.long_exit[:m], 0, 1)
+        short_t = np.where(can_exit & arr.short_exit[:m], 0, -1)
+        return np.where(self.pos0 == 0, flat, np.where(self.pos0 == 1, long_t, short_t))
+
+    def divergence_bar(self, cfg: StrategyConfig) -> int:
+        """First bar whose step may differ from the reference (``stop`` if none).
+
+        A different ``cooldown_bars`` alone is not a divergence: only the
+        entries it blocks are (``run`` patches the restored cooldown).
+        """
+        ref, m = self.strat_cfg, self.stop
+        if cfg == ref:
+            return m
+        if m <= 2:
+            return 0
+        live = np.arange(m) >= 2  # step() is a no-op before bar 2
+        first = m
+
+        if (max(1, int(cfg.max_units)), cfg.pyramid_step_return) != (max(1, int(ref.max_units)), ref.pyramid_step_return):
+            # sizing / pyramiding differ from the first entry on
+            first = min(first, _first(live & ((self.pos0 != 0) | (self.pos1 != 0)), m))
+
+        stop_n, px_n = self._ref_stops
+        if _stop_params(cfg) != _stop_params(ref):
+            stop_r, px_r = self._ref_stops
+            stop_n, px_n = self._stops(cfg)
+            first = min(first, _first(live & ((stop_r != stop_n) | (stop_r & (px_r != px_n))), m))
+
+        cool = self._cooldowns(cfg.cooldown_bars)
+        if decision_source(cfg) != decision_source(ref) or cool is not self._cool_ref:
+            arr = self._arrays if decision_source(cfg) == decision_source(ref) else decision_arrays(self.dm, cfg)
+            reach = live & ~self.forced & ~self._ref_stops[0] & ~stop_n & self._arrays.valid[:m]
+            first = min(first, _first(reach & (self._ref_targets != self._targets(cfg, arr, cool)), m))
+        return first
+
+    # -- neighbor runs -------------------------------------------------------
+    def run(self, cfg: StrategyConfig) -> TickerTraderStep1:
+        """Finished trader for ``cfg``, simulated from the last checkpoint before divergence."""
+        d = self.divergence_bar(cfg)
+        # grid checkpoints sit at multiples of `every`; the last one at `stop`
+        cp = self.checkpoints[min(d // self.every, len(self.checkpoints) - 1)]
+        ref = self.trader
+        tr = TickerTraderStep1(dm=self.dm, strat_cfg=cfg, cost_cfg=self.cost_cfg, bt_cfg=self.bt_cfg)
+        tr.cash = cp.cash
+        tr.shares = cp.shares
+        tr.equity = cp.equity
+        tr.next_bar = cp.next_bar
+        tr.state = replace(cp.state, cooldown_until_index=int(self._cooldowns(cfg.cooldown_bars)[cp.bar]))
+        tr.equity_curve = ref.equity_curve[: cp.n_equity]
+        tr.trade_log = ref.trade_log[: cp.n_trades]
+        run_event_jump(tr, window=self.window, start=cp.bar)
+        self.bars_simulated += max(0, self.stop - cp.bar)
+        return tr
+
+    def evaluate(
+        self,
+        cfg: StrategyConfig,
+        start_dt: Optional[pd.Timestamp] = None,
+        end_dt: Optional[pd.Timestamp] = None,
+        dd_penalty: float = 0.5,
+    ) -> tuple[float, float, float]:
+        """``optimize.evaluate_config`` for a neighbor: (score, cagr, max_dd)."""
+        return score_trader(self.run(cfg), start_dt, end_dt, dd_penalty=dd_penalty)
@@ -0,0 +1,287 @@
+"""Chunked (out-of-core) backtests for histories too long to hold in memory.
+
+``ChunkedBacktest`` is fed OHLCV blocks in time order and keeps only what a
+later bar can still read:
+
+- the data-manager tail (``snapshot_tail_bars``: rolling windows, trend
+  lookback, confirm bars) plus the MACD EMA recursion state, extended by
+  ``dm.append`` for each new block;
+- the trader (position, stops, cooldown, cash), whose bar indices are shifted
+  whenever the data manager is cut back to its tail.
+
+After each block the equity rows and trades produced so far are appended to
+``equity_<symbol>.csv`` / ``trades_<symbol>.csv`` (same layout as
+``write_step1_outputs``) and dropped, so peak memory is set by the block size,
+not the length of the history. ``iter_csv_bars`` / ``iter_panel_bars`` stream
+the blocks from disk.
+
+As with snapshots, results are identical to an in-memory run on tick-grid
+(integer) prices; input must be sorted by time per symbol.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from .csv_ingest import infer_datetime_format, iter_csv_typed, parse_datetimes
+from .data_manager import _OHLCV, OhlcvDataManager
+from .data_provider import CsvProvider, OhlcvFrame, PanelCsvProvider, _normalize_ticker, _standardize_ohlcv_columns
+from .event_jump import run_event_jump
+from .snapshot import snapshot_tail_bars
+from .trader import TickerTraderStep1
+from .types import TradeEvent
+from .universe import _config_for
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+# -- readers ---------------------------------------------------------------------
+def iter_csv_bars(
+    csv_path: str | Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    datetime_col: str = "Date",
+) -> Iterator[pd.DataFrame]:
+    """OHLCV blocks of a single-symbol CSV (columns as ``CsvProvider.fetch``)."""
+    enc, datetime_col, dtype = CsvProvider.layout(csv_path, datetime_col)
+    fmt = None
+    for block in iter_csv_typed(csv_path, list(dtype), dtype, chunk_rows, encoding=enc):
+        if fmt is None:
+            fmt = infer_datetime_format(block[datetime_col].to_numpy(dtype=object))
+        block[datetime_col] = parse_datetimes(block[datetime_col], fmt)
+        yield _standardize_ohlcv_columns(block.set_index(datetime_col))
+
+
+def iter_panel_bars(
+    panel_csv_path: str | Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    symbols: Optional[Iterable[str]] = None,
+) -> Iterator[dict[str, pd.DataFrame]]:
+    """Blocks of a panel CSV split per ticker (keys as ``PanelCsvProvider.fetch_all``)."""
+    enc, dtype, names = PanelCsvProvider.layout(panel_csv_path)
+    date_col = next(c for c, n in names.items() if n == "Date")
+    wanted = None if symbols is None else {_normalize_ticker(x) for x in symbols}
+    fmt = None
+    for block in iter_csv_typed(panel_csv_path, list(dtype), dtype, chunk_rows, encoding=enc):
+        if fmt is None:
+            fmt = infer_datetime_format(block[date_col].to_numpy(dtype=object))
+        rows = PanelCsvProvider.normalize_rows(block, names, fmt)
+        out: dict[str, pd.DataFrame] = {}
+        for ticker, sub in rows.groupby("Ticker", sort=False):
+            key = str(ticker)
+            if wanted is not None and key.lstrip("0") not in wanted:
+                continue
+            sym = key.zfill(6) if key.isdigit() else key
+            out[sym] = PanelCsvProvider._to_frame(sub, sym, None, None).df
+        yield out
+
+
+# -- engine ----------------------------------------------------------------------
+class _CsvAppender:
+    """CSV written block by block: header with the first block, then appends."""
+
+    def __init__(self, path: Path, columns: list[str], index: bool):
+        self.path = path
+        self.columns = columns
+        self.index = index
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        first = self.rows == 0
+        df.to_csv(self.path, mode="w" if first else "a", header=first, index=self.index, encoding="utf-8")
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self.rows == 0:
+            empty = pd.DataFrame(columns=self.columns)
+            if self.index:
+                empty = empty.set_index(self.columns[0])
+            empty.to_csv(self.path, index=self.index, encoding="utf-8")
+
+
+def _rebase(trader: TickerTraderStep1, shift: int) -> None:
+    """Shift the trader's bar indices after ``shift`` leading bars were dropped."""
+    st = trader.state
+    if st.entry_index is not None:
+        st.entry_index -= shift
+    st.cooldown_until_index -= shift
+    trader.next_bar -= shift
+
+
+@dataclass(frozen=True)
+class ChunkedResult:
+    symbol: str
+    n_bars: int  # bars read
+    n_chunks: int
+    n_equity: int  # equity rows written
+    n_trades: int
+    final_equity: float
+    max_dd: float
+    equity_path: Optional[Path]
+    trades_path: Optional[Path]
+
+
+class ChunkedBacktest:
+    """Step-1 backtest of one symbol fed in time-ordered blocks.
+
+    ``output_dir=None`` keeps no outputs (summary figures only). After the
+    last block ``trader`` is in the same state as a full run's, on a short
+    data manager (e.g. for ``save_snapshot`` or ``plan_next_bar``).
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        strat_cfg: StrategyConfig,
+        ind_cfg: IndicatorConfig = IndicatorConfig(),
+        cost_cfg: CostConfig = CostConfig(),
+        bt_cfg: BacktestConfig = BacktestConfig(initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0),
+        output_dir: Optional[str | Path] = None,
+        jump: bool = True,
+    ):
+        self.symbol = symbol
+        self.strat_cfg = strat_cfg
+        self.ind_cfg = ind_cfg
+        self.cost_cfg = cost_cfg
+        self.bt_cfg = replace(bt_cfg, symbol=symbol)
+        self.jump = bool(jump)
+        self.dm: Optional[OhlcvDataManager] = None
+        self.trader: Optional[TickerTraderStep1] = None
+
+        self.n_bars = 0
+        self.n_chunks = 0
+        self.n_equity = 0
+        self.n_trades = 0
+        self.final_equity = float(self.bt_cfg.initial_equity)
+        self._peak = -np.inf
+        self._max_dd = float("nan")
+
+        self._eq_out = self._tr_out = None
+        if output_dir is not None:
+            stem = symbol.replace(".", "_")
+            out = Path(output_dir)
+            self._eq_out = _CsvAppender(out / f"equity_{stem}.csv", ["Date", "Equity"], index=True)
+            self._tr_out = _CsvAppender(out / f"trades_{stem}.csv", [f.name for f in fields(TradeEvent)], index=False)
+
+    def feed(self, bars: pd.DataFrame) -> int:
+        """Add the next block (every bar newer than the previous block); returns bars added."""
+        bars = bars[_OHLCV].astype(float)
+        bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+        if len(bars) == 0:
+            return 0
+        if self.dm is None:
+            self.dm = OhlcvDataManager(OhlcvFrame(df=bars, symbol=self.symbol), self.ind_cfg)
+            self.trader = TickerTraderStep1(dm=self.dm, strat_cfg=self.strat_cfg, cost_cfg=self.cost_cfg, bt_cfg=self.bt_cfg)
+            k = len(self.dm)
+        else:
+            last = self.dm.df.index[-1]
+            if bars.index[0] <= last:
+                raise ValueError(f"{self.symbol}: bar {bars.index[0]} is not after {last}; chunked input must be sorted by time")
+            k = self.dm.append(bars)
+        self.n_bars += k
+        self.n_chunks += 1
+
+        tr = self.trader
+        if self.jump:
+            run_event_jump(tr, start=tr.next_bar)
+        else:
+            tr.run_pending()
+        self._flush()
+
+        keep = snapshot_tail_bars(tr)
+        shift = len(self.dm) - keep
+        if shift > 0:
+            self.dm = self.dm.tail(keep)
+            tr.dm = self.dm
+            _rebase(tr, shift)
+        return k
+
+    def _flush(self) -> None:
+        tr = self.trader
+        if tr.equity_curve:
+            eq = pd.DataFrame(tr.equity_curve, columns=["Date", "Equity"]).set_index("Date")
+            x = eq["Equity"].to_numpy(dtype=float)
+            # running peak carried across blocks (same as metrics.max_drawdown)
+            peak = np.maximum.accumulate(np.concatenate([[self._peak], x]))[1:]
+            dd = 1.0 - (x / np.maximum(peak, np.finfo(float).tiny))
+            if np.isfinite(dd).any():
+                m = float(np.nanmax(dd))
+                self._max_dd = m if self._max_dd != self._max_dd else max(self._max_dd, m)
+            self._peak = float(peak[-1])
+            self.final_equity = float(x[-1])
+            self.n_equity += len(x)
+            if self._eq_out is not None:
+                self._eq_out.write(eq)
+            tr.equity_curve.clear()
+        if tr.trade_log:
+            self.n_trades += len(tr.trade_log)
+            if self._tr_out is not None:
+                self._tr_out.write(pd.DataFrame([asdict(x) for x in tr.trade_log]))
+            tr.trade_log.clear()
+
+    def finish(self) -> ChunkedResult:
+        """Close the output files and summarize (the last bar stays pending, as in a full run)."""
+        for w in (self._eq_out, self._tr_out):
+            if w is not None:
+                w.close()
+        return ChunkedResult(
+            symbol=self.symbol,
+            n_bars=self.n_bars,
+            n_chunks=self.n_chunks,
+            n_equity=self.n_equity,
+            n_trades=self.n_trades,
+            final_equity=self.final_equity,
+            max_dd=self._max_dd,
+            equity_path=self._eq_out.path if self._eq_out is not None else None,
+            trades_path=self._tr_out.path if self._tr_out is not None else None,
+        )
+
+
+# -- drivers ---------------------------------------------------------------------
+def run_chunked_csv(
+    csv_path: str | Path,
+    symbol: str,
+    strat_cfg: StrategyConfig,
+    ind_cfg: IndicatorConfig = IndicatorConfig(),
+    cost_cfg: CostConfig = CostConfig(),
+    output_dir: Optional[str | Path] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    datetime_col: str = "Date",
+) -> ChunkedResult:
+    """Backtest a single-symbol CSV ``chunk_rows`` rows at a time."""
+    bt = ChunkedBacktest(symbol, strat_cfg, ind_cfg, cost_cfg, output_dir=output_dir)
+    for block in iter_csv_bars(csv_path, chunk_rows, datetime_col):
+        bt.feed(block)
+    return bt.finish()
+
+
+def run_chunked_panel(
+    panel_csv_path: str | Path,
+    strat_cfg: StrategyConfig | Mapping[str, StrategyConfig],
+    ind_cfg: IndicatorConfig = IndicatorConfig(),
+    cost_cfg: CostConfig = CostConfig(),
+    output_dir: Optional[str | Path] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    symbols: Optional[Iterable[str]] = None,
+) -> dict[str, ChunkedResult]:
+    """Backtest every ticker of a panel CSV in one streaming pass.
+
+    ``strat_cfg`` may map tickers to configs (tickers without one are skipped).
+    Works for panels grouped by ticker as well as by date.
+    """
+    engines: dict[str, Optional[ChunkedBacktest]] = {}
+    for block in iter_panel_bars(panel_csv_path, chunk_rows, symbols):
+        for sym, bars in block.items():
+            if sym not in engines:
+                cfg = _config_for(strat_cfg, sym)
+                engines[sym] = None if cfg is None else ChunkedBacktest(sym, cfg, ind_cfg, cost_cfg, output_dir=output_dir)
+            bt = engines[sym]
+            if bt is not None:
+                bt.feed(bars)
+    return {sym: bt.finish() for sym, bt in engines.items() if bt is not None}
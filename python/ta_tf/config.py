@@ -170,3 +170,7 @@ class BacktestConfig:
 
     # Legacy normalized mode (kept for compatibility)
     initial_equity: float = 1.0
+
+    # Cash bookkeeping: "FLOAT" (default) or "KRW" (int won cash, tick-grid
+    # fills, fees/tax/borrow truncated to the won; see ta_tf.accounting)
+    accounting: str = "FLOAT"
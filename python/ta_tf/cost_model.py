@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
+from fractions import Fraction
 from math import exp
 
 from .config import CostConfig
@@ -43,3 +44,10 @@ class KRXCostModel:
         if day_count <= 0:
             day_count = 365.0
         return float(self.cfg.short_borrow_annual_rate) / day_count
+
+    def short_borrow_daily_fraction(self) -> Fraction:
+        """Exact daily borrow rate (decimal annual rate / day count) for KRW accounting."""
+        day_count = int(getattr(self.cfg, "short_borrow_day_count", 365))
+        if day_count <= 0:
+            day_count = 365
+        return Fraction(repr(float(self.cfg.short_borrow_annual_rate))) / day_count
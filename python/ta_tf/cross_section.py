@@ -0,0 +1,373 @@
+"""Cross-sectional Step-1 engine: all symbols of a universe advanced together.
+
+``TickerTraderStep1`` steps one symbol at a time. ``CrossSectionEngine``
+holds time x symbol matrices of prices and decision inputs (the arrays of
+``event_jump.decision_arrays``) plus one position/cash state array per field,
+and processes one bar of the union calendar for every symbol at once: extrema,
+forced cover, intrabar stops, target transitions, fills, pyramiding, borrow
+accrual and valuation are NumPy operations over the symbol axis. Only the
+trade log is built per fill.
+
+Each symbol keeps its own bar numbering (listings and halts differ), capital
+sleeve and StrategyConfig, and the float operations are those of the trader,
+so equity curves and trade logs are identical to per-symbol runs. Float
+accounting only (``accounting="KRW"`` stays on the per-symbol trader).
+"""
+
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .accounting import equity_value
+from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from .cost_model import KRXCostModel
+from .data_manager import OhlcvDataManager
+from .data_provider import OhlcvFrame
+from .event_jump import decision_arrays
+from .metrics import _day_numbers
+from .types import TradeEvent
+
+
+class CrossSectionEngine:
+    """Step-1 traders for many symbols, stepped bar by bar over the union calendar."""
+
+    def __init__(
+        self,
+        dms: Sequence[OhlcvDataManager],
+        strat_cfg: StrategyConfig | Mapping[str, StrategyConfig],
+        cost_cfg: CostConfig = CostConfig(),
+        bt_cfg: BacktestConfig = BacktestConfig(),
+    ):
+        if str(bt_cfg.accounting).upper() != "FLOAT":
+            raise ValueError("CrossSectionEngine supports accounting='FLOAT' only.")
+        self.dms = list(dms)
+        self.symbols = [dm.symbol for dm in self.dms]
+        self.cfgs = [strat_cfg[s] if isinstance(strat_cfg, Mapping) else strat_cfg for s in self.symbols]
+        self.cost_cfg = cost_cfg
+        self.bt_cfg = bt_cfg
+        S = len(self.dms)
+
+        # Union calendar and per-symbol bar index (-1: no bar that day).
+        self.index = pd.DatetimeIndex([])
+        for dm in self.dms:
+            self.index = self.index.union(dm.df.index)
+        T = len(self.index)
+        self.loc = np.full((T, S), -1, dtype=np.int64)
+        self.n_bars = np.array([len(dm) for dm in self.dms], dtype=np.int64)
+        for j, dm in enumerate(self.dms):
+            self.loc[self.index.get_indexer(dm.df.index), j] = np.arange(len(dm))
+        # step(t) acts for 2 <= t <= n-2
+        self.stepable = (self.loc >= 2) & (self.loc <= self.n_bars[None, :] - 2)
+        self.day = _day_numbers(self.index)
+
+        def gather(arrays: list[np.ndarray], fill) -> np.ndarray:
+            out = np.full((T, S), fill, dtype=np.asarray(arrays[0]).dtype if arrays else float)
+            for j, a in enumerate(arrays):
+                rows = self.loc[:, j] >= 0
+                out[rows, j] = a[self.loc[rows, j]]
+            return out
+
+        cols = {c: [dm.column(c) for dm in self.dms] for c in ("Open", "High", "Low", "Close")}
+        self.O, self.H, self.L, self.C = (gather(cols[c], np.nan) for c in ("Open", "High", "Low", "Close"))
+        self.next_open = gather([np.append(a[1:], np.nan) for a in cols["Open"]], np.nan)
+        arrs = [decision_arrays(dm, cfg) for dm, cfg in zip(self.dms, self.cfgs)]
+        self.valid = gather([a.valid for a in arrs], False)
+        self.long_entry = gather([a.long_entry for a in arrs], False)
+        self.short_entry = gather([a.short_entry for a in arrs], False)
+        self.long_exit = gather([a.long_exit for a in arrs], False)
+        self.short_exit = gather([a.short_exit for a in arrs], False)
+
+        # Per-symbol parameters.
+        def param(f) -> np.ndarray:
+            return np.array([f(c) for c in self.cfgs])
+
+        self.long_daily_stop = param(lambda c: float(c.long_daily_stop))
+        self.long_trail_stop = param(lambda c: float(c.long_trail_stop))
+        self.short_daily_stop = param(lambda c: float(c.short_daily_stop))
+        self.short_trail_stop = param(lambda c: float(c.short_trail_stop))
+        self.cooldown_bars = param(lambda c: max(0, int(c.cooldown_bars))).astype(np.int64)
+        self.min_hold_bars = param(lambda c: max(0, int(c.min_hold_bars))).astype(np.int64)
+        self.max_units = param(lambda c: max(1, int(c.max_units))).astype(np.int64)
+        self.pyramid_step_return = param(lambda c: float(c.pyramid_step_return))
+
+        cm = KRXCostModel(cost_cfg)
+        self._buy = cm.transaction_cost_rates("BUY")
+        self._sell = cm.transaction_cost_rates("SELL")
+        self._borrow_daily = float(cm.short_borrow_daily_rate())
+        self._close_valuation = str(bt_cfg.valuation_mode).upper() == "CLOSE"
+        self.initial_capital = float(bt_cfg.initial_capital)
+        self.initial_equity = float(bt_cfg.initial_equity)
+        self._base = self.initial_capital if self.initial_capital > 0 else 1.0
+
+        # Position state (one slot per symbol).
+        self.pos = np.zeros(S, dtype=np.int64)
+        self.units = np.zeros(S, dtype=np.int64)
+        self.position_frac = np.ones(S)
+        self.entry_price = np.full(S, np.nan)
+        self.entry_day = np.full(S, -1, dtype=np.int64)  # -1: entry_time is None
+        self.entry_index = np.full(S, -1, dtype=np.int64)  # -1: entry_index is None
+        self.hist_max = np.full(S, -np.inf)
+        self.hist_min = np.full(S, np.inf)
+        self.cooldown_until = np.full(S, -1, dtype=np.int64)
+        self.cash = np.full(S, self.initial_capital)
+        self.shares = np.zeros(S, dtype=np.int64)
+
+        self.equity = np.full((T, S), np.nan)  # recorded equity per (bar, symbol)
+        self.trade_logs: list[list[TradeEvent]] = [[] for _ in range(S)]
+        self.next_bar = 0  # first union bar not processed
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Sequence[OhlcvFrame],
+        strat_cfg: StrategyConfig | Mapping[str, StrategyConfig],
+        ind_cfg: IndicatorConfig = IndicatorConfig(),
+        cost_cfg: CostConfig = CostConfig(),
+        bt_cfg: BacktestConfig = BacktestConfig(),
+    ) -> "CrossSectionEngine":
+        return cls([OhlcvDataManager(fr, ind_cfg) for fr in frames if len(fr.df)], strat_cfg, cost_cfg, bt_cfg)
+
+    # -- decisions -----------------------------------------------------------
+    def decide(self, g: int, t: Optional[np.ndarray] = None) -> np.ndarray:
+        """Target position of every symbol at union bar ``g`` (``decision_codegen.decision_source``
+        on the current state; meaningful where ``valid[g]``)."""
+        if t is None:
+            t = self.loc[g]
+        pos = self.pos
+        flat = np.where(
+            t <= self.cooldown_until,
+            0,
+            np.where(self.long_entry[g], 1, np.where(self.short_entry[g], -1, 0)),
+        )
+        held = np.where(self.entry_index >= 0, t - self.entry_index, 0)
+        can_exit = held >= self.min_hold_bars
+        long_t = np.where(can_exit & self.long_exit[g], 0, 1)
+        short_t = np.where(can_exit & self.short_exit[g], 0, -1)
+        return np.where(pos == 0, flat, np.where(pos == 1, long_t, short_t))
+
+    # -- execution -----------------------------------------------------------
+    def _flatten(self, g: int, mask: np.ndarray, price: np.ndarray, reason: str | np.ndarray) -> None:
+        """``_exit_all`` for ``mask`` at ``price`` (fills where shares != 0; state reset everywhere)."""
+        idx = np.flatnonzero(mask)
+        if len(idx) == 0:
+            return
+        sh = self.shares[idx]
+        filled = sh != 0
+        long_side = self.pos[idx] == 1
+        qty_abs = np.abs(sh)
+        px = price[idx]
+        notional = qty_abs.astype(float) * px
+        fee_rate = np.where(long_side, self._sell.fee_rate, self._buy.fee_rate)
+        tax_rate = np.where(long_side, self._sell.tax_rate, self._buy.tax_rate)
+        fee = fee_rate * notional
+        tax = tax_rate * notional
+        cash = self.cash[idx]
+        new_cash = np.where(long_side, cash + (notional - fee - tax), cash - (notional + fee + tax))
+        self.cash[idx] = np.where(filled, new_cash, cash)
+        self.shares[idx] = 0
+
+        t = self.loc[g, idx]
+        for k in np.flatnonzero(filled):
+            j = int(idx[k])
+            self.trade_logs[j].append(
+                TradeEvent(
+                    timestamp=self.dms[j].get_bar_timestamp(int(t[k])),
+                    symbol=self.symbols[j],
+                    side="SELL" if long_side[k] else "BUY",
+                    reason=reason if isinstance(reason, str) else str(reason[j]),
+                    price=float(px[k]),
+                    position_after=0,
+                    units_after=0,
+                    fee_paid=float(fee[k]),
+                    tax_paid=float(tax[k]),
+                    qty=int(-qty_abs[k] if long_side[k] else qty_abs[k]),
+                    notional=float(notional[k]),
+                    cash_after=float(self.cash[j]),
+                    # flat now, but valued at the fill price like the trader (a NaN price stays NaN)
+                    equity_after=float(self.initial_equity * (equity_value(self.cash[j], 0, px[k]) / self._base)),
+                )
+            )
+
+        self.pos[idx] = 0
+        self.units[idx] = 0
+        self.position_frac[idx] = 1.0
+        self.entry_price[idx] = np.nan
+        self.entry_day[idx] = -1
+        self.entry_index[idx] = -1
+        self.hist_max[idx] = -np.inf
+        self.hist_min[idx] = np.inf
+        self.cooldown_until[idx] = t + self.cooldown_bars[idx]
+
+    def _rebalance(self, g: int, idx: np.ndarray, frac: np.ndarray, target: np.ndarray, reason: str) -> None:
+        """``_execute_rebalance`` for symbols ``idx`` (state.units already updated)."""
+        if len(idx) == 0:
+            return
+        px = self.O[g, idx]
+        frac = np.where(frac > 0.0, frac, 0.0)
+        frac = np.where(frac < 1.0, frac, 1.0)
+        frac = np.where(frac > 0.0, frac, 0.0)
+        cash = self.cash[idx]
+        sh = self.shares[idx]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            alloc = (cash + sh.astype(float) * px) * frac
+            ok = np.isfinite(px) & (px > 0) & (alloc > 0)
+            q = np.floor_divide(alloc, np.where(ok, px, 1.0))
+        qty_abs = np.where(ok, q, 0.0).astype(np.int64)
+        ok &= qty_abs > 0
+        buy = target == 1
+        notional = qty_abs.astype(float) * px
+        fee_rate = np.where(buy, self._buy.fee_rate, self._sell.fee_rate)
+        tax_rate = np.where(buy, self._buy.tax_rate, self._sell.tax_rate)
+        fee = fee_rate * notional
+        tax = tax_rate * notional
+        new_cash = np.where(buy, cash - (notional + fee + tax), cash + (notional - fee - tax))
+        new_sh = np.where(buy, sh + qty_abs, sh - qty_abs)
+        self.cash[idx] = np.where(ok, new_cash, cash)
+        self.shares[idx] = np.where(ok, new_sh, sh)
+        new_sh = self.shares[idx]
+        self.pos[idx] = np.where(ok, np.where(new_sh != 0, np.sign(new_sh), target), self.pos[idx])
+
+        t = self.loc[g, idx]
+        for k in np.flatnonzero(ok):
+            j = int(idx[k])
+            p = float(px[k])
+            self.trade_logs[j].append(
+                TradeEvent(
+                    timestamp=self.dms[j].get_bar_timestamp(int(t[k])),
+                    symbol=self.symbols[j],
+                    side="BUY" if buy[k] else "SELL",
+                    reason=reason,
+                    price=p,
+                    position_after=int(self.pos[j]),
+                    units_after=int(self.units[j]),
+                    fee_paid=float(fee[k]),
+                    tax_paid=float(tax[k]),
+                    qty=int(qty_abs[k] if buy[k] else -qty_abs[k]),
+                    notional=float(notional[k]),
+                    cash_after=float(self.cash[j]),
+                    equity_after=float(self.initial_equity * (equity_value(self.cash[j], self.shares[j], p) / self._base)),
+                )
+            )
+
+    # -- bar loop --------------------------------------------------------------
+    def step(self, g: int) -> None:
+        """Process union bar ``g`` for every symbol that has a steppable bar there."""
+        act = self.stepable[g]
+        self.next_bar = g + 1
+        if not act.any():
+            return
+        t = self.loc[g]
+        O, H, L, C = self.O[g], self.H[g], self.L[g], self.C[g]
+        pos = self.pos
+
+        # 2) extrema (Python max/min: the first argument wins ties and NaN comparisons)
+        with np.errstate(invalid="ignore"):
+            oc_max = np.where(C > O, C, O)
+            oc_min = np.where(C < O, C, O)
+            up = act & (pos == 1) & (oc_max > self.hist_max)
+            dn = act & (pos == -1) & (oc_min < self.hist_min)
+        self.hist_max[up] = oc_max[up]
+        self.hist_min[dn] = oc_min[dn]
+
+        done = np.zeros_like(act)
+        # 2.5) forced cover of shorts held too long
+        if self.cost_cfg.enforce_short_max_hold:
+            forced = act & (pos == -1) & (self.entry_day >= 0)
+            forced &= (self.day[g] - self.entry_day) >= int(self.cost_cfg.short_max_hold_days)
+            self._flatten(g, forced, O, "FORCED_COVER_MAXHOLD")
+            done |= forced
+
+        # 3) intrabar stops
+        cand = act & ~done & (self.pos != 0) & (self.units != 0)
+        if cand.any():
+            with np.errstate(invalid="ignore"):
+                l_daily = O * (1.0 - self.long_daily_stop)
+                l_trail = self.hist_max * (1.0 - self.long_trail_stop)
+                l_px = np.where(l_trail > l_daily, l_trail, l_daily)
+                s_daily = O * (1.0 + self.short_daily_stop)
+                s_trail = self.hist_min * (1.0 + self.short_trail_stop)
+                s_px = np.where(s_trail < s_daily, s_trail, s_daily)
+                is_long = self.pos == 1
+                hit = cand & np.where(is_long, L <= l_px, H >= s_px)
+            if hit.any():
+                self._flatten(g, hit, np.where(is_long, l_px, s_px), np.where(is_long, "STOP:LONG", "STOP:SHORT"))
+                done |= hit
+
+        # 4) prev-bar context
+        live = act & ~done & self.valid[g]
+
+        # 5-6) targets at Open(t)
+        if live.any():
+            target = self.decide(g, t)
+            change = live & (target != self.pos)
+            self._flatten(g, change & (self.pos != 0), O, "SignalExit")
+            enter = change & (target != 0)
+            if enter.any():
+                e = np.flatnonzero(enter)
+                self.pos[e] = target[e]
+                self.units[e] = 1
+                self.position_frac[e] = 1 / self.max_units[e]
+                self.entry_price[e] = O[e]
+                self.entry_day[e] = self.day[g]
+                self.entry_index[e] = t[e]
+                self.hist_max[e] = -np.inf
+                self.hist_min[e] = np.inf
+                with np.errstate(invalid="ignore"):
+                    self.hist_max[e] = np.where((target[e] == 1) & (O[e] > -np.inf), O[e], self.hist_max[e])
+                    self.hist_min[e] = np.where((target[e] == -1) & (O[e] < np.inf), O[e], self.hist_min[e])
+                self._rebalance(g, e, self.position_frac[e].copy(), target[e], "SignalEntry")
+
+            # pyramiding
+            add = live & (self.pos != 0) & (self.units < self.max_units) & (self.entry_price == self.entry_price)
+            if add.any():
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    ep_r = self.pos.astype(float) * (O / self.entry_price - 1.0)
+                add &= ep_r >= self.pyramid_step_return
+                a = np.flatnonzero(add)
+                if len(a):
+                    old = self.position_frac[a].copy()
+                    self.units[a] += 1
+                    self.position_frac[a] = self.units[a] / self.max_units[a]
+                    self._rebalance(g, a, self.position_frac[a] - old, self.pos[a].copy(), "PyramidAdd")
+
+            # 7) short borrow accrual
+            borrow = live & (self.shares < 0) & np.isfinite(C)
+            if borrow.any():
+                self.cash[borrow] -= np.abs(self.shares[borrow]).astype(float) * C[borrow] * self._borrow_daily
+
+        # 8) valuation: close for early exits, else by valuation mode
+        P = C if self._close_valuation else np.where(live, self.next_open[g], C)
+        v = self.cash + self.shares.astype(float) * P
+        self.equity[g, act] = (self.initial_equity * (v / self._base))[act]
+
+    def run(self, end=None) -> None:
+        """Process the remaining bars up to ``end`` (inclusive; None = all)."""
+        stop = len(self.index) if end is None else int(self.index.searchsorted(pd.Timestamp(end), side="right"))
+        for g in range(self.next_bar, stop):
+            self.step(g)
+
+    # -- results -------------------------------------------------------------
+    def equity_curve(self, j: int) -> list[tuple]:
+        """``TickerTraderStep1.equity_curve`` of symbol ``j``."""
+        rows = np.flatnonzero(self.stepable[: self.next_bar, j])
+        return [(self.dms[j].get_bar_timestamp(int(self.loc[g, j])), float(self.equity[g, j])) for g in rows]
+
+    def equity_frame(self) -> pd.DataFrame:
+        """Recorded equity, union calendar x symbol (NaN where a symbol has no step)."""
+        eq = np.where(self.stepable, self.equity, np.nan)
+        eq[self.next_bar :] = np.nan
+        return pd.DataFrame(eq, index=self.index, columns=self.symbols)
+
+    def portfolio_equity(self, weights: Optional[Sequence[float]] = None) -> pd.Series:
+        """Equity of a portfolio of fixed capital sleeves (equal by default), each
+        symbol's normalized equity carried forward over days without a bar."""
+        S = len(self.symbols)
+        w = np.full(S, 1.0 / max(1, S)) if weights is None else np.asarray(weights, dtype=float)
+        eq = self.equity_frame().ffill().fillna(self.initial_equity).iloc[: self.next_bar]
+        return pd.Series(eq.to_numpy() @ w, index=eq.index, name="Equity")
+
+    def trade_log(self, j: int) -> list[TradeEvent]:
+        return self.trade_logs[j]
@@ -0,0 +1,158 @@
+"""CSV ingest with explicit schemas.
+
+Reads only the requested columns with fixed dtypes, parses timestamps with a
+format detected once from the first values (instead of per-element
+inference) and detects the encoding from the BOM or a byte sample: the
+bundled panel CSV is cp949 (Korean ``Name`` column), the intraday export is
+UTF-8 with a BOM.
+
+``engine="auto"`` uses pandas' ``pyarrow`` engine (multithreaded) when
+``pyarrow`` is installed and the C parser otherwise. For integer-valued
+prices both engines give identical floats; arbitrary decimals may differ in
+the last ulp between them.
+
+``iter_csv_typed`` reads the same way in fixed-size row blocks, for files that
+should not be held in memory at once (see ``ta_tf.chunked``).
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Mapping, Optional, Sequence
+
+import pandas as pd
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_ASCII_SUPERSETS = {"utf-8", "cp949", "euc_kr", "iso8859-1", "ascii"}
+# Tried in order on a byte sample; latin-1 accepts anything.
+_FALLBACK_ENCODINGS = ("utf-8", "cp949", "latin-1")
+
+_DATETIME_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S.%f%z",
+    "%Y/%m/%d",
+    "%Y%m%d",
+)
+
+
+def detect_encoding(path: str | Path, sample_bytes: int = 1 << 16) -> str:
+    """Encoding of a text file from its BOM, else the first codec that decodes a sample."""
+    with open(path, "rb") as f:
+        head = f.read(int(sample_bytes))
+    for bom, enc in _BOMS:
+        if head.startswith(bom):
+            return enc
+    for enc in _FALLBACK_ENCODINGS:
+        try:
+            # incremental decode: a multi-byte char cut at the sample end is not an error
+            codecs.getincrementaldecoder(enc)().decode(head, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def read_csv_header(path: str | Path, encoding: Optional[str] = None) -> list[str]:
+    """Column names of a CSV (first line only)."""
+    enc = encoding or detect_encoding(path)
+    with open(path, "r", encoding=enc, newline="") as f:
+        line = f.readline()
+    return next(csv.reader(io.StringIO(line)), [])
+
+
+def infer_datetime_format(values: Sequence, n: int = 20) -> Optional[str]:
+    """First format in a fixed list that parses the first ``n`` non-empty values."""
+    sample = [str(v).strip() for v in values[: max(1, n) * 4] if isinstance(v, str) and v.strip()][:n]
+    if not sample:
+        return None
+    for fmt in _DATETIME_FORMATS:
+        try:
+            for v in sample:
+                datetime.strptime(v, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def parse_datetimes(values: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+    """``pd.to_datetime`` with a fixed (given or detected) format; falls back to inference."""
+    fmt = fmt or infer_datetime_format(values.to_numpy(dtype=object))
+    if fmt is not None:
+        try:
+            return pd.to_datetime(values, format=fmt)
+        except (ValueError, TypeError):
+            pass
+    return pd.to_datetime(values)
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    if engine != "auto":
+        return engine
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def read_csv_typed(
+    path: str | Path,
+    usecols: Sequence[str],
+    dtype: Mapping[str, object],
+    encoding: Optional[str] = None,
+    engine: str = "auto",
+) -> pd.DataFrame:
+    """``pd.read_csv`` restricted to ``usecols`` with explicit dtypes (no inference)."""
+    enc = encoding or detect_encoding(path)
+    usecols, dtype, engine = list(usecols), dict(dtype), resolve_engine(engine)
+    if engine == "c" and codecs.lookup(enc).name in _ASCII_SUPERSETS and all(str(c).isascii() for c in usecols):
+        # Delimiters, quotes and newlines never occur inside multi-byte chars of
+        # these codecs, so latin-1 splits fields the same way and decodes ASCII
+        # fields identically - much cheaper than decoding dropped text columns.
+        df = pd.read_csv(path, usecols=usecols, dtype=dtype, encoding="latin-1", engine=engine)
+        text = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+        if all(_is_ascii(df[c]) for c in text):
+            return df
+    return pd.read_csv(path, usecols=usecols, dtype=dtype, encoding=enc, engine=engine)
+
+
+def iter_csv_typed(
+    path: str | Path,
+    usecols: Sequence[str],
+    dtype: Mapping[str, object],
+    chunk_rows: int,
+    encoding: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """``read_csv_typed`` in blocks of ``chunk_rows`` rows (C parser; pyarrow cannot stream)."""
+    enc = encoding or detect_encoding(path)
+    reader = pd.read_csv(
+        path, usecols=list(usecols), dtype=dict(dtype), encoding=enc, engine="c", chunksize=max(1, int(chunk_rows))
+    )
+    with reader:
+        yield from reader
+
+
+def _is_ascii(values: pd.Series) -> bool:
+    return all(v.isascii() for v in pd.unique(values.dropna()) if isinstance(v, str))
+
+
+def strip_strings(values: pd.Series) -> pd.Series:
+    """``values.astype(str).str.strip()``, evaluated once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    stripped = pd.Index(uniques).astype(str).str.strip()
+    return pd.Series(stripped.take(codes, allow_fill=True, fill_value=None), index=values.index, name=values.name)
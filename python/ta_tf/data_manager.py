@@ -1,129 +1,364 @@
 """Data manager: computes indicators and provides prev-context.
 
 This mimics `ticker_data_manager.get_ctx_prev(t)` in the MATLAB code.
+
+Indicators are built per group (``INDICATOR_GROUPS``) on first use: a trader
+requires the groups its StrategyConfig reads (``ta_tf.indicator_plan``), and
+``column`` builds a missing group on access. Groups nobody uses (e.g. ATR with
+``use_atr_filter=False``) are never computed, appended or snapshotted.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
 import numpy as np
 import pandas as pd
 
 from .config import IndicatorConfig
-from .data_provider import OhlcvFrame
-from .indicators import atr as atr_func, macd as macd_func
+from .data_provider import BarWindow, OhlcvFrame, resolve_window
+from .indicators import atr as atr_func, ema, ema_continue, ema_state
 from .types import PrevContext
 
 
+_OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# Columns built together; "sma" is read by every decision (context validity).
+INDICATOR_GROUPS: dict[str, tuple[str, ...]] = {
+    "sma": ("smaWeek", "smaFast", "smaSlow"),
+    "atr": ("atr",),
+    "trend": ("smaLongTerm", "longTermTrend"),
+    "macd": ("macdLine", "macdSignal", "macdHist"),
+}
+_GROUP_OF = {c: g for g, cols in INDICATOR_GROUPS.items() for c in cols}
+
+
 class OhlcvDataManager:
     """Holds OHLCV and indicator series for a single symbol."""
 
-    def __init__(self, frame: OhlcvFrame, ind_cfg: IndicatorConfig):
+    def __init__(self, frame: OhlcvFrame, ind_cfg: IndicatorConfig, indicators: Iterable[str] = ()):
+        """``indicators``: groups to build now; the others are built on first use."""
         self.symbol = frame.symbol
-        self.df = frame.df.copy()
         self.ind_cfg = ind_cfg
+        # ensure strictly increasing index
+        df = frame.df.copy()
+        self.df = df[~df.index.duplicated(keep="last")].sort_index()
+        self._ema_state: dict = {}
+        # full history: a missing group can still be built exactly (not so on a tail)
+        self._complete = True
+        self._cache_arrays()
+        self.require(indicators)
 
-        self._compute_indicators()
+    def require(self, groups: Iterable[str]) -> None:
+        """Build the given indicator groups (no-op for groups already built)."""
+        todo = [g for g in groups if g not in self._groups]
+        if not todo:
+            return
+        for g in todo:
+            if g not in INDICATOR_GROUPS:
+                raise ValueError(f"Unknown indicator group: {g!r} (expected one of {sorted(INDICATOR_GROUPS)})")
+        if not self._complete:
+            raise ValueError(
+                f"{self.symbol}: indicator groups {todo} were not built before the history was cut "
+                "(tail / snapshot); build them on the full history first"
+            )
+        for g in dict.fromkeys(todo):
+            for c, v in getattr(self, f"_build_{g}")().items():
+                self.df[c] = v
+                self._arr[c] = v if c == "longTermTrend" else np.asarray(v, dtype=float)
+            self._groups.add(g)
+        self._ctx_memo = (-1, None)
 
-    def _compute_indicators(self) -> None:
-        df = self.df
+    # MATLAB prototype uses movmean(x, [N-1 0], "omitnan"), which yields
+    # partial-window values from the first bar. Mirror that with min_periods=1.
+    def _build_sma(self) -> dict[str, np.ndarray]:
+        close = self.df["Close"]
         cfg = self.ind_cfg
+        return {
+            "smaWeek": close.rolling(cfg.sma_week, min_periods=1).mean().to_numpy(),
+            "smaFast": close.rolling(cfg.sma_fast, min_periods=1).mean().to_numpy(),
+            "smaSlow": close.rolling(cfg.sma_slow, min_periods=1).mean().to_numpy(),
+        }
 
-        close = df["Close"]
-
-        # MATLAB prototype uses movmean(x, [N-1 0], "omitnan"), which yields
-        # partial-window values from the first bar. Mirror that with min_periods=1.
-        self.df["smaWeek"] = close.rolling(cfg.sma_week, min_periods=1).mean()
-        self.df["smaFast"] = close.rolling(cfg.sma_fast, min_periods=1).mean()
-        self.df["smaSlow"] = close.rolling(cfg.sma_slow, min_periods=1).mean()
-        self.df["smaLongTerm"] = close.rolling(cfg.sma_long_term, min_periods=1).mean()
-        self.df["atr"] = atr_func(df, cfg.atr_window)
+    def _build_atr(self) -> dict[str, np.ndarray]:
+        return {"atr": atr_func(self.df, self.ind_cfg.atr_window).to_numpy()}
 
+    def _build_trend(self) -> dict[str, np.ndarray]:
         # long-term trend: compare smaLongTerm(t) with smaLongTerm(t - lookback)
+        cfg = self.ind_cfg
         lb = cfg.long_trend_lookback
-        sma_lt = self.df["smaLongTerm"]
+        sma_lt = self.df["Close"].rolling(cfg.sma_long_term, min_periods=1).mean()
         diff = sma_lt - sma_lt.shift(lb)
         trend = np.where(diff > 0, 1, np.where(diff < 0, -1, 0)).astype(np.int8)
         # invalidate where either side is nan
         invalid = (~np.isfinite(sma_lt.to_numpy())) | (~np.isfinite(sma_lt.shift(lb).to_numpy()))
         trend[invalid] = 0
-        self.df["longTermTrend"] = trend
+        return {"smaLongTerm": sma_lt.to_numpy(), "longTermTrend": trend}
 
-        macd_line, macd_sig, macd_hist = macd_func(df, cfg.macd_fast, cfg.macd_slow, cfg.macd_signal)
-        self.df["macdLine"] = macd_line
-        self.df["macdSignal"] = macd_sig
-        self.df["macdHist"] = macd_hist
+    def _build_macd(self) -> dict[str, np.ndarray]:
+        # Same computation as indicators.macd(); the EMAs are kept separately
+        # so append() can continue the recursion from the saved state.
+        cfg = self.ind_cfg
+        close_f = self.df["Close"].astype(float)
+        ema_fast = ema(close_f, cfg.macd_fast)
+        ema_slow = ema(close_f, cfg.macd_slow)
+        macd_line = ema_fast - ema_slow
+        macd_sig = ema(macd_line, cfg.macd_signal)
+        self._ema_state = {
+            "fast": ema_state(close_f.to_numpy(), ema_fast.to_numpy(), cfg.macd_fast),
+            "slow": ema_state(close_f.to_numpy(), ema_slow.to_numpy(), cfg.macd_slow),
+            "signal": ema_state(macd_line.to_numpy(), macd_sig.to_numpy(), cfg.macd_signal),
+        }
+        return {
+            "macdLine": macd_line.to_numpy(),
+            "macdSignal": macd_sig.to_numpy(),
+            "macdHist": (macd_line - macd_sig).to_numpy(),
+        }
 
-        # ensure strictly increasing index
-        self.df = self.df[~self.df.index.duplicated(keep="last")].sort_index()
+    def _cache_arrays(self, py_ts: Optional[list] = None) -> None:
+        """Cache column arrays so per-bar access is a plain offset lookup.
+
+        ``py_ts``: precomputed ``datetime`` list of the index (shared, read-only).
+        """
+        self._arr = {c: self.df[c].to_numpy(dtype=float) for c in self.df.columns if c != "longTermTrend"}
+        if "longTermTrend" in self.df.columns:
+            self._arr["longTermTrend"] = self.df["longTermTrend"].to_numpy()
+        self._groups = {g for g, cols in INDICATOR_GROUPS.items() if all(c in self._arr for c in cols)}
+        self._ts = self.df.index
+        self._py_ts = list(self._ts.to_pydatetime()) if py_ts is None else py_ts
+        # last context built: traders stepping the same bar share it
+        self._ctx_memo: tuple[int, Optional[PrevContext]] = (-1, None)
 
     def __len__(self) -> int:
         return int(len(self.df))
 
+    # ---------- incremental update / snapshot ----------
+
+    def history_bars(self) -> int:
+        """Trailing bars needed to extend every built indicator to a new bar."""
+        cfg = self.ind_cfg
+        need = [2]
+        if "sma" in self._groups:
+            need += [cfg.sma_week, cfg.sma_fast, cfg.sma_slow]
+        if "atr" in self._groups:
+            need.append(cfg.atr_window + 1)
+        if "trend" in self._groups:
+            need += [cfg.sma_long_term, cfg.long_trend_lookback + 1]
+        return int(max(need))
+
+    def append(self, bars: pd.DataFrame) -> int:
+        """Append bars newer than the last timestamp and extend the indicators.
+
+        Only the built indicator groups are extended, and only the trailing
+        ``history_bars()`` rows are touched: rolling means are recomputed on
+        that tail and the MACD EMAs continue from their saved recursion
+        state. For prices on an integer tick grid (KRX) the result is
+        bit-identical to rebuilding the manager on the full history; for
+        arbitrary floats rolling sums may differ in the last ulp.
+        Returns the number of bars appended (re-sent bars are ignored).
+        """
+        new = bars[_OHLCV].astype(float)
+        new = new[~new.index.duplicated(keep="last")].sort_index()
+        if len(self.df):
+            new = new.iloc[int(new.index.searchsorted(self.df.index[-1], side="right")) :]
+        k = int(len(new))
+        if k == 0:
+            return 0
+
+        cfg = self.ind_cfg
+        g = self._groups
+        hist = self.df.iloc[-self.history_bars() :]
+        work = pd.concat([hist[_OHLCV], new])
+        close = work["Close"]
+
+        rows = new.copy()
+        if "sma" in g:
+            rows["smaWeek"] = close.rolling(cfg.sma_week, min_periods=1).mean().to_numpy()[-k:]
+            rows["smaFast"] = close.rolling(cfg.sma_fast, min_periods=1).mean().to_numpy()[-k:]
+            rows["smaSlow"] = close.rolling(cfg.sma_slow, min_periods=1).mean().to_numpy()[-k:]
+        if "atr" in g:
+            rows["atr"] = atr_func(work, cfg.atr_window).to_numpy()[-k:]
+
+        if "trend" in g:
+            rows["smaLongTerm"] = close.rolling(cfg.sma_long_term, min_periods=1).mean().to_numpy()[-k:]
+            lb = int(cfg.long_trend_lookback)
+            sma_lt = np.concatenate([hist["smaLongTerm"].to_numpy(dtype=float), rows["smaLongTerm"].to_numpy()])
+            pos = np.arange(len(hist), len(sma_lt)) - lb
+            cur = sma_lt[-k:]
+            prev = np.where(pos >= 0, sma_lt[np.maximum(pos, 0)], np.nan)
+            diff = cur - prev
+            trend = np.where(diff > 0, 1, np.where(diff < 0, -1, 0)).astype(np.int8)
+            trend[(~np.isfinite(cur)) | (~np.isfinite(prev))] = 0
+            rows["longTermTrend"] = trend
+
+        if "macd" in g:
+            st = self._ema_state
+            new_close = new["Close"].to_numpy()
+            ema_fast, st_fast = ema_continue(new_close, cfg.macd_fast, st["fast"])
+            ema_slow, st_slow = ema_continue(new_close, cfg.macd_slow, st["slow"])
+            macd_line = ema_fast - ema_slow
+            macd_sig, st_sig = ema_continue(macd_line, cfg.macd_signal, st["signal"])
+            rows["macdLine"] = macd_line
+            rows["macdSignal"] = macd_sig
+            rows["macdHist"] = macd_line - macd_sig
+            self._ema_state = {"fast": st_fast, "slow": st_slow, "signal": st_sig}
+
+        self.df = pd.concat([self.df, rows[self.df.columns]])
+        self._cache_arrays()
+        return k
+
+    def tail(self, n_bars: int) -> "OhlcvDataManager":
+        """A manager holding only the last ``n_bars`` rows (indicators kept as-is).
+
+        Bar ``i`` of the tail is bar ``len(self) - len(tail) + i`` of ``self``.
+        Groups not built yet cannot be added to the tail later.
+        """
+        n_bars = max(int(n_bars), self.history_bars())
+        return OhlcvDataManager._from_parts(self.symbol, self.ind_cfg, self.df.iloc[-n_bars:].copy(), dict(self._ema_state))
+
+    @classmethod
+    def _from_parts(
+        cls,
+        symbol: str,
+        ind_cfg: IndicatorConfig,
+        df: pd.DataFrame,
+        ema_states: dict,
+        complete: bool = False,
+        py_ts: Optional[list] = None,
+    ) -> "OhlcvDataManager":
+        dm = cls.__new__(cls)
+        dm.symbol = symbol
+        dm.ind_cfg = ind_cfg
+        dm.df = df
+        dm._ema_state = ema_states
+        dm._complete = bool(complete)
+        dm._cache_arrays(py_ts)
+        return dm
+
+    def export_state(self) -> dict:
+        """JSON-friendly state (bars, indicator columns and EMA recursion state)."""
+        idx = self.df.index
+        tz = getattr(idx, "tz", None)
+        return {
+            "symbol": self.symbol,
+            "ind_cfg": asdict(self.ind_cfg),
+            "tz": str(tz) if tz is not None else None,
+            "index_name": idx.name,
+            "index_ns": [int(x) for x in pd.DatetimeIndex(idx).as_unit("ns").asi8],
+            "columns": {c: self.df[c].tolist() for c in self.df.columns},
+            "ema_state": {k: [float(v[0]), float(v[1])] for k, v in self._ema_state.items()},
+        }
+
+    @classmethod
+    def from_state(cls, d: dict) -> "OhlcvDataManager":
+        tz = d.get("tz")
+        if tz:
+            index = pd.to_datetime(d["index_ns"], utc=True).tz_convert(tz)
+        else:
+            index = pd.to_datetime(d["index_ns"])
+        df = pd.DataFrame(d["columns"], index=pd.DatetimeIndex(index, name=d.get("index_name")))
+        if "longTermTrend" in df.columns:
+            df["longTermTrend"] = df["longTermTrend"].astype(np.int8)
+        ema_states = {k: (float(v[0]), float(v[1])) for k, v in d["ema_state"].items()}
+        return cls._from_parts(d["symbol"], IndicatorConfig(**d["ind_cfg"]), df, ema_states)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only numpy view of an OHLCV/indicator column (built on first access)."""
+        a = self._arr.get(name)
+        if a is None:
+            if name not in _GROUP_OF:
+                raise KeyError(name)
+            self.require((_GROUP_OF[name],))
+            a = self._arr[name]
+        return a
+
+    def window(self, start=None, end=None) -> BarWindow:
+        """Bar offsets of the inclusive date window ``[start, end]``."""
+        return resolve_window(self._ts, start, end)
+
     def get_bar_timestamp(self, i: int) -> datetime:
-        return self.df.index[i].to_pydatetime()
+        return self._py_ts[i]
+
+    def get_bar_timestamps(self, start: int, stop: int) -> list[datetime]:
+        """Timestamps of bars ``[start, stop)`` (same objects as ``get_bar_timestamp``)."""
+        return self._py_ts[start:stop]
 
     def get_ohlc(self, i: int) -> tuple[float, float, float, float]:
-        row = self.df.iloc[i]
-        return float(row["Open"]), float(row["High"]), float(row["Low"]), float(row["Close"])
+        a = self._arr
+        return float(a["Open"][i]), float(a["High"][i]), float(a["Low"][i]), float(a["Close"][i])
 
     def get_open(self, i: int) -> float:
-        return float(self.df["Open"].iloc[i])
+        return float(self._arr["Open"][i])
 
     def get_prev_context(self, i: int) -> PrevContext:
         """Return indicator context based on previous bar (i-1)."""
+        memo = self._ctx_memo
+        if memo[0] == i:
+            return memo[1]
         if i < 2 or i >= len(self.df):
             # need i-1 and also next bar for mark-to-market in the trader loop
-            ts = self.get_bar_timestamp(min(max(i, 0), len(self.df) - 1))
-            return PrevContext(
-                valid=False,
-                timestamp=ts,
-                close_prev=float("nan"),
-                sma_week_prev=float("nan"),
-                sma_fast_prev=float("nan"),
-                sma_slow_prev=float("nan"),
-                atr_prev=float("nan"),
-                long_term_trend_prev=0,
-                macd_line_prev=float("nan"),
-                macd_signal_prev=float("nan"),
-                macd_hist_prev=float("nan"),
-            )
+            ctx = _invalid_context(self.get_bar_timestamp(min(max(i, 0), len(self.df) - 1)))
+        else:
+            ctx = self._context_after(i - 1, self.get_bar_timestamp(i))
+        self._ctx_memo = (i, ctx)
+        return ctx
+
+    def get_next_context(self, timestamp: Optional[datetime] = None) -> PrevContext:
+        """Context of the bar after the last one (not yet in the manager).
 
-        row_prev = self.df.iloc[i - 1]
-        ts = self.get_bar_timestamp(i)
+        Same fields as ``get_prev_context(len(self))`` would have once that bar
+        is appended; ``timestamp`` defaults to the last bar's.
+        """
+        n = len(self.df)
+        ts = timestamp if timestamp is not None else (self.get_bar_timestamp(n - 1) if n else None)
+        if n < 2:
+            return _invalid_context(ts)
+        return self._context_after(n - 1, ts)
 
-        def _scalar(x):
-            """Convert a value to a scalar float.
+    def _context_after(self, p: int, ts: datetime) -> PrevContext:
+        """Context read from bar ``p``; groups not built (not required by any
+        trader) are NaN / 0 as in an invalid context."""
+        if "sma" not in self._groups:
+            self.require(("sma",))
+        a = self._arr
+        g = self._groups
+        nan = float("nan")
 
-            Defensive against accidental duplicate columns (x may be a Series).
-            """
-            if isinstance(x, pd.Series):
-                # take first value deterministically
-                x = x.iloc[0] if len(x) else float("nan")
-            return float(x) if pd.notna(x) else float("nan")
+        def _scalar(name: str) -> float:
+            return float(a[name][p])
 
-        valid = True
-        for key in ["smaWeek", "smaFast", "smaSlow"]:
-            v = row_prev[key]
-            if isinstance(v, pd.Series):
-                v = v.iloc[0] if len(v) else float("nan")
-            if not np.isfinite(v):
-                valid = False
-                break
+        valid = bool(np.isfinite(a["smaWeek"][p]) and np.isfinite(a["smaFast"][p]) and np.isfinite(a["smaSlow"][p]))
+        macd = "macd" in g
 
         return PrevContext(
             valid=valid,
             timestamp=ts,
-            close_prev=_scalar(row_prev["Close"]),
-            sma_week_prev=_scalar(row_prev["smaWeek"]),
-            sma_fast_prev=_scalar(row_prev["smaFast"]),
-            sma_slow_prev=_scalar(row_prev["smaSlow"]),
-            atr_prev=_scalar(row_prev["atr"]),
-            long_term_trend_prev=int(row_prev["longTermTrend"]),
-            macd_line_prev=_scalar(row_prev["macdLine"]),
-            macd_signal_prev=_scalar(row_prev["macdSignal"]),
-            macd_hist_prev=_scalar(row_prev["macdHist"]),
+            close_prev=_scalar("Close"),
+            sma_week_prev=_scalar("smaWeek"),
+            sma_fast_prev=_scalar("smaFast"),
+            sma_slow_prev=_scalar("smaSlow"),
+            atr_prev=_scalar("atr") if "atr" in g else nan,
+            long_term_trend_prev=int(a["longTermTrend"][p]) if "trend" in g else 0,
+            macd_line_prev=_scalar("macdLine") if macd else nan,
+            macd_signal_prev=_scalar("macdSignal") if macd else nan,
+            macd_hist_prev=_scalar("macdHist") if macd else nan,
         )
+
+
+def _invalid_context(ts: Optional[datetime]) -> PrevContext:
+    nan = float("nan")
+    return PrevContext(
+        valid=False,
+        timestamp=ts,
+        close_prev=nan,
+        sma_week_prev=nan,
+        sma_fast_prev=nan,
+        sma_slow_prev=nan,
+        atr_prev=nan,
+        long_term_trend_prev=0,
+        macd_line_prev=nan,
+        macd_signal_prev=nan,
+        macd_hist_prev=nan,
+    )
@@ -8,6 +8,54 @@ from typing import Optional
 
 import pandas as pd
 
+from .csv_ingest import detect_encoding, parse_datetimes, read_csv_header, read_csv_typed, strip_strings
+
+_OHLCV_NAMES = {"open", "high", "low", "close", "adj close", "adjclose", "volume"}
+
+
+@dataclass(frozen=True)
+class BarWindow:
+    """Half-open integer bar range ``[start, stop)`` resolved from a date window."""
+
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return max(0, int(self.stop) - int(self.start))
+
+    def as_slice(self) -> slice:
+        return slice(int(self.start), int(self.stop))
+
+
+def _align_bound(x, index: pd.DatetimeIndex):
+    """Match a window bound to the index timezone (strings are passed through)."""
+    if x is None or isinstance(x, str):
+        return x
+    ts = pd.Timestamp(x)
+    tz = getattr(index, "tz", None)
+    if tz is not None and ts.tzinfo is None:
+        ts = ts.tz_localize(tz)
+    elif tz is None and ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts
+
+
+def resolve_window(index: pd.Index, start=None, end=None) -> BarWindow:
+    """Resolve an inclusive ``[start, end]`` date window to integer bar offsets.
+
+    Uses binary search on the (sorted) index instead of boolean masks, so the
+    cost is O(log n) and callers can slice with ``iloc`` without copying.
+    Semantics match ``df.loc[start:end]`` (``None`` means open-ended).
+    """
+    if len(index) == 0:
+        return BarWindow(0, 0)
+    if not index.is_monotonic_increasing:
+        raise ValueError("resolve_window requires a sorted (increasing) index.")
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(index)
+    i0, i1 = index.slice_locs(_align_bound(start, index), _align_bound(end, index))
+    return BarWindow(int(i0), int(max(i0, i1)))
+
 
 @dataclass(frozen=True)
 class OhlcvFrame:
@@ -16,6 +64,14 @@ class OhlcvFrame:
     df: pd.DataFrame  # columns: Open, High, Low, Close, Volume; index: datetime (tz-aware preferred)
     symbol: str
 
+    def window(self, start=None, end=None) -> BarWindow:
+        """Bar offsets of the inclusive date window ``[start, end]``."""
+        return resolve_window(self.df.index, start, end)
+
+    def slice(self, window: BarWindow) -> "OhlcvFrame":
+        """Positional view of the frame (no copy)."""
+        return OhlcvFrame(df=self.df.iloc[window.as_slice()], symbol=self.symbol)
+
 
 def _standardize_ohlcv_columns(df: pd.DataFrame) -> pd.DataFrame:
     # yfinance can return MultiIndex columns depending on options/version.
@@ -102,29 +158,54 @@ class YfinanceProvider:
 
 
 class CsvProvider:
-    """Load OHLCV data from a CSV file."""
+    """Load OHLCV data from a CSV file.
+
+    ``engine`` is passed to :func:`csv_ingest.read_csv_typed` (``"auto"``,
+    ``"c"`` or ``"pyarrow"``).
+    """
+
+    def __init__(self, engine: str = "auto"):
+        self.engine = engine
 
     def fetch(self, csv_path: str | Path, symbol: str, datetime_col: str = "Date") -> OhlcvFrame:
+        enc, datetime_col, dtype = self.layout(csv_path, datetime_col)
+        df = read_csv_typed(csv_path, list(dtype), dtype, encoding=enc, engine=self.engine)
+        df[datetime_col] = parse_datetimes(df[datetime_col])
+        df = df.set_index(datetime_col).sort_index()
+
+        df = _standardize_ohlcv_columns(df)
+        return OhlcvFrame(df=df, symbol=symbol)
+
+    @staticmethod
+    def layout(csv_path: str | Path, datetime_col: str = "Date") -> tuple[str, str, dict]:
+        """(encoding, datetime column, dtype per column to read) of an OHLCV CSV."""
         path = Path(csv_path)
         if not path.exists():
             raise FileNotFoundError(str(path))
 
-        df = pd.read_csv(path)
-        if datetime_col not in df.columns:
+        enc = detect_encoding(path)
+        header = read_csv_header(path, enc)
+        if datetime_col not in header:
             # try common alternatives
             for cand in ["Datetime", "datetime", "timestamp", "Time", "time"]:
-                if cand in df.columns:
+                if cand in header:
                     datetime_col = cand
                     break
 
-        if datetime_col not in df.columns:
+        if datetime_col not in header:
             raise ValueError(f"CSV must contain a datetime column. Tried '{datetime_col}' and common aliases.")
 
-        df[datetime_col] = pd.to_datetime(df[datetime_col])
-        df = df.set_index(datetime_col).sort_index()
+        # Only the datetime and OHLCV-like columns are read (names are mapped by
+        # _standardize_ohlcv_columns).
+        price_cols = [c for c in header if str(c).strip().lower() in _OHLCV_NAMES]
+        dtype: dict = {datetime_col: str}
+        dtype.update({c: float for c in price_cols})
+        return enc, datetime_col, dtype
 
-        df = _standardize_ohlcv_columns(df)
-        return OhlcvFrame(df=df, symbol=symbol)
+
+def _normalize_ticker(symbol: str) -> str:
+    """Panel ticker key: drop exchange suffix and leading zeros (5930 == 005930.KS)."""
+    return str(symbol).strip().split(".")[0].lstrip("0")
 
 
 class PanelCsvProvider:
@@ -133,6 +214,9 @@ class PanelCsvProvider:
     The uploaded panel file (kospi_top100_ohlc_30y.csv) matches this style.
     """
 
+    def __init__(self, engine: str = "auto"):
+        self.engine = engine
+
     def fetch(
         self,
         panel_csv_path: str | Path,
@@ -140,27 +224,52 @@ class PanelCsvProvider:
         start: str | None = None,
         end: str | None = None,
     ) -> OhlcvFrame:
+        panel = self.read_panel(panel_csv_path, engine=self.engine)
+        # Panel ticker may be int-like (e.g., 5930). Match by normalized string.
+        sub = panel[panel["Ticker"].str.lstrip("0") == _normalize_ticker(symbol)]
+        return self._to_frame(sub, symbol, start, end)
+
+    def fetch_all(
+        self,
+        panel_csv_path: str | Path,
+        start: str | None = None,
+        end: str | None = None,
+        symbols: list[str] | None = None,
+    ) -> dict[str, OhlcvFrame]:
+        """Read the panel once and split it into one frame per ticker.
+
+        Keys are 6-digit zero-padded codes for numeric tickers (``005930``).
+        """
+        panel = self.read_panel(panel_csv_path, engine=self.engine)
+        wanted = None if symbols is None else {_normalize_ticker(x) for x in symbols}
+        frames: dict[str, OhlcvFrame] = {}
+        for ticker, sub in panel.groupby("Ticker", sort=False):
+            key = str(ticker)
+            if wanted is not None and key.lstrip("0") not in wanted:
+                continue
+            sym = key.zfill(6) if key.isdigit() else key
+            frames[sym] = self._to_frame(sub, sym, start, end)
+        return frames
+
+    @staticmethod
+    def read_panel(panel_csv_path: str | Path, engine: str = "auto") -> pd.DataFrame:
+        """Read the panel into long format: Date, Ticker (str), Open, High, Low, Close, Volume."""
+        enc, dtype, names = PanelCsvProvider.layout(panel_csv_path)
+        out = read_csv_typed(panel_csv_path, list(dtype), dtype, encoding=enc, engine=engine)
+        return PanelCsvProvider.normalize_rows(out, names)
+
+    @staticmethod
+    def layout(panel_csv_path: str | Path) -> tuple[str, dict, dict]:
+        """(encoding, dtype per column to read, column -> standard name) of a panel CSV."""
         panel_csv_path = Path(panel_csv_path)
-        df = pd.read_csv(panel_csv_path)
+        enc = detect_encoding(panel_csv_path)
         # Robust column naming
-        cols = {c.lower(): c for c in df.columns}
+        cols = {c.lower(): c for c in read_csv_header(panel_csv_path, enc)}
         date_col = cols.get("date") or cols.get("time")
         ticker_col = cols.get("ticker") or cols.get("symbol")
         if date_col is None or ticker_col is None:
             raise ValueError("Panel CSV must have Date and Ticker columns.")
 
-        df[date_col] = pd.to_datetime(df[date_col])
-        sym = str(symbol)
-        sym = sym.split(".")[0]
-        sym_norm = sym.lstrip("0")
-        # Panel ticker may be int-like (e.g., 5930). Match by normalized string.
-        df[ticker_col] = df[ticker_col].astype(str).str.strip()
-        df = df[df[ticker_col].str.lstrip("0") == sym_norm]
-        if start:
-            df = df[df[date_col] >= pd.to_datetime(start)]
-        if end:
-            df = df[df[date_col] <= pd.to_datetime(end)]
-
         # pick OHLC columns
         def pick(name):
             return cols.get(name.lower())
@@ -168,14 +277,29 @@ class PanelCsvProvider:
         v = pick("volume")
         if not all([o, h, l, c]):
             raise ValueError("Panel CSV must contain Open/High/Low/Close columns.")
-        out = df[[date_col, o, h, l, c] + ([v] if v else [])].copy()
-        out = out.rename(columns={date_col: "Date", o: "Open", h: "High", l: "Low", c: "Close"})
+        dtype = {date_col: str, ticker_col: str, o: float, h: float, l: float, c: float}
+        names = {date_col: "Date", ticker_col: "Ticker", o: "Open", h: "High", l: "Low", c: "Close"}
         if v:
-            out = out.rename(columns={v: "Volume"})
-        else:
+            dtype[v] = float
+            names[v] = "Volume"
+        return enc, dtype, names
+
+    @staticmethod
+    def normalize_rows(rows: pd.DataFrame, names: dict, fmt: str | None = None) -> pd.DataFrame:
+        """Raw panel rows (as read per ``layout``) -> Date, Ticker (str), Open, High, Low, Close, Volume."""
+        out = rows.rename(columns=names)
+        if "Volume" not in out.columns:
             out["Volume"] = 0.0
-        out = out.set_index("Date").sort_index()
-        out = out.astype(float)
+        out["Date"] = parse_datetimes(out["Date"], fmt)
+        out["Ticker"] = strip_strings(out["Ticker"])
+        return out
+
+    @staticmethod
+    def _to_frame(sub: pd.DataFrame, symbol: str, start: str | None, end: str | None) -> OhlcvFrame:
+        out = sub.set_index("Date").sort_index()
+        out = out[["Open", "High", "Low", "Close", "Volume"]].astype(float)
         out = out[~out.index.duplicated(keep="last")]
-        out = out[["Open", "High", "Low", "Close", "Volume"]]
-        return OhlcvFrame(df=out, symbol=symbol)
+        frame = OhlcvFrame(df=out, symbol=symbol)
+        if start or end:
+            frame = frame.slice(frame.window(pd.to_datetime(start) if start else None, pd.to_datetime(end) if end else None))
+        return frame
@@ -0,0 +1,139 @@
+"""StrategyConfig -> specialized decision function.
+
+The Step-1 decision (port of MATLAB ``ticker_trader.decide_target``) is
+defined here, once: ``decision_source(cfg)`` generates Python source for it
+with disabled filters removed, thresholds folded in as literals and conditions
+ordered so the cheap tests short-circuit the expensive ones (the confirmation
+loops run only once a stack and every gate already hold), and
+``compile_decision`` turns that into the function ``TickerTraderStep1.step``
+calls. The vectorized engines (event_jump, checkpoint, cross_section) follow
+this source.
+
+Functions are cached by generated source, so configs that differ only in
+parameters the decision never reads (stops, sizing, or thresholds of a
+disabled gate) share one compiled function.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from math import isfinite
+from typing import Callable
+
+import numpy as np
+
+from .config import StrategyConfig
+
+DecisionFn = Callable[..., int]  # (trader, t, ctx) -> target position
+
+_TINY = float(np.finfo(float).tiny)
+
+
+def _gate(lines: list[str], ind: str, side: str, kind: str, cfg: StrategyConfig) -> str:
+    """Emit the ATR/spread threshold test into ``ok``; returns the variable name."""
+    sep = "week - fast" if side == "long" else "fast - week"
+    op = ">=" if kind == "enter" else "<="
+    k = cfg.atr_enter_k if kind == "enter" else cfg.atr_exit_k
+    pct = cfg.spread_enter_pct if kind == "enter" else cfg.spread_exit_pct
+    spread = f"(({sep}) / max(abs(fast), {_TINY!r})) {op} {float(pct)!r}"
+    if not cfg.use_atr_filter:
+        lines.append(f"{ind}ok = {spread}")
+    else:
+        lines.append(f"{ind}atr = ctx.atr_prev")
+        lines.append(f"{ind}if isfinite(atr) and atr > 0:")
+        lines.append(f"{ind}    ok = ({sep}) {op} ({float(k)!r} * atr)")
+        lines.append(f"{ind}else:")
+        lines.append(f"{ind}    ok = {spread}")
+    return "ok"
+
+
+def _entry(lines: list[str], side: str, cfg: StrategyConfig) -> None:
+    stack = "week > fast and fast > slow" if side == "long" else "slow > fast and fast > week"
+    target = 1 if side == "long" else -1
+    lines.append(f"        if {stack}:")
+    ind = "            "
+    use_trend = cfg.use_long_trend_filter if side == "long" else cfg.use_short_trend_filter
+    if use_trend:
+        lines.append(f"{ind}if ctx.long_term_trend_prev == {target}:")
+        ind += "    "
+    if cfg.use_macd_regime_filter:
+        lines.append(f"{ind}h = ctx.macd_hist_prev")
+        lines.append(f"{ind}if isfinite(h) and h {'>' if side == 'long' else '<'} 0:")
+        ind += "    "
+    if cfg.use_prev_close_filter:
+        ref = "week" if cfg.prev_close_filter_ref == "week" else "fast"
+        lines.append(f"{ind}cp = ctx.close_prev")
+        lines.append(f"{ind}if not (isfinite(cp) and isfinite({ref})) or cp {'>=' if side == 'long' else '<='} {ref}:")
+        ind += "    "
+    _gate(lines, ind, side, "enter", cfg)
+    conf = "_check_confirm_long" if side == "long" else "_check_confirm_short"
+    lines.append(f"{ind}if ok and trader.{conf}(t - 1, {max(1, int(cfg.confirm_days))}):")
+    lines.append(f"{ind}    return {target}")
+
+
+def _exit(lines: list[str], side: str, cfg: StrategyConfig) -> None:
+    hold = 1 if side == "long" else -1
+    cross = "fast > week" if side == "long" else "week > fast"
+    lines.append(f"    if {cross}:")
+    lines.append("        return 0")
+    _gate(lines, "    ", side, "exit", cfg)
+    lines.append("    if ok:")
+    lines.append("        return 0")
+    if cfg.use_macd_exit:
+        lines.append("    h = ctx.macd_hist_prev")
+        lines.append(f"    if isfinite(h) and h {'<' if side == 'long' else '>'} 0:")
+        lines.append("        return 0")
+    if cfg.use_prev_close_filter:
+        ref = "week" if cfg.prev_close_filter_ref == "week" else "fast"
+        lines.append("    cp = ctx.close_prev")
+        lines.append(f"    if isfinite(cp) and isfinite({ref}) and cp {'<' if side == 'long' else '>'} {ref}:")
+        lines.append("        return 0")
+    lines.append(f"    return {hold}")
+
+
+@lru_cache(maxsize=4096)
+def decision_source(cfg: StrategyConfig) -> str:
+    """Python source of ``decide(trader, t, ctx)`` specialized for ``cfg``."""
+    lines = [
+        "def decide(trader, t, ctx):",
+        "    st = trader.state",
+        "    pos = st.pos",
+        "    if pos == 0 and t <= st.cooldown_until_index:",
+        "        return 0",
+        "    week = ctx.sma_week_prev",
+        "    fast = ctx.sma_fast_prev",
+        "    slow = ctx.sma_slow_prev",
+        "    if not (isfinite(week) and isfinite(fast) and isfinite(slow)):",
+        "        return 0",
+        "    if pos == 0:",
+    ]
+    _entry(lines, "long", cfg)
+    if cfg.enable_short:
+        _entry(lines, "short", cfg)
+    lines.append("        return 0")
+
+    min_hold = max(0, int(cfg.min_hold_bars))
+    if min_hold > 0:
+        lines += [
+            f"    if st.entry_index is None or t - st.entry_index < {min_hold}:",
+            "        return pos",
+        ]
+    lines += ["    if pos == 1:"]
+    body: list[str] = []
+    _exit(body, "long", cfg)
+    lines += ["    " + x for x in body]
+    _exit(lines, "short", cfg)
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=1024)
+def _compile_source(src: str) -> DecisionFn:
+    ns: dict = {"isfinite": isfinite}
+    exec(compile(src, "<ta_tf.decision_codegen>", "exec"), ns)
+    return ns["decide"]
+
+
+@lru_cache(maxsize=4096)
+def compile_decision(cfg: StrategyConfig) -> DecisionFn:
+    """Compiled :func:`decision_source` for ``cfg`` (cached by source)."""
+    return _compile_source(decision_source(cfg))
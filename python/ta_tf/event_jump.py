@@ -0,0 +1,266 @@
+"""Event-jump driver for the Step-1 trader.
+
+Most bars of a low-turnover run change nothing: flat inside a cooldown or
+without an entry signal, or in a position where no exit, stop or forced cover
+can fire. ``run_event_jump`` precomputes the decision inputs as arrays
+(``decision_arrays``), jumps straight to the next bar where something can
+happen and calls ``trader.step`` only there. Bars in between get their
+extrema, borrow accrual and equity in bulk, with the same float operations as
+``step`` so the result is bit-identical to the per-bar loop.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .accounting import equity_path, krw_borrow_costs
+from .config import StrategyConfig
+from .data_manager import OhlcvDataManager
+from .data_provider import BarWindow
+from .metrics import _day_numbers
+
+if TYPE_CHECKING:
+    from .trader import TickerTraderStep1
+
+
+@dataclass(frozen=True)
+class DecisionArrays:
+    """Per-bar (index t) inputs of the decision (``decision_codegen.decision_source``).
+
+    Exits ignore ``min_hold_bars`` (that depends on the entry bar).
+    """
+
+    valid: np.ndarray  # PrevContext.valid
+    entry: np.ndarray  # long or short entry signal
+    long_exit: np.ndarray
+    short_exit: np.ndarray
+    long_entry: np.ndarray  # long wins when both fire
+    short_entry: np.ndarray
+
+
+def _prev(x: np.ndarray, fill=np.nan) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:1] = fill
+    out[1:] = x[:-1]
+    return out
+
+
+def decision_arrays(dm: OhlcvDataManager, cfg: StrategyConfig) -> DecisionArrays:
+    """Vectorized replica of the signal logic, evaluated on prev-bar values."""
+    n = len(dm)
+    week = _prev(dm.column("smaWeek"))
+    fast = _prev(dm.column("smaFast"))
+    slow = _prev(dm.column("smaSlow"))
+    close_prev = _prev(dm.column("Close"))
+    # optional groups are only read (and built) when the config uses them
+    nan = np.full(n, np.nan)
+    atr = _prev(dm.column("atr")) if cfg.use_atr_filter else nan
+    use_macd = cfg.use_macd_regime_filter or cfg.use_macd_exit
+    hist = _prev(dm.column("macdHist")) if use_macd else nan
+    use_trend = cfg.use_long_trend_filter or (cfg.enable_short and cfg.use_short_trend_filter)
+    trend = _prev(dm.column("longTermTrend").astype(np.int64), fill=0) if use_trend else np.zeros(n, dtype=np.int64)
+
+    with np.errstate(invalid="ignore"):
+        finite = np.isfinite(week) & np.isfinite(fast) & np.isfinite(slow)
+        valid = finite.copy()
+        valid[: min(2, n)] = False
+
+        sep_long = week - fast
+        sep_short = fast - week
+        den = np.maximum(np.abs(fast), np.finfo(float).tiny)
+        use_atr = bool(cfg.use_atr_filter) & np.isfinite(atr) & (atr > 0)
+        enter_long_ok = np.where(use_atr, sep_long >= (cfg.atr_enter_k * atr), (sep_long / den) >= cfg.spread_enter_pct)
+        exit_long_ok = np.where(use_atr, sep_long <= (cfg.atr_exit_k * atr), (sep_long / den) <= cfg.spread_exit_pct)
+        enter_short_ok = np.where(use_atr, sep_short >= (cfg.atr_enter_k * atr), (sep_short / den) >= cfg.spread_enter_pct)
+        exit_short_ok = np.where(use_atr, sep_short <= (cfg.atr_exit_k * atr), (sep_short / den) <= cfg.spread_exit_pct)
+
+        long_stack = (week > fast) & (fast > slow)
+        short_stack = (slow > fast) & (fast > week)
+
+        trend_long_ok = (trend == 1) if cfg.use_long_trend_filter else np.ones(n, dtype=bool)
+        trend_short_ok = (trend == -1) if cfg.use_short_trend_filter else np.ones(n, dtype=bool)
+
+        macd_bull = np.isfinite(hist) & (hist > 0)
+        macd_bear = np.isfinite(hist) & (hist < 0)
+        macd_long_ok = macd_bull if cfg.use_macd_regime_filter else np.ones(n, dtype=bool)
+        macd_short_ok = macd_bear if cfg.use_macd_regime_filter else np.ones(n, dtype=bool)
+
+        # confirmation over prev bars [t-conf_n, t-1]: stacks of bars i = t-1 etc.
+        conf_n = max(1, int(cfg.confirm_days))
+        long_conf = _trailing_all(finite & long_stack, conf_n)
+        short_conf = _trailing_all(finite & short_stack, conf_n)
+
+        pc_long_ok = np.ones(n, dtype=bool)
+        pc_short_ok = np.ones(n, dtype=bool)
+        pc_exit_long = np.zeros(n, dtype=bool)
+        pc_exit_short = np.zeros(n, dtype=bool)
+        if cfg.use_prev_close_filter:
+            ref_ma = week if cfg.prev_close_filter_ref == "week" else fast
+            gate = np.isfinite(close_prev) & np.isfinite(ref_ma)
+            pc_long_ok = ~gate | (close_prev >= ref_ma)
+            pc_short_ok = ~gate | (close_prev <= ref_ma)
+            pc_exit_long = gate & (close_prev < ref_ma)
+            pc_exit_short = gate & (close_prev > ref_ma)
+
+    long_entry = long_stack & enter_long_ok & trend_long_ok & macd_long_ok & long_conf & pc_long_ok
+    short_entry = short_stack & enter_short_ok & trend_short_ok & macd_short_ok & short_conf & pc_short_ok
+    if not cfg.enable_short:
+        short_entry = np.zeros(n, dtype=bool)
+
+    macd_exit = bool(cfg.use_macd_exit)
+    long_exit = (fast > week) | exit_long_ok | (macd_bear & macd_exit) | pc_exit_long
+    short_exit = (week > fast) | exit_short_ok | (macd_bull & macd_exit) | pc_exit_short
+
+    return DecisionArrays(
+        valid=valid,
+        entry=valid & (long_entry | short_entry),
+        long_exit=valid & long_exit,
+        short_exit=valid & short_exit,
+        long_entry=valid & long_entry,
+        short_entry=valid & short_entry,
+    )
+
+
+def _trailing_all(ok_prev: np.ndarray, k: int) -> np.ndarray:
+    """out[t] = all(ok_prev[t-k+1 .. t]) with at least k bars available.
+
+    ``ok_prev`` is already shifted to prev-bar indexing, so for bar t this
+    covers the trader's ``check_confirm_*(t-1, k)`` bars ``t-k .. t-1``.
+    """
+    n = len(ok_prev)
+    c = np.concatenate([[0], np.cumsum(ok_prev.astype(np.int64))])
+    out = np.zeros(n, dtype=bool)
+    t = np.arange(n)
+    have = t - k >= 0  # first confirm bar (t-1)-k+1 must be >= 0
+    out[have] = (c[t[have] + 1] - c[t[have] + 1 - k]) == k
+    return out
+
+
+def run_event_jump(trader: "TickerTraderStep1", window: Optional[BarWindow] = None, start: int = 0) -> None:
+    """Same result as ``trader.run_full_backtest(window)``, stepping only decision bars.
+
+    ``start`` continues a trader whose state is that before bar ``start``
+    (e.g. restored from a checkpoint) instead of starting from bar 0.
+    """
+    dm = trader.dm
+    n = len(dm)
+    stop = n - 1 if window is None else min(n - 1, int(window.stop))
+    if stop <= 2:
+        for t in range(int(start), max(0, stop)):
+            trader.step(t)
+        return
+
+    cfg = trader.strat_cfg
+    arr = decision_arrays(dm, cfg)
+    O, H, L, C = (dm.column(c) for c in ("Open", "High", "Low", "Close"))
+    oc_max = np.maximum(O, C)
+    oc_min = np.minimum(O, C)
+    fin_oc = np.isfinite(O) & np.isfinite(C)
+    entry_bars = np.flatnonzero(arr.entry)
+    close_mode = str(trader.bt_cfg.valuation_mode).upper() == "CLOSE"
+    val_px = C.copy() if close_mode else np.append(O[1:], np.nan)
+    val_px_flat = np.where(arr.valid, val_px, C)  # invalid ctx values at Close
+    days = _day_numbers(dm.df.index) if trader.cost_model.cfg.enforce_short_max_hold else None
+
+    t = max(2, int(start))
+    while t < stop:
+        st = trader.state
+        if st.pos == 0 and trader.shares == 0:
+            i = int(np.searchsorted(entry_bars, max(t, st.cooldown_until_index + 1)))
+            b = int(entry_bars[i]) if i < len(entry_bars) else stop
+            b = min(b, stop)
+            if b > t:
+                _advance_flat(trader, t, b, val_px_flat, C, arr.valid)
+        elif st.pos != 0 and st.units >= trader._max_units:
+            b = _next_position_event(trader, t, stop, arr, O, H, L, oc_max, oc_min, fin_oc, days)
+            if b > t:
+                _advance_position(trader, t, b, val_px, C, oc_max, oc_min)
+        else:
+            b = t
+        if b < stop:
+            trader.step(b)
+        t = b + 1
+
+
+def _next_position_event(trader, t, stop, arr, O, H, L, oc_max, oc_min, fin_oc, days) -> int:
+    """First bar in [t, stop) where the open position can change (else stop)."""
+    st = trader.state
+    cfg = trader.strat_cfg
+    first_exit = (st.entry_index if st.entry_index is not None else 0) + max(0, int(cfg.min_hold_bars))
+    exit_mask = arr.long_exit if st.pos == 1 else arr.short_exit
+    force_day = None
+    if days is not None and st.pos == -1 and st.entry_time is not None:
+        force_day = (st.entry_time.date() - date(1970, 1, 1)).days + int(trader.cost_model.cfg.short_max_hold_days)
+
+    ext = st.hist_max if st.pos == 1 else st.hist_min
+    lo, size = t, 64
+    while lo < stop:
+        hi = min(stop, lo + size)
+        seg = slice(lo, hi)
+        ev = ~arr.valid[seg] | ~fin_oc[seg]
+        ev |= exit_mask[seg] & (np.arange(lo, hi) >= first_exit)
+        if force_day is not None:
+            ev |= days[seg] >= force_day
+        # stops use extrema updated with the current bar's O/C
+        with np.errstate(invalid="ignore"):
+            if st.pos == 1:
+                run = np.maximum(np.maximum.accumulate(oc_max[seg]), ext)
+                ev |= L[seg] <= np.maximum(O[seg] * (1.0 - cfg.long_daily_stop), run * (1.0 - cfg.long_trail_stop))
+            else:
+                run = np.minimum(np.minimum.accumulate(oc_min[seg]), ext)
+                ev |= H[seg] >= np.minimum(O[seg] * (1.0 + cfg.short_daily_stop), run * (1.0 + cfg.short_trail_stop))
+        if ev.any():
+            return lo + int(np.argmax(ev))
+        ext = float(run[-1])
+        lo, size = hi, size * 2
+    return stop
+
+
+def _append_bulk(trader, a: int, b: int, cash_path: np.ndarray, px: np.ndarray, borrow_c: np.ndarray) -> None:
+    base = trader.initial_capital if trader.initial_capital > 0 else 1.0
+    eq = equity_path(cash_path, trader.shares, px, trader.initial_equity, base)
+    stamps = trader.dm.get_bar_timestamps(a, b)
+    if trader.tape is not None:
+        tp = trader.tape
+        tp.timestamps.extend(stamps)
+        tp.valuation_price.extend(px.tolist())
+        tp.borrow_close.extend(borrow_c.tolist())
+    trader.equity_curve.extend(zip(stamps, eq.tolist()))
+    trader.equity = float(eq[-1])
+    trader.next_bar = b
+
+
+def _advance_flat(trader, a: int, b: int, val_px_flat, C, valid) -> None:
+    cash_path = np.full(b - a, trader.cash)
+    _append_bulk(trader, a, b, cash_path, val_px_flat[a:b], np.where(valid[a:b], C[a:b], np.nan))
+
+
+def _advance_position(trader, a: int, b: int, val_px, C, oc_max, oc_min) -> None:
+    st = trader.state
+    hi = float(np.max(oc_max[a:b]))
+    lo = float(np.min(oc_min[a:b]))
+    if st.pos == 1:
+        st.hist_max = max(st.hist_max, hi)
+    else:
+        st.hist_min = min(st.hist_min, lo)
+    if st.entry_price == st.entry_price:
+        st.best_since_entry = max(st.best_since_entry, hi) if np.isfinite(st.best_since_entry) else hi
+        st.worst_since_entry = min(st.worst_since_entry, lo) if np.isfinite(st.worst_since_entry) else lo
+
+    c = C[a:b]
+    if trader.shares < 0 and trader._krw:
+        cost = krw_borrow_costs(abs(trader.shares), c, trader._short_borrow_daily_exact)
+        cash_path = trader.cash - np.cumsum(cost)
+        trader.cash = int(cash_path[-1])
+    elif trader.shares < 0:
+        cost = float(abs(trader.shares)) * c * float(trader._short_borrow_daily)
+        # sequential subtraction keeps the per-bar rounding order
+        cash_path = np.subtract.accumulate(np.concatenate([[trader.cash], cost]))[1:]
+        trader.cash = float(cash_path[-1])
+    else:
+        cash_path = np.full(b - a, trader.cash)
+    _append_bulk(trader, a, b, cash_path, val_px[a:b], c)
@@ -0,0 +1,184 @@
+"""Strategy fan-out: many StrategyConfig variants per symbol on one data feed.
+
+Running A/B and shadow configs as independent traders builds one
+``OhlcvDataManager`` (bars + indicator history) per config. ``FanoutHost``
+keeps one appendable data manager per symbol and attaches any number of
+traders to it, each holding only its position/cash state and logs:
+
+- indicators are extended once per new bar (``dm.append``);
+- new bars are stepped bar-major, so every trader of a symbol reads the same
+  memoized ``PrevContext``;
+- decisions are shared: traders whose configs compile to the same decision
+  function and sit in the same decision state (position, entry bar, cooldown
+  block) on a bar get one evaluation between them.
+
+Results are identical to independent traders on their own data managers.
+``curve_tail`` bounds the equity/trade history kept per trader, so memory
+grows with the symbols (bar history) rather than symbols x configs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Mapping, Optional
+
+import pandas as pd
+
+from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .data_provider import OhlcvFrame
+from .decision_codegen import DecisionFn
+from .next_bar import NextBarPlan, plan_next_bar
+from .trader import TickerTraderStep1
+from .types import TradeEvent
+
+
+class _SharedDecisions:
+    """Per-bar memo of decisions for the traders of one symbol.
+
+    A compiled decision reads the trader's position, entry bar and cooldown,
+    the bar context and the data manager only, so that key identifies it
+    within one bar.
+    """
+
+    def __init__(self):
+        self.t = -1
+        self.memo: dict = {}
+        self.calls = 0
+        self.evaluated = 0
+
+    def wrap(self, fn: DecisionFn) -> DecisionFn:
+        def decide(trader, t, ctx):
+            if t != self.t:
+                self.t = t
+                self.memo.clear()
+            st = trader.state
+            key = (fn, st.pos, st.entry_index, st.pos == 0 and t <= st.cooldown_until_index)
+            self.calls += 1
+            r = self.memo.get(key)
+            if r is None:
+                self.evaluated += 1
+                r = self.memo[key] = fn(trader, t, ctx)
+            return r
+
+        return decide
+
+
+class FanoutHost:
+    """One data manager per symbol, N named traders attached to each."""
+
+    def __init__(
+        self,
+        ind_cfg: IndicatorConfig = IndicatorConfig(),
+        cost_cfg: CostConfig = CostConfig(),
+        bt_cfg: BacktestConfig = BacktestConfig(initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0),
+        curve_tail: Optional[int] = None,
+    ):
+        self.ind_cfg = ind_cfg
+        self.cost_cfg = cost_cfg
+        self.bt_cfg = bt_cfg
+        self.curve_tail = None if curve_tail is None else max(1, int(curve_tail))
+        self.dms: dict[str, OhlcvDataManager] = {}
+        self.traders: dict[str, dict[str, TickerTraderStep1]] = {}
+        self._shared: dict[str, _SharedDecisions] = {}
+
+    # -- setup ---------------------------------------------------------------
+    def add_symbol(self, frame: OhlcvFrame | OhlcvDataManager) -> OhlcvDataManager:
+        """Register a symbol with its history (a frame, or an existing manager)."""
+        dm = frame if isinstance(frame, OhlcvDataManager) else OhlcvDataManager(frame, self.ind_cfg)
+        self.dms[dm.symbol] = dm
+        self.traders.setdefault(dm.symbol, {})
+        self._shared.setdefault(dm.symbol, _SharedDecisions())
+        return dm
+
+    def attach(
+        self,
+        symbol: str,
+        name: str,
+        strat_cfg: StrategyConfig,
+        cost_cfg: Optional[CostConfig] = None,
+    ) -> TickerTraderStep1:
+        """Attach a trader for ``strat_cfg`` and run it over the history so far."""
+        dm = self.dms[symbol]
+        tr = TickerTraderStep1(
+            dm=dm,
+            strat_cfg=strat_cfg,
+            cost_cfg=cost_cfg or self.cost_cfg,
+            bt_cfg=replace(self.bt_cfg, symbol=symbol),
+        )
+        tr.run_full_backtest(jump=True)
+        tr._decide = self._shared[symbol].wrap(tr._decide)
+        self._trim(tr)
+        self.traders[symbol][name] = tr
+        return tr
+
+    def attach_many(self, symbol: str, configs: Mapping[str, StrategyConfig]) -> None:
+        for name, cfg in configs.items():
+            self.attach(symbol, name, cfg)
+
+    # -- feed ----------------------------------------------------------------
+    def append(self, symbol: str, bars: pd.DataFrame) -> int:
+        """Extend the symbol's indicators once and step every attached trader.
+
+        Returns the number of new bars (re-sent bars are ignored).
+        """
+        k = self.dms[symbol].append(bars)
+        if k:
+            self.step_pending(symbol)
+        return k
+
+    def step_pending(self, symbol: str) -> list[TradeEvent]:
+        """Step the attached traders over bars they have not processed, bar-major.
+
+        Returns the trade events this produced (all traders of ``symbol``).
+        """
+        dm = self.dms[symbol]
+        traders = list(self.traders[symbol].values())
+        if not traders:
+            return []
+        marks = [len(tr.trade_log) for tr in traders]
+        start = min(tr.next_bar for tr in traders)
+        for t in range(start, len(dm) - 1):
+            for tr in traders:
+                if t >= tr.next_bar:
+                    tr.step(t)
+        events: list[TradeEvent] = []
+        for tr, m in zip(traders, marks):
+            events.extend(tr.trade_log[m:])
+            self._trim(tr)
+        return events
+
+    def _trim(self, tr: TickerTraderStep1) -> None:
+        n = self.curve_tail
+        if n is not None:
+            if len(tr.equity_curve) > n:
+                del tr.equity_curve[:-n]
+            if len(tr.trade_log) > n:
+                del tr.trade_log[:-n]
+
+    # -- outputs -------------------------------------------------------------
+    def plans(self, symbol: str) -> dict[str, NextBarPlan]:
+        """Next-bar plan of every trader of ``symbol`` (see ``ta_tf.next_bar``)."""
+        return {name: plan_next_bar(tr) for name, tr in self.traders[symbol].items()}
+
+    def summary(self) -> pd.DataFrame:
+        """One row per (symbol, trader): position, units, equity, last bar."""
+        rows = []
+        for sym, named in self.traders.items():
+            for name, tr in named.items():
+                rows.append(
+                    {
+                        "symbol": sym,
+                        "name": name,
+                        "pos": int(tr.state.pos),
+                        "units": int(tr.state.units),
+                        "equity": float(tr.equity),
+                        "last_bar": tr.equity_curve[-1][0] if tr.equity_curve else None,
+                    }
+                )
+        return pd.DataFrame(rows, columns=["symbol", "name", "pos", "units", "equity", "last_bar"])
+
+    def decision_stats(self, symbol: str) -> tuple[int, int]:
+        """(decision calls, decisions actually evaluated) for ``symbol``."""
+        s = self._shared[symbol]
+        return s.calls, s.evaluated
@@ -0,0 +1,199 @@
+"""Multi-fidelity optimizer scheduling: successive halving and Hyperband.
+
+Fidelity is the length of the scoring window. Every rung scores on
+``[start_dt, rung_end]`` with ``rung_end`` growing geometrically from
+``min_span_days`` (x ``eta`` per rung) up to ``end_dt``. Each rung keeps the
+best ``1/eta`` of its configs, so only the finalists are scored on the full
+window.
+
+Lower rungs start flat at ``start_dt`` (``flat_start``: indicators are warm
+from the history before it, but the warmup bars are not traded), so their cost
+is the rung window alone. The last rung is the regular optimizer score
+(``optimize.evaluate_config``), comparable with a plain random search.
+
+A short window is an imperfect proxy for the full one (a config can lose the
+first year and win the five), which is why promotion keeps a fraction rather
+than a fixed top-k, and why Hyperband also runs brackets that start at longer
+rungs.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import pandas as pd
+
+from .config import CostConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .optimize import evaluate_batch
+
+# (configs, rung_end, flat_start) -> (score, cagr, max_dd) per config
+Evaluator = Callable[[list[StrategyConfig], pd.Timestamp, bool], list[tuple[float, float, float]]]
+
+RECORD_COLUMNS = ["bracket", "rung", "rung_end", "config_id", "score", "cagr", "max_dd", "promoted"]
+
+
+@dataclass(frozen=True)
+class HalvingResult:
+    """Rung records plus the finalists' full-window scores, best first."""
+
+    records: pd.DataFrame  # RECORD_COLUMNS, one row per (rung, config) evaluation
+    finalists: list[tuple[float, int]]  # (full-window score, config_id)
+    bars_simulated: int  # bars stepped over all evaluations (traded warmup included)
+
+    def best(self) -> Optional[tuple[float, int]]:
+        return self.finalists[0] if self.finalists else None
+
+
+def rung_ends(index: pd.DatetimeIndex, start_dt, end_dt, eta: int = 3, min_span_days: int = 365) -> list[pd.Timestamp]:
+    """Window ends of each rung: ``start + min_span * eta**r`` days, then ``end_dt``.
+
+    Spans count from the first bar at or after ``start_dt``; ends are snapped
+    to the last bar on or before them so that rungs with the same bars collapse.
+    """
+    start_dt, end_dt = pd.Timestamp(start_dt), pd.Timestamp(end_dt)
+    first = int(index.searchsorted(start_dt, side="left"))
+    if first < len(index):
+        start_dt = max(start_dt, pd.Timestamp(index[first]).normalize())
+    eta = max(2, int(eta))
+    full = int(index.searchsorted(end_dt, side="right"))
+    out: list[pd.Timestamp] = []
+    prev = 0
+    span = max(1, int(min_span_days))
+    while start_dt + pd.Timedelta(days=span - 1) < end_dt:
+        pos = int(index.searchsorted(start_dt + pd.Timedelta(days=span - 1), side="right"))
+        if prev < pos < full:
+            out.append(pd.Timestamp(index[pos - 1]))
+            prev = pos
+        span *= eta
+    out.append(end_dt)
+    return out
+
+
+def batch_evaluator(
+    dm: OhlcvDataManager,
+    cost_cfg: CostConfig,
+    start_dt,
+    dd_penalty: float = 0.5,
+    workers: int = 1,
+) -> Evaluator:
+    """Local evaluation with ``optimize.evaluate_batch`` on ``[start_dt, rung_end]``."""
+    start_dt = pd.Timestamp(start_dt)
+
+    def evaluate(configs: list[StrategyConfig], end: pd.Timestamp, flat_start: bool) -> list[tuple[float, float, float]]:
+        return evaluate_batch(dm, configs, cost_cfg, start_dt, end, dd_penalty=dd_penalty, workers=workers, flat_start=flat_start)
+
+    return evaluate
+
+
+def _n_keep(n: int, eta: int) -> int:
+    return max(1, int(math.ceil(n / float(eta))))
+
+
+def successive_halving(
+    dm: OhlcvDataManager,
+    configs: Sequence[StrategyConfig],
+    evaluate: Evaluator,
+    start_dt,
+    ends: Sequence[pd.Timestamp],
+    eta: int = 3,
+    flat_start: bool = True,
+    first_rung: int = 0,
+    config_ids: Optional[Sequence[int]] = None,
+    bracket: int = 0,
+) -> HalvingResult:
+    """Score ``configs`` on ``ends[first_rung]``, keep the best ``1/eta``, repeat up to ``ends[-1]``.
+
+    Scores that are not finite (e.g. no trade on a short window) rank last.
+    Ties keep the original order.
+    """
+    start_dt = pd.Timestamp(start_dt)
+    eta = max(2, int(eta))
+    ids = list(range(len(configs))) if config_ids is None else [int(i) for i in config_ids]
+    alive = list(zip(ids, configs))
+    records: list[dict] = []
+    bars = 0
+    finalists: list[tuple[float, int]] = []
+    last = len(ends) - 1
+    for r in range(max(0, min(int(first_rung), last)), last + 1):
+        if not alive:
+            break
+        end = pd.Timestamp(ends[r])
+        flat = bool(flat_start) and r < last
+        scored = evaluate([c for _, c in alive], end, flat)
+        w = dm.window(start_dt, end)
+        bars += len(alive) * (len(w) if flat else int(w.stop))
+
+        order = sorted(
+            range(len(alive)),
+            key=lambda j: -scored[j][0] if math.isfinite(scored[j][0]) else math.inf,
+        )
+        keep = set(order[: _n_keep(len(alive), eta)]) if r < last else set(order)
+        for j, (cid, _) in enumerate(alive):
+            sc, g, mdd = scored[j]
+            records.append(
+                {
+                    "bracket": int(bracket),
+                    "rung": r,
+                    "rung_end": end,
+                    "config_id": cid,
+                    "score": float(sc),
+                    "cagr": float(g),
+                    "max_dd": float(mdd),
+                    "promoted": j in keep and r < last,
+                }
+            )
+        if r == last:
+            finalists = [(float(scored[j][0]), alive[j][0]) for j in order]
+        alive = [alive[j] for j in sorted(keep)]
+
+    return HalvingResult(
+        records=pd.DataFrame(records, columns=RECORD_COLUMNS),
+        finalists=finalists,
+        bars_simulated=bars,
+    )
+
+
+def hyperband(
+    dm: OhlcvDataManager,
+    sample: Callable[[], StrategyConfig],
+    evaluate: Evaluator,
+    start_dt,
+    ends: Sequence[pd.Timestamp],
+    eta: int = 3,
+    n_scale: float = 1.0,
+    flat_start: bool = True,
+) -> tuple[list[StrategyConfig], HalvingResult]:
+    """Hyperband: successive-halving brackets from the most aggressive (all
+    rungs) to plain full-window evaluation, with ``ceil(n_scale * (R+1)/(s+1) * eta**s)``
+    configs in the bracket that skips ``R - s`` rungs.
+
+    Returns every sampled config (indexed by ``config_id``) and the merged result.
+    """
+    eta = max(2, int(eta))
+    s_max = len(ends) - 1
+    configs: list[StrategyConfig] = []
+    parts: list[HalvingResult] = []
+    for s in range(s_max, -1, -1):
+        n = max(1, int(math.ceil(float(n_scale) * (s_max + 1) / (s + 1) * eta**s)))
+        ids = list(range(len(configs), len(configs) + n))
+        configs.extend(sample() for _ in range(n))
+        parts.append(
+            successive_halving(
+                dm,
+                configs[ids[0] :],
+                evaluate,
+                start_dt,
+                ends,
+                eta=eta,
+                flat_start=flat_start,
+                first_rung=s_max - s,
+                config_ids=ids,
+                bracket=s_max - s,
+            )
+        )
+    finalists = sorted((f for p in parts for f in p.finalists), key=lambda x: -x[0] if math.isfinite(x[0]) else math.inf)
+    records = pd.concat([p.records for p in parts], ignore_index=True) if parts else pd.DataFrame(columns=RECORD_COLUMNS)
+    return configs, HalvingResult(records=records, finalists=finalists, bars_simulated=sum(p.bars_simulated for p in parts))
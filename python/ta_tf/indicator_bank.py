@@ -0,0 +1,168 @@
+"""Indicator bank: many IndicatorConfigs over one price history.
+
+Rolling means come from cumulative sums (O(1) per bar for any window, with
+MATLAB ``movmean(..., 'omitnan')`` partial-window semantics) and EMAs for many
+spans are computed once per span and cached. ``dm_for(ind_cfg)``
+assembles an ``OhlcvDataManager`` from cached columns, so an optimizer can
+sample indicator windows jointly with StrategyConfig without recomputing
+everything per sample.
+
+For prices on an integer tick grid (KRX) the columns are bit-identical to
+``OhlcvDataManager(frame, ind_cfg)``; for arbitrary floats rolling sums may
+differ in the last ulp (pandas uses a running compensated sum).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import IndicatorConfig
+from .data_manager import INDICATOR_GROUPS, OhlcvDataManager
+from .data_provider import OhlcvFrame
+from .indicators import ema, ema_state
+
+
+def ema_bank(values: np.ndarray, spans: Sequence[int]) -> np.ndarray:
+    """EMAs of ``values`` for every span, shape ``(len(values), len(spans))``.
+
+    One :func:`indicators.ema` (pandas ``ewm(adjust=False, min_periods=1)``,
+    a compiled loop) per span, so columns match the data manager bit-for-bit.
+    """
+    spans = [int(s) for s in spans]
+    if any(s <= 0 for s in spans):
+        raise ValueError("span must be positive")
+    x = pd.Series(np.asarray(values, dtype=float))
+    out = np.empty((len(x), len(spans)), dtype=float)
+    for j, s in enumerate(spans):
+        out[:, j] = ema(x, s).to_numpy()
+    return out
+
+
+class IndicatorBank:
+    """Cached indicator columns for one symbol, keyed by window/span."""
+
+    def __init__(self, frame: OhlcvFrame):
+        self.frame = frame
+        # deduplicated / sorted once, as OhlcvDataManager does per build
+        df = frame.df[~frame.df.index.duplicated(keep="last")].sort_index()
+        self._df = df
+        self._py_ts = list(df.index.to_pydatetime())
+        self._close = df["Close"].astype(float)
+        self._tr = self._true_range(df)
+        self._prefix = {"close": self._prefix_sums(self._close.to_numpy()), "tr": self._prefix_sums(self._tr)}
+        self._sma: dict[tuple[str, int], np.ndarray] = {}
+        self._ema: dict[int, np.ndarray] = {}
+        self._macd: dict[tuple[int, int, int], tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def _true_range(df: pd.DataFrame) -> np.ndarray:
+        # Same TR as indicators.atr() (max over the three ranges, NaN-skipping).
+        high = df["High"].astype(float)
+        low = df["Low"].astype(float)
+        prev_close = df["Close"].astype(float).shift(1)
+        tr = pd.concat([(high - low).abs(), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+        return tr.to_numpy(dtype=float)
+
+    @staticmethod
+    def _prefix_sums(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ok = np.isfinite(x)
+        s = np.concatenate([[0.0], np.cumsum(np.where(ok, x, 0.0))])
+        c = np.concatenate([[0], np.cumsum(ok, dtype=np.int64)])
+        return s, c
+
+    def rolling_mean(self, source: str, window: int) -> np.ndarray:
+        """Trailing mean over ``window`` bars (partial at the start, NaNs skipped)."""
+        key = (source, int(window))
+        out = self._sma.get(key)
+        if out is None:
+            if int(window) <= 0:
+                raise ValueError("window must be positive")
+            s, c = self._prefix[source]
+            hi = np.arange(1, len(s))
+            lo = np.maximum(hi - int(window), 0)
+            cnt = c[hi] - c[lo]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out = np.where(cnt > 0, (s[hi] - s[lo]) / cnt, np.nan)
+            self._sma[key] = out
+        return out
+
+    def sma(self, window: int) -> np.ndarray:
+        return self.rolling_mean("close", window)
+
+    def atr(self, window: int) -> np.ndarray:
+        return self.rolling_mean("tr", window)
+
+    def prepare_emas(self, spans: Iterable[int]) -> None:
+        """Compute and cache the close EMAs of all missing ``spans``."""
+        todo = sorted({int(s) for s in spans} - set(self._ema))
+        if todo:
+            block = ema_bank(self._close.to_numpy(), todo)
+            for j, s in enumerate(todo):
+                self._ema[s] = block[:, j]
+
+    def macd(self, fast: int, slow: int, signal: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """MACD line, signal line and histogram (cached)."""
+        key = (int(fast), int(slow), int(signal))
+        out = self._macd.get(key)
+        if out is None:
+            self.prepare_emas([fast, slow])
+            line = self._ema[int(fast)] - self._ema[int(slow)]
+            sig = ema_bank(line, [int(signal)])[:, 0]
+            out = (line, sig, line - sig)
+            self._macd[key] = out
+        return out
+
+    def long_term_trend(self, window: int, lookback: int) -> np.ndarray:
+        sma_lt = self.sma(window)
+        lb = int(lookback)
+        prev = np.full(len(sma_lt), np.nan)
+        if lb < len(sma_lt):
+            prev[lb:] = sma_lt[: len(sma_lt) - lb]
+        diff = sma_lt - prev
+        trend = np.where(diff > 0, 1, np.where(diff < 0, -1, 0)).astype(np.int8)
+        trend[(~np.isfinite(sma_lt)) | (~np.isfinite(prev))] = 0
+        return trend
+
+    def prepare(self, ind_cfgs: Iterable[IndicatorConfig]) -> None:
+        """Warm the caches for a batch of configs (one EMA pass for all spans)."""
+        cfgs = list(ind_cfgs)
+        self.prepare_emas([c.macd_fast for c in cfgs] + [c.macd_slow for c in cfgs])
+
+    def dm_for(self, ind_cfg: IndicatorConfig, indicators: Optional[Iterable[str]] = None) -> OhlcvDataManager:
+        """Data manager equal to ``OhlcvDataManager(frame, ind_cfg)``, from cached columns.
+
+        ``indicators`` limits the groups filled in (default: all); others are
+        built by the manager on first use.
+        """
+        cfg = ind_cfg
+        groups = set(INDICATOR_GROUPS if indicators is None else indicators)
+        cols: dict[str, np.ndarray] = {}
+        ema_states: dict = {}
+        if "sma" in groups:
+            cols["smaWeek"] = self.sma(cfg.sma_week)
+            cols["smaFast"] = self.sma(cfg.sma_fast)
+            cols["smaSlow"] = self.sma(cfg.sma_slow)
+        if "trend" in groups:
+            cols["smaLongTerm"] = self.sma(cfg.sma_long_term)
+        if "atr" in groups:
+            cols["atr"] = self.atr(cfg.atr_window)
+        if "trend" in groups:
+            cols["longTermTrend"] = self.long_term_trend(cfg.sma_long_term, cfg.long_trend_lookback)
+        if "macd" in groups:
+            line, sig, hist = self.macd(cfg.macd_fast, cfg.macd_slow, cfg.macd_signal)
+            cols["macdLine"] = line
+            cols["macdSignal"] = sig
+            cols["macdHist"] = hist
+
+            close = self._close.to_numpy()
+            ema_states = {
+                "fast": ema_state(close, self._ema[int(cfg.macd_fast)], cfg.macd_fast),
+                "slow": ema_state(close, self._ema[int(cfg.macd_slow)], cfg.macd_slow),
+                "signal": ema_state(line, sig, cfg.macd_signal),
+            }
+        # one concat instead of per-column __setitem__; the bars are shared, not copied
+        df = pd.concat([self._df, pd.DataFrame(cols, index=self._df.index)], axis=1) if cols else self._df.copy(deep=False)
+        return OhlcvDataManager._from_parts(self.frame.symbol, cfg, df, ema_states, complete=True, py_ts=self._py_ts)
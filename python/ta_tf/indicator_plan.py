@@ -0,0 +1,92 @@
+"""Indicator requirements and warm-up length derived from the configs.
+
+``plan_indicators`` turns a StrategyConfig into the indicator groups its
+decision actually reads (``ta_tf.data_manager.INDICATOR_GROUPS``) and the
+number of bars of history those need before the first bar that matters:
+
+- rolling means are exact after ``window - 1`` earlier bars (ATR one more,
+  for the previous close; the long-term trend adds its lookback);
+- EMAs never forget their start, so MACD gets the bars after which the
+  weight of the pre-history falls below ``ema_tol`` (slow EMA, then the
+  signal EMA on top of it);
+- decisions read the previous bar and ``confirm_days`` stacked bars.
+
+``warmup_days`` converts bars to calendar days for date-based fetches (daily
+KRX bars).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import IndicatorConfig, StrategyConfig
+from .data_manager import INDICATOR_GROUPS
+
+DEFAULT_EMA_TOL = 1e-3
+
+
+@dataclass(frozen=True)
+class IndicatorPlan:
+    groups: tuple[str, ...]  # in INDICATOR_GROUPS order
+    warmup_bars: int
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(c for g in self.groups for c in INDICATOR_GROUPS[g])
+
+
+def required_indicators(strat_cfg: Optional[StrategyConfig] = None) -> tuple[str, ...]:
+    """Indicator groups the decision of ``strat_cfg`` reads (all groups for ``None``)."""
+    if strat_cfg is None:
+        return tuple(INDICATOR_GROUPS)
+    cfg = strat_cfg
+    need = {"sma"}
+    if cfg.use_atr_filter:
+        need.add("atr")
+    if cfg.use_long_trend_filter or (cfg.enable_short and cfg.use_short_trend_filter):
+        need.add("trend")
+    if cfg.use_macd_regime_filter or cfg.use_macd_exit:
+        need.add("macd")
+    return tuple(g for g in INDICATOR_GROUPS if g in need)
+
+
+def _ema_bars(span: int, tol: float) -> int:
+    alpha = 2.0 / (int(span) + 1.0)
+    if alpha >= 1.0:
+        return 0
+    return int(math.ceil(math.log(tol) / math.log(1.0 - alpha)))
+
+
+def group_warmup_bars(ind_cfg: IndicatorConfig, group: str, ema_tol: float = DEFAULT_EMA_TOL) -> int:
+    """Earlier bars one indicator group needs for a settled value on a bar."""
+    cfg = ind_cfg
+    if group == "sma":
+        return max(cfg.sma_week, cfg.sma_fast, cfg.sma_slow) - 1
+    if group == "atr":
+        return int(cfg.atr_window)
+    if group == "trend":
+        return cfg.sma_long_term - 1 + cfg.long_trend_lookback
+    if group == "macd":
+        return max(_ema_bars(cfg.macd_fast, ema_tol), _ema_bars(cfg.macd_slow, ema_tol)) + _ema_bars(cfg.macd_signal, ema_tol)
+    raise ValueError(f"Unknown indicator group: {group!r}")
+
+
+def plan_indicators(
+    ind_cfg: IndicatorConfig,
+    strat_cfg: Optional[StrategyConfig] = None,
+    ema_tol: float = DEFAULT_EMA_TOL,
+) -> IndicatorPlan:
+    """Groups to build and warm-up bars for ``strat_cfg`` (every group for ``None``,
+    e.g. an optimizer sampling the filter switches)."""
+    groups = required_indicators(strat_cfg)
+    conf = max(1, int(strat_cfg.confirm_days)) if strat_cfg is not None else 1
+    bars = max(group_warmup_bars(ind_cfg, g, ema_tol) for g in groups) + conf
+    return IndicatorPlan(groups=groups, warmup_bars=int(bars))
+
+
+def warmup_days(n_bars: int) -> int:
+    """Calendar days that hold at least ``n_bars`` daily KRX bars (weekends, holidays)."""
+    return int(math.ceil(int(n_bars) * 7 / 5 * 1.1)) + 14
+
@@ -50,3 +50,50 @@ def macd(df: pd.DataFrame, fast: int, slow: int, signal: int) -> tuple[pd.Series
     signal_line = ema(macd_line, signal)
     hist = macd_line - signal_line
     return macd_line, signal_line, hist
+
+
+def ema_continue(
+    values: np.ndarray,
+    span: int,
+    state: tuple[float, float] = (float("nan"), 1.0),
+) -> tuple[np.ndarray, tuple[float, float]]:
+    """Continue :func:`ema` over new samples from a saved recursion state.
+
+    ``state`` is ``(last_ema, old_weight)``. The update reproduces pandas'
+    ``ewm(adjust=False)`` recursion step by step (including NaN handling), so
+    ``ema(full)`` and ``ema(head)`` + ``ema_continue(tail)`` agree bit-for-bit.
+    """
+    if span <= 0:
+        raise ValueError("span must be positive")
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_factor = 1.0 - alpha
+    w, old_wt = float(state[0]), float(state[1])
+    out = np.empty(len(values), dtype=float)
+    for i, cur in enumerate(np.asarray(values, dtype=float)):
+        cur = float(cur)
+        if w == w:
+            old_wt *= old_factor
+            if cur == cur:
+                if w != cur:
+                    w = (old_wt * w + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif cur == cur:
+            w = cur
+        out[i] = w
+    return out, (w, old_wt)
+
+
+def ema_state(values: np.ndarray, ema_values: np.ndarray, span: int) -> tuple[float, float]:
+    """Recursion state after :func:`ema` has consumed ``values``."""
+    if len(values) == 0:
+        return float("nan"), 1.0
+    w = float(ema_values[-1])
+    old_wt = 1.0
+    if w == w:
+        old_factor = 1.0 - 1.0 / (1.0 + (span - 1) / 2.0)
+        # pandas keeps decaying the old weight over trailing NaN inputs
+        for cur in np.asarray(values, dtype=float)[::-1]:
+            if cur == cur:
+                break
+            old_wt *= old_factor
+    return w, old_wt
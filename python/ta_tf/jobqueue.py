@@ -0,0 +1,649 @@
+"""Pluggable job queue for spreading optimizer sweeps over processes and hosts.
+
+A job is a batch of configs plus the context needed to evaluate them (data
+source, windows, costs). Stateless workers ``claim`` a job under a lease, run
+it with the regular engine and ``complete`` it with one result per config key.
+Delivery is at-least-once: a job whose lease expires (dead or slow worker) is
+handed out again, and duplicate results are dropped by config key. A job that
+raises is released with ``fail``; after ``max_attempts`` claims it is marked
+``failed`` (also when the leases just expire) and ``wait_results`` raises
+instead of waiting for it. Submitting a failed job again resets it.
+
+Backends:
+- ``SqliteJobQueue``: one SQLite file, e.g. on a shared volume (rollback
+  journal, so it also works where WAL is not supported)
+- ``MemoryJobQueue`` served by ``QueueBroker`` over a localhost/LAN TCP socket
+  (newline-delimited JSON), accessed with ``SocketJobQueue``
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import pandas as pd
+
+from .backtest import run_step1_on
+from .config import CostConfig, IndicatorConfig, StrategyConfig
+from .data_provider import CsvProvider, PanelCsvProvider, YfinanceProvider
+from .indicator_bank import IndicatorBank
+from .optimize import _score_equity
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def _dumps(x: Any) -> str:
+    return json.dumps(x, sort_keys=True, separators=(",", ":"))
+
+
+def config_key(item: dict, context: dict) -> str:
+    """Stable key of one evaluation (config + everything that affects its result)."""
+    return hashlib.sha1(_dumps({"item": item, "ctx": context}).encode("utf-8")).hexdigest()
+
+
+def make_item(strat_cfg: StrategyConfig, ind_cfg: Optional[IndicatorConfig] = None) -> dict:
+    """JSON payload of one config."""
+    return {"strat": asdict(strat_cfg), "ind": asdict(ind_cfg if ind_cfg is not None else IndicatorConfig())}
+
+
+@dataclass(frozen=True)
+class Job:
+    job_id: str
+    payload: dict  # {"context": {...}, "items": [{"key", "strat", "ind"}, ...]}
+
+
+class JobQueue:
+    """Queue interface shared by all backends."""
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        """Add jobs (already known job ids are ignored); returns the number added."""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, lease_s: float = 300.0) -> Optional[Job]:
+        """Lease the next pending (or expired) job, or None if there is none."""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, results: dict[str, dict]) -> None:
+        """Store ``{config_key: result}`` and mark the job done."""
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Release a job that raised: pending again, or ``failed`` after ``max_attempts`` claims.
+
+        Ignored unless ``worker_id`` still holds the lease.
+        """
+        raise NotImplementedError
+
+    def failed(self, keys: Sequence[str]) -> dict[str, str]:
+        """``{config_key: error}`` for the keys whose job has failed."""
+        raise NotImplementedError
+
+    def fetch_results(self, keys: Sequence[str]) -> dict[str, dict]:
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# In-memory backend (used by the socket broker)
+# ---------------------------------------------------------------------------
+
+
+class MemoryJobQueue(JobQueue):
+    """Jobs in a dict; pending ids in a FIFO and leases in a heap, so claim and
+    complete stay O(log jobs) on large sweeps."""
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> None:
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}  # job_id -> {"payload", "status", "worker", "lease_until", "attempts", "error"}
+        self._pending: deque[str] = deque()
+        self._leases: list[tuple[float, str]] = []  # heap of (lease_until, job_id); stale entries skipped
+        self._counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        self._failed_keys: dict[str, str] = {}
+        self._results: dict[str, dict] = {}
+
+    def _set_status(self, jid: str, j: dict, status: str) -> None:
+        self._counts[j["status"]] -= 1
+        self._counts[status] += 1
+        j["status"] = status
+        if status == "failed":
+            self._failed_keys.update({it["key"]: j["error"] for it in j["payload"]["items"]})
+        elif status == "pending":
+            self._pending.append(jid)
+
+    def _lease(self, jid: str, j: dict, worker_id: str, now: float, lease_s: float) -> Job:
+        if j["status"] != "running":
+            self._set_status(jid, j, "running")
+        j.update(worker=worker_id, lease_until=now + float(lease_s), attempts=j["attempts"] + 1)
+        heapq.heappush(self._leases, (j["lease_until"], jid))
+        return Job(jid, j["payload"])
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        added = 0
+        with self._lock:
+            for job in jobs:
+                old = self._jobs.get(job.job_id)
+                if old is not None:
+                    if old["status"] != "failed":
+                        continue
+                    for it in old["payload"]["items"]:
+                        self._failed_keys.pop(it["key"], None)
+                    self._counts["failed"] -= 1
+                self._jobs[job.job_id] = {"payload": job.payload, "status": "pending", "worker": None, "lease_until": 0.0, "attempts": 0, "error": None}
+                self._counts["pending"] += 1
+                self._pending.append(job.job_id)
+                added += 1
+        return added
+
+    def claim(self, worker_id: str, lease_s: float = 300.0) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            # expired leases first (handed out again, or failed after max_attempts)
+            while self._leases and self._leases[0][0] < now:
+                until, jid = heapq.heappop(self._leases)
+                j = self._jobs[jid]
+                if j["status"] != "running" or j["lease_until"] != until:
+                    continue  # completed, released or re-leased since
+                if j["attempts"] >= self.max_attempts:
+                    j["error"] = j["error"] or f"lease expired {j['attempts']} times"
+                    self._set_status(jid, j, "failed")
+                    continue
+                return self._lease(jid, j, worker_id, now, lease_s)
+            while self._pending:
+                jid = self._pending.popleft()
+                j = self._jobs[jid]
+                if j["status"] == "pending":
+                    return self._lease(jid, j, worker_id, now, lease_s)
+        return None
+
+    def complete(self, job_id: str, results: dict[str, dict]) -> None:
+        with self._lock:
+            for k, v in results.items():
+                self._results.setdefault(k, v)
+            j = self._jobs.get(job_id)
+            if j is not None and j["status"] != "done":
+                if j["status"] == "failed":
+                    for it in j["payload"]["items"]:
+                        self._failed_keys.pop(it["key"], None)
+                self._set_status(job_id, j, "done")
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with self._lock:
+            j = self._jobs.get(job_id)
+            if j is None or j["status"] != "running" or j["worker"] != worker_id:
+                return  # lease lost: the job belongs to another worker now
+            j.update(lease_until=0.0, error=str(error))
+            self._set_status(job_id, j, "failed" if j["attempts"] >= self.max_attempts else "pending")
+
+    def failed(self, keys: Sequence[str]) -> dict[str, str]:
+        with self._lock:
+            return {k: self._failed_keys[k] for k in keys if k in self._failed_keys}
+
+    def fetch_results(self, keys: Sequence[str]) -> dict[str, dict]:
+        with self._lock:
+            return {k: self._results[k] for k in keys if k in self._results}
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._counts, "results": len(self._results)}
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend
+# ---------------------------------------------------------------------------
+
+
+class SqliteJobQueue(JobQueue):
+    """Queue in one SQLite file; every call is a short transaction."""
+
+    def __init__(self, path: str | Path, timeout: float = 60.0, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = str(path)
+        self.timeout = float(timeout)
+        self.max_attempts = max(1, int(max_attempts))
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        con = self._connect()
+        try:
+            con.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    seq INTEGER,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, seq);
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    job_id TEXT,
+                    result TEXT NOT NULL
+                );
+                """
+            )
+            if "error" not in {r[1] for r in con.execute("PRAGMA table_info(jobs)")}:
+                con.execute("ALTER TABLE jobs ADD COLUMN error TEXT")  # queue files of older versions
+        finally:
+            con.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: explicit BEGIN IMMEDIATE for claim
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            seq0 = con.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()[0]
+            before = con.total_changes
+            con.executemany(
+                "INSERT OR IGNORE INTO jobs(job_id, seq, payload) VALUES (?, ?, ?)",
+                [(j.job_id, seq0 + i + 1, _dumps(j.payload)) for i, j in enumerate(jobs)],
+            )
+            con.executemany(
+                "UPDATE jobs SET status = 'pending', attempts = 0, lease_until = 0, error = NULL "
+                "WHERE job_id = ? AND status = 'failed'",
+                [(j.job_id,) for j in jobs],
+            )
+            con.execute("COMMIT")
+            return con.total_changes - before
+        finally:
+            con.close()
+
+    def claim(self, worker_id: str, lease_s: float = 300.0) -> Optional[Job]:
+        now = time.time()
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired ' || attempts || ' times') "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = con.execute(
+                "SELECT job_id, payload FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY seq LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                con.execute("COMMIT")
+                return None
+            con.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now + float(lease_s), row[0]),
+            )
+            con.execute("COMMIT")
+            return Job(row[0], json.loads(row[1]))
+        finally:
+            con.close()
+
+    def complete(self, job_id: str, results: dict[str, dict]) -> None:
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            con.executemany(
+                "INSERT OR IGNORE INTO results(key, job_id, result) VALUES (?, ?, ?)",
+                [(k, job_id, _dumps(v)) for k, v in results.items()],
+            )
+            con.execute("UPDATE jobs SET status = 'done' WHERE job_id = ?", (job_id,))
+            con.execute("COMMIT")
+        finally:
+            con.close()
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        con = self._connect()
+        try:
+            con.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_until = 0, error = ? WHERE job_id = ? AND status = 'running' AND worker = ?",
+                (self.max_attempts, str(error), job_id, worker_id),
+            )
+        finally:
+            con.close()
+
+    def failed(self, keys: Sequence[str]) -> dict[str, str]:
+        want = set(keys)
+        con = self._connect()
+        try:
+            rows = con.execute("SELECT payload, error FROM jobs WHERE status = 'failed'").fetchall()
+        finally:
+            con.close()
+        return {it["key"]: err for payload, err in rows for it in json.loads(payload)["items"] if it["key"] in want}
+
+    def fetch_results(self, keys: Sequence[str]) -> dict[str, dict]:
+        out: dict[str, dict] = {}
+        keys = list(keys)
+        con = self._connect()
+        try:
+            for i in range(0, len(keys), 500):
+                part = keys[i : i + 500]
+                q = "SELECT key, result FROM results WHERE key IN (%s)" % ",".join("?" * len(part))
+                out.update({k: json.loads(v) for k, v in con.execute(q, part)})
+        finally:
+            con.close()
+        return out
+
+    def stats(self) -> dict[str, int]:
+        con = self._connect()
+        try:
+            out = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+            out.update({s: int(c) for s, c in con.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")})
+            out["results"] = int(con.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+            return out
+        finally:
+            con.close()
+
+
+# ---------------------------------------------------------------------------
+# Socket broker + client
+# ---------------------------------------------------------------------------
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        q: JobQueue = self.server.queue  # type: ignore[attr-defined]
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                op = req["op"]
+                if op == "submit":
+                    res = q.submit([Job(j["job_id"], j["payload"]) for j in req["jobs"]])
+                elif op == "claim":
+                    job = q.claim(req["worker_id"], float(req.get("lease_s", 300.0)))
+                    res = None if job is None else {"job_id": job.job_id, "payload": job.payload}
+                elif op == "complete":
+                    res = q.complete(req["job_id"], req["results"])
+                elif op == "fail":
+                    res = q.fail(req["job_id"], req["worker_id"], req["error"])
+                elif op == "failed":
+                    res = q.failed(req["keys"])
+                elif op == "fetch_results":
+                    res = q.fetch_results(req["keys"])
+                elif op == "stats":
+                    res = q.stats()
+                else:
+                    raise ValueError(f"unknown op: {op}")
+                out = {"ok": True, "result": res}
+            except Exception as e:  # reported to the client
+                out = {"ok": False, "error": repr(e)}
+            self.wfile.write((json.dumps(out) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class QueueBroker:
+    """TCP front-end for a queue backend (default: in-memory).
+
+    ``start()`` serves from a daemon thread, so a driver or test can run the
+    broker in-process; ``address`` is the bound ``(host, port)``.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, host: str = "127.0.0.1", port: int = 0):
+        self.queue = queue if queue is not None else MemoryJobQueue()
+        self._server = socketserver.ThreadingTCPServer((host, int(port)), _BrokerHandler, bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._server.queue = self.queue  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "QueueBroker":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="queue-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SocketJobQueue(JobQueue):
+    """Client of a ``QueueBroker`` (one persistent connection, reconnects on error)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 60.0):
+        self.addr = (host, int(port))
+        self.timeout = float(timeout)
+        self._sock: Optional[socket.socket] = None
+        self._f = None
+        self._lock = threading.Lock()
+
+    def _call(self, req: dict) -> Any:
+        data = (json.dumps(req) + "\n").encode("utf-8")
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._sock = socket.create_connection(self.addr, timeout=self.timeout)
+                        self._f = self._sock.makefile("rb")
+                    self._sock.sendall(data)
+                    line = self._f.readline()
+                    if not line:
+                        raise ConnectionError("broker closed the connection")
+                    break
+                except OSError:
+                    self.close()
+                    if attempt == 1:
+                        raise
+        resp = json.loads(line)
+        if not resp["ok"]:
+            raise RuntimeError(f"broker error: {resp['error']}")
+        return resp["result"]
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock, self._f = None, None
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        return int(self._call({"op": "submit", "jobs": [{"job_id": j.job_id, "payload": j.payload} for j in jobs]}))
+
+    def claim(self, worker_id: str, lease_s: float = 300.0) -> Optional[Job]:
+        r = self._call({"op": "claim", "worker_id": worker_id, "lease_s": float(lease_s)})
+        return None if r is None else Job(r["job_id"], r["payload"])
+
+    def complete(self, job_id: str, results: dict[str, dict]) -> None:
+        self._call({"op": "complete", "job_id": job_id, "results": results})
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        self._call({"op": "fail", "job_id": job_id, "worker_id": worker_id, "error": str(error)})
+
+    def failed(self, keys: Sequence[str]) -> dict[str, str]:
+        return self._call({"op": "failed", "keys": list(keys)})
+
+    def fetch_results(self, keys: Sequence[str]) -> dict[str, dict]:
+        return self._call({"op": "fetch_results", "keys": list(keys)})
+
+    def stats(self) -> dict[str, int]:
+        return self._call({"op": "stats"})
+
+
+def open_queue(spec: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> JobQueue:
+    """``sqlite:/path/queue.db`` or ``tcp://host:port`` (the broker applies its own ``max_attempts``)."""
+    if spec.startswith("sqlite:"):
+        return SqliteJobQueue(spec[len("sqlite:") :], max_attempts=max_attempts)
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://") :].rsplit(":", 1)
+        return SocketJobQueue(host, int(port))
+    raise ValueError(f"Unknown queue spec: {spec!r} (use sqlite:PATH or tcp://HOST:PORT)")
+
+
+# ---------------------------------------------------------------------------
+# Driver / worker
+# ---------------------------------------------------------------------------
+
+
+def submit_configs(queue: JobQueue, context: dict, items: Sequence[dict], batch_size: int = 32) -> list[str]:
+    """Queue ``items`` (see ``make_item``) in batches; returns their config keys in order.
+
+    Configs whose result already exists are not queued again.
+    """
+    keys = [config_key(it, context) for it in items]
+    have = queue.fetch_results(keys)
+    todo = [dict(it, key=k) for it, k in zip(items, keys) if k not in have]
+    jobs = []
+    for i in range(0, len(todo), max(1, int(batch_size))):
+        part = todo[i : i + max(1, int(batch_size))]
+        job_id = hashlib.sha1("|".join(x["key"] for x in part).encode("utf-8")).hexdigest()
+        jobs.append(Job(job_id, {"context": context, "items": part}))
+    if jobs:
+        queue.submit(jobs)
+    return keys
+
+
+def wait_results(queue: JobQueue, keys: Sequence[str], poll_s: float = 0.5, timeout: Optional[float] = None) -> list[dict]:
+    """Block until every key has a result; returns them in key order.
+
+    Raises ``RuntimeError`` as soon as the job of a missing key has failed.
+    """
+    got: dict[str, dict] = {}
+    missing = list(dict.fromkeys(keys))
+    t0 = time.time()
+    while missing:
+        got.update(queue.fetch_results(missing))
+        missing = [k for k in missing if k not in got]
+        if not missing:
+            break
+        bad = queue.failed(missing)
+        if bad:
+            key, err = next(iter(bad.items()))
+            raise RuntimeError(f"{len(bad)} configs failed on the workers (e.g. {key[:12]}: {err})")
+        if timeout is not None and time.time() - t0 > float(timeout):
+            raise TimeoutError(f"{len(missing)} results still missing after {timeout}s")
+        time.sleep(float(poll_s))
+    return [got[k] for k in keys]
+
+
+def distributed_evaluate(
+    queue: JobQueue,
+    context: dict,
+    items: Sequence[dict],
+    batch_size: int = 32,
+    poll_s: float = 0.5,
+    timeout: Optional[float] = None,
+) -> list[dict]:
+    """Submit + wait: ``{"score", "cagr", "max_dd", "final_equity", "n_trades"}`` per item."""
+    keys = submit_configs(queue, context, items, batch_size=batch_size)
+    return wait_results(queue, keys, poll_s=poll_s, timeout=timeout)
+
+
+def sweep_context(
+    symbol: str,
+    train_start: str,
+    train_end: str,
+    cost_cfg: CostConfig,
+    dd_penalty: float = 0.5,
+    panel_csv: Optional[str] = None,
+    csv: Optional[str] = None,
+    fetch_start: Optional[str] = None,
+    flat_start: bool = False,
+) -> dict:
+    """Everything a worker needs besides the configs (paths must be visible to workers)."""
+    ctx = {
+        "symbol": symbol,
+        "panel_csv": str(panel_csv) if panel_csv else None,
+        "csv": str(csv) if csv else None,
+        "fetch_start": fetch_start,
+        "train_start": str(train_start),
+        "train_end": str(train_end),
+        "cost_cfg": asdict(cost_cfg),
+        "dd_penalty": float(dd_penalty),
+    }
+    if flat_start:  # only when set, so existing result keys stay valid
+        ctx["flat_start"] = True
+    return ctx
+
+
+@lru_cache(maxsize=4)
+def _worker_dm_for(ctx_json: str):
+    """Per-process data cache: one frame + indicator bank per data context."""
+    ctx = json.loads(ctx_json)
+    if ctx.get("panel_csv"):
+        frame = PanelCsvProvider().fetch(ctx["panel_csv"], ctx["symbol"], start=ctx.get("fetch_start"), end=ctx["train_end"])
+    elif ctx.get("csv"):
+        frame = CsvProvider().fetch(csv_path=ctx["csv"], symbol=ctx["symbol"])
+    else:
+        frame = YfinanceProvider().fetch(ctx["symbol"], start=ctx.get("fetch_start"), end=ctx["train_end"], interval="1d")
+    return lru_cache(maxsize=64)(IndicatorBank(frame).dm_for)
+
+
+def run_job(payload: dict) -> dict[str, dict]:
+    """Evaluate one job with the in-memory engine: ``{config_key: result}``."""
+    ctx = payload["context"]
+    data_ctx = {k: ctx.get(k) for k in ("symbol", "panel_csv", "csv", "fetch_start", "train_end")}
+    dm_for = _worker_dm_for(_dumps(data_ctx))
+    cost_cfg = CostConfig(**ctx["cost_cfg"])
+    start, end = pd.Timestamp(ctx["train_start"]), pd.Timestamp(ctx["train_end"])
+    out = {}
+    for it in payload["items"]:
+        res = run_step1_on(
+            dm_for(IndicatorConfig(**it["ind"])),
+            StrategyConfig(**it["strat"]),
+            cost_cfg,
+            start_dt=start,
+            end_dt=end,
+            flat_start=bool(ctx.get("flat_start", False)),
+        )
+        score, g, mdd = _score_equity(res.equity, dd_penalty=float(ctx["dd_penalty"]))
+        out[it["key"]] = {
+            "score": score,
+            "cagr": g,
+            "max_dd": mdd,
+            "final_equity": float(res.equity.iloc[-1]) if len(res.equity) else float("nan"),
+            "n_trades": int(len(res.trades)),
+        }
+    return out
+
+
+def run_worker(
+    queue: JobQueue,
+    worker_id: str,
+    lease_s: float = 300.0,
+    poll_s: float = 1.0,
+    idle_exit_s: Optional[float] = None,
+) -> int:
+    """Claim -> run -> complete until idle for ``idle_exit_s`` (None: forever).
+
+    A job that raises is handed back with ``fail`` (the worker keeps going).
+    Returns the number of jobs completed.
+    """
+    done = 0
+    idle_since = time.time()
+    while True:
+        job = queue.claim(worker_id, lease_s=lease_s)
+        if job is None:
+            if idle_exit_s is not None and time.time() - idle_since >= float(idle_exit_s):
+                return done
+            time.sleep(float(poll_s))
+            continue
+        try:
+            results = run_job(job.payload)
+        except Exception as e:
+            queue.fail(job.job_id, worker_id, f"{worker_id}: {type(e).__name__}: {e}")
+        else:
+            queue.complete(job.job_id, results)
+            done += 1
+        idle_since = time.time()
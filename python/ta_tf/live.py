@@ -0,0 +1,311 @@
+"""Asyncio live loop: bar feed -> traders -> order intents -> broker adapter.
+
+Pieces:
+- ``serve_replay`` streams bars of one or more frames over a localhost TCP
+  socket (one JSON object per line), at ``speed`` x real time (``speed <= 0``:
+  as fast as possible). Every client connection gets the whole stream.
+- ``read_feed`` connects to such a feed and yields ``Bar`` objects.
+- ``LiveRunner`` appends each bar to a ``FanoutHost`` (indicators once per
+  symbol, all attached traders stepped), then turns each trader's next-bar
+  plan (``ta_tf.next_bar``) into ``OrderIntent`` objects for the broker.
+- ``BrokerAdapter`` is the pluggable order sink; ``SimulatedBroker`` is a
+  stand-in with a configurable round-trip latency.
+- Stage latencies and counters go to a ``Telemetry`` (``ta_tf.telemetry``).
+
+Intents go through a queue drained by separate broker tasks, so a slow broker
+(or any other I/O) never delays the processing of the next bar: the bar
+handler only does the decision work and ``put_nowait``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional
+
+import pandas as pd
+
+from .data_provider import OhlcvFrame
+from .fanout import FanoutHost
+from .next_bar import NextBarPlan
+from .telemetry import Telemetry, TelemetryExporter
+
+_EOF = {"type": "eof"}
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Bar:
+    symbol: str
+    timestamp: pd.Timestamp
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "symbol": self.symbol,
+                "ts": self.timestamp.isoformat(),
+                "open": self.open,
+                "high": self.high,
+                "low": self.low,
+                "close": self.close,
+                "volume": self.volume,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Bar":
+        return cls(
+            symbol=str(d["symbol"]),
+            timestamp=pd.Timestamp(d["ts"]),
+            open=float(d["open"]),
+            high=float(d["high"]),
+            low=float(d["low"]),
+            close=float(d["close"]),
+            volume=float(d["volume"]),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """One-row OHLCV frame for ``OhlcvDataManager.append``."""
+        return pd.DataFrame(
+            {"Open": [self.open], "High": [self.high], "Low": [self.low], "Close": [self.close], "Volume": [self.volume]},
+            index=pd.DatetimeIndex([self.timestamp]),
+        )
+
+
+def replay_bars(frames: Iterable[OhlcvFrame]) -> list[Bar]:
+    """Bars of all frames in time order (ties by symbol)."""
+    bars = []
+    for fr in frames:
+        df = fr.df
+        cols = [df[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close", "Volume")]
+        for i, ts in enumerate(df.index):
+            bars.append(Bar(fr.symbol, ts, *(float(c[i]) for c in cols)))
+    bars.sort(key=lambda b: (b.timestamp, b.symbol))
+    return bars
+
+
+# -- replay feed ---------------------------------------------------------------
+async def serve_replay(
+    bars: list[Bar],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    speed: float = 0.0,
+    max_gap_s: Optional[float] = None,
+) -> asyncio.AbstractServer:
+    """Start a replay server; ``server.sockets[0].getsockname()`` has the port.
+
+    Bars are paced by their timestamp gaps divided by ``speed``; ``max_gap_s``
+    caps the simulated gap (nights, weekends) before the division.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            t0 = time.perf_counter()
+            clock = 0.0  # simulated seconds since the first bar
+            prev = None
+            for b in bars:
+                if speed > 0 and prev is not None:
+                    gap = max(0.0, (b.timestamp - prev).total_seconds())
+                    clock += gap if max_gap_s is None else min(gap, float(max_gap_s))
+                    delay = clock / speed - (time.perf_counter() - t0)
+                    if delay > 0:
+                        await writer.drain()
+                        await asyncio.sleep(delay)
+                prev = b.timestamp
+                writer.write((b.to_json() + "\n").encode())
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+            writer.write((json.dumps(_EOF) + "\n").encode())
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def read_feed(host: str, port: int) -> AsyncIterator[Bar]:
+    """Bars from a replay (or compatible) feed until its end marker."""
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            d = json.loads(line)
+            if d.get("type") == "eof":
+                return
+            yield Bar.from_json(d)
+    finally:
+        writer.close()
+
+
+# -- orders ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class OrderIntent:
+    """What a trader wants at the next open, staged after a bar close.
+
+    ``kind``: ``"TARGET"`` (move to ``target_pos`` at the open) or ``"STOP"``
+    (protective stop of the carried position; the level is
+    ``plan.stop_price(open)`` once the open is known).
+    """
+
+    symbol: str
+    strategy: str
+    after: datetime
+    kind: str
+    side: str
+    from_pos: int
+    target_pos: int
+    plan: NextBarPlan
+    created: float = field(default_factory=time.perf_counter)
+
+
+def plan_intents(strategy: str, plan: NextBarPlan) -> list[OrderIntent]:
+    out = []
+    if plan.valid and plan.target != plan.pos:
+        side = "BUY" if plan.target > plan.pos else "SELL"
+        out.append(OrderIntent(plan.symbol, strategy, plan.after, "TARGET", side, plan.pos, plan.target, plan))
+    if plan.pos != 0 and plan.units != 0:
+        side = "SELL" if plan.pos == 1 else "BUY"
+        out.append(OrderIntent(plan.symbol, strategy, plan.after, "STOP", side, plan.pos, 0, plan))
+    return out
+
+
+class BrokerAdapter:
+    """Order sink. ``submit`` may be slow; it runs off the bar path."""
+
+    async def submit(self, intent: OrderIntent) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
+
+
+class SimulatedBroker(BrokerAdapter):
+    """Stand-in broker: acknowledges each intent after ``latency_s``."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = float(latency_s)
+        self.acked: list[tuple[OrderIntent, float]] = []  # (intent, seconds from creation to ack)
+
+    async def submit(self, intent: OrderIntent) -> None:
+        if self.latency_s > 0:
+            await asyncio.sleep(self.latency_s)
+        self.acked.append((intent, time.perf_counter() - intent.created))
+
+
+# -- runner ------------------------------------------------------------------------
+class LiveRunner:
+    """Feed consumer: one bar at a time through the host, intents to the broker.
+
+    Records into ``telemetry`` (``ta_tf.telemetry``) the latency of each stage
+    of the bar path: ``indicators`` (data-manager append), ``decision``
+    (traders stepped), ``intent`` (plans and queued intents) and ``bar``
+    (arrival to intents queued); ``broker_ack`` (intent created to acked);
+    counters ``bars``, ``skipped_bars``, ``trades``, ``stops``, ``intents``,
+    ``broker_errors``; gauge ``queue_depth``.
+
+    An intent the broker rejects with an exception is logged and counted in
+    ``broker_errors``; the broker tasks keep draining the queue.
+    """
+
+    def __init__(
+        self,
+        host: FanoutHost,
+        broker: BrokerAdapter,
+        broker_tasks: int = 4,
+        stage_stops: bool = True,
+        telemetry: Optional[Telemetry] = None,
+    ):
+        self.host = host
+        self.broker = broker
+        self.broker_tasks = max(1, int(broker_tasks))
+        self.stage_stops = bool(stage_stops)
+        self.queue: asyncio.Queue[OrderIntent] = asyncio.Queue()
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        tel = self.telemetry
+        self._h_ind = tel.histogram("indicators")
+        self._h_dec = tel.histogram("decision")
+        self._h_int = tel.histogram("intent")
+        self._h_bar = tel.histogram("bar")
+        self._h_ack = tel.histogram("broker_ack")
+        for name in ("bars", "skipped_bars", "trades", "stops", "intents", "broker_errors"):
+            tel.counters.setdefault(name, 0)
+
+    def on_bar(self, bar: Bar, arrived_ns: Optional[int] = None) -> None:
+        """Decision path (synchronous): append, step, plan, queue intents."""
+        t0 = time.perf_counter_ns() if arrived_ns is None else arrived_ns
+        tel = self.telemetry
+        dm = self.host.dms.get(bar.symbol)
+        t1 = time.perf_counter_ns()
+        if dm is None or not dm.append(bar.to_frame()):
+            tel.incr("skipped_bars")
+            return
+        t2 = time.perf_counter_ns()
+        events = self.host.step_pending(bar.symbol)
+        t3 = time.perf_counter_ns()
+        n = 0
+        for name, plan in self.host.plans(bar.symbol).items():
+            for intent in plan_intents(name, plan):
+                if intent.kind == "STOP" and not self.stage_stops:
+                    continue
+                self.queue.put_nowait(intent)
+                n += 1
+        t4 = time.perf_counter_ns()
+
+        self._h_ind.record(t2 - t1)
+        self._h_dec.record(t3 - t2)
+        self._h_int.record(t4 - t3)
+        self._h_bar.record(t4 - t0)
+        tel.incr("bars")
+        tel.incr("intents", n)
+        if events:
+            tel.incr("trades", len(events))
+            tel.incr("stops", sum(1 for e in events if e.reason.startswith("STOP")))
+        tel.gauge("queue_depth", self.queue.qsize())
+
+    async def _broker_loop(self) -> None:
+        while True:
+            intent = await self.queue.get()
+            try:
+                await self.broker.submit(intent)
+                self._h_ack.record(int((time.perf_counter() - intent.created) * 1e9))
+            except Exception:
+                self.telemetry.incr("broker_errors")
+                log.exception("broker rejected %s %s %s for %s", intent.kind, intent.side, intent.symbol, intent.strategy)
+            finally:
+                self.queue.task_done()
+                self.telemetry.gauge("queue_depth", self.queue.qsize())
+
+    async def run(self, feed: AsyncIterator[Bar], exporter: Optional[TelemetryExporter] = None) -> None:
+        """Consume ``feed`` to the end, then wait for the broker to drain.
+
+        ``exporter`` (if given) writes telemetry snapshots while running and
+        once more at the end.
+        """
+        workers = [asyncio.create_task(self._broker_loop()) for _ in range(self.broker_tasks)]
+        export = asyncio.create_task(exporter.run()) if exporter is not None else None
+        try:
+            async for bar in feed:
+                self.on_bar(bar)
+                # let broker tasks run between bars even when the feed is buffered
+                await asyncio.sleep(0)
+            await self.queue.join()
+        finally:
+            tasks = workers + ([export] if export is not None else [])
+            for w in tasks:
+                w.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.broker.close()
@@ -0,0 +1,177 @@
+"""Embedded market-data store (stdlib ``sqlite3``) with daily upserts.
+
+One table ``bars`` keyed by ``(ticker, ts)`` (``WITHOUT ROWID``, so rows are
+stored in key order): a single-ticker window fetch is an index range scan and
+stays in the millisecond range however long the history grows. New bars are
+added with batched, idempotent upserts instead of regenerating the panel CSV.
+
+Tickers are stored normalized like the panel lookup (``005930.KS`` -> ``5930``)
+and timestamps as naive ``YYYY-MM-DD HH:MM:SS`` text (tz-aware input keeps its
+wall-clock time), so text order is time order.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_provider import OhlcvFrame, PanelCsvProvider, _normalize_ticker
+
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    ts     TEXT NOT NULL,
+    open   REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, ts)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO bars (ticker, ts, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (ticker, ts) DO UPDATE SET
+    open = excluded.open, high = excluded.high, low = excluded.low,
+    close = excluded.close, volume = excluded.volume
+"""
+
+
+def _ts_text(x) -> str:
+    ts = pd.Timestamp(x)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.strftime(_TS_FORMAT)
+
+
+def _ts_column(index) -> np.ndarray:
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.strftime(_TS_FORMAT).to_numpy(dtype=object)
+
+
+class LocalDbProvider:
+    """OHLCV bars in a local SQLite file, served as ``OhlcvFrame``.
+
+    ``fetch`` returns the same frame as ``PanelCsvProvider.fetch`` on the
+    panel the database was loaded from.
+    """
+
+    def __init__(self, db_path: str | Path, timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.timeout = float(timeout)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        con = self._connect()
+        try:
+            con.executescript(_SCHEMA)
+        finally:
+            con.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    # -- writes ------------------------------------------------------------
+    def upsert_panel(self, panel: pd.DataFrame, batch_rows: int = 50_000) -> int:
+        """Insert or replace long-format rows (Date, Ticker, Open..Volume).
+
+        Idempotent: re-applying the same rows leaves the table unchanged.
+        Everything is written in one transaction. Returns the number of rows.
+        """
+        if len(panel) == 0:
+            return 0
+        tickers = panel["Ticker"].astype(str).map(_normalize_ticker).to_numpy(dtype=object)
+        ts = _ts_column(panel["Date"])
+        vols = panel["Volume"] if "Volume" in panel.columns else pd.Series(0.0, index=panel.index)
+        vals = [panel[c].astype(float).tolist() for c in _FIELDS[:4]] + [vols.astype(float).tolist()]
+        rows = list(zip(tickers.tolist(), ts.tolist(), *vals))
+
+        step = max(1, int(batch_rows))
+        con = self._connect()
+        try:
+            with con:
+                for i in range(0, len(rows), step):
+                    con.executemany(_UPSERT, rows[i : i + step])
+        finally:
+            con.close()
+        return len(rows)
+
+    def upsert_frame(self, frame: OhlcvFrame) -> int:
+        """Upsert the bars of one symbol (e.g. today's new bar)."""
+        df = frame.df
+        panel = pd.DataFrame({"Date": df.index, "Ticker": str(frame.symbol)})
+        for c in _FIELDS:
+            panel[c] = df[c].to_numpy(dtype=float) if c in df.columns else 0.0
+        return self.upsert_panel(panel)
+
+    def load_panel_csv(self, panel_csv_path: str | Path, batch_rows: int = 50_000) -> int:
+        """Bulk-load (or refresh) the store from a panel CSV."""
+        return self.upsert_panel(PanelCsvProvider.read_panel(panel_csv_path), batch_rows=batch_rows)
+
+    # -- reads -------------------------------------------------------------
+    def tickers(self) -> list[str]:
+        con = self._connect()
+        try:
+            return [r[0] for r in con.execute("SELECT DISTINCT ticker FROM bars ORDER BY ticker")]
+        finally:
+            con.close()
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Latest stored bar of ``symbol`` (None if absent) - where to resume a daily append."""
+        con = self._connect()
+        try:
+            row = con.execute("SELECT MAX(ts) FROM bars WHERE ticker = ?", (_normalize_ticker(symbol),)).fetchone()
+        finally:
+            con.close()
+        return None if row is None or row[0] is None else pd.Timestamp(row[0])
+
+    def fetch(self, symbol: str, start: str | None = None, end: str | None = None) -> OhlcvFrame:
+        """Bars of ``symbol`` in the inclusive window ``[start, end]`` (``None`` = open)."""
+        sql = "SELECT ts, open, high, low, close, volume FROM bars WHERE ticker = ?"
+        params: list = [_normalize_ticker(symbol)]
+        if start:
+            sql += " AND ts >= ?"
+            params.append(_ts_text(start))
+        if end:
+            sql += " AND ts <= ?"
+            params.append(_ts_text(end))
+        sql += " ORDER BY ts"
+        con = self._connect()
+        try:
+            rows = con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+        return OhlcvFrame(df=self._to_df(rows), symbol=symbol)
+
+    def fetch_all(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        symbols: list[str] | None = None,
+    ) -> dict[str, OhlcvFrame]:
+        """One frame per ticker, keyed like ``PanelCsvProvider.fetch_all``."""
+        keys: Iterable[str] = self.tickers() if symbols is None else [_normalize_ticker(s) for s in symbols]
+        frames: dict[str, OhlcvFrame] = {}
+        for key in keys:
+            sym = key.zfill(6) if key.isdigit() else key
+            frame = self.fetch(sym, start, end)
+            if len(frame.df):
+                frames[sym] = frame
+        return frames
+
+    @staticmethod
+    def _to_df(rows: list[tuple]) -> pd.DataFrame:
+        if rows:
+            ts, *cols = zip(*rows)
+        else:
+            ts, cols = (), [()] * len(_FIELDS)
+        index = pd.DatetimeIndex(pd.to_datetime(list(ts), format=_TS_FORMAT), name="Date").as_unit("us")
+        data = {c: np.asarray(v, dtype=float) for c, v in zip(_FIELDS, cols)}
+        return pd.DataFrame(data, index=index)
@@ -5,6 +5,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from .data_provider import _align_bound, resolve_window
+
 
 def max_drawdown(equity: pd.Series) -> float:
     """Maximum drawdown (as positive fraction)."""
@@ -27,3 +29,136 @@ def cagr(equity: pd.Series) -> float:
         return float("nan")
     total = float(equity.iloc[-1] / equity.iloc[0])
     return total ** (365.0 / days) - 1.0
+
+
+def _day_numbers(index: pd.DatetimeIndex) -> np.ndarray:
+    """Local calendar day of each timestamp (days since 1970-01-01)."""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.as_unit("ns").asi8 // 86_400_000_000_000
+
+
+def calendar_year_windows(index: pd.DatetimeIndex) -> list[tuple[str, pd.Timestamp, pd.Timestamp]]:
+    """One ``(label, start, end)`` window per calendar year present in ``index``."""
+    years = sorted({int(y) for y in pd.DatetimeIndex(index).year})
+    return [(str(y), pd.Timestamp(f"{y}-01-01"), pd.Timestamp(f"{y}-12-31")) for y in years]
+
+
+def rolling_windows(
+    index: pd.DatetimeIndex, years: int = 3, step_months: int = 1
+) -> list[tuple[str, pd.Timestamp, pd.Timestamp]]:
+    """Rolling ``years``-long windows starting every ``step_months`` months.
+
+    Only windows that end on or before the last timestamp are returned.
+    """
+    idx = pd.DatetimeIndex(index)
+    if len(idx) == 0:
+        return []
+    first = pd.Timestamp(idx[0].date()).replace(day=1)
+    last = pd.Timestamp(idx[-1].date())
+    n_max = (last.year - first.year) * 12 + (last.month - first.month) + 1
+    starts = pd.date_range(first, periods=max(0, n_max), freq=pd.DateOffset(months=int(step_months)))
+    ends = starts + pd.DateOffset(years=int(years)) - pd.Timedelta(days=1)
+    keep = ends <= last
+    return [(f"{s:%Y-%m}+{int(years)}y", s, e) for s, e in zip(starts[keep], ends[keep])]
+
+
+def window_metrics(
+    equity: pd.Series,
+    windows,
+    dd_penalty: float = 0.5,
+    trades: pd.DataFrame | None = None,
+    max_bytes: int = 64 * 1024**2,
+) -> pd.DataFrame:
+    """CAGR / MDD / score of one equity curve over many ``(label, start, end)`` windows.
+
+    Each window is measured as if the curve were trimmed to it, i.e. the same
+    numbers as ``cagr(eq.loc[start:end])`` and ``max_drawdown(eq.loc[start:end])``.
+    CAGR only needs the two endpoint values (the window's summed log return).
+    Drawdowns for all windows are computed together: windows become rows of a
+    padded 2D array (chunked to ``max_bytes``) with a running max along each row.
+    If ``trades`` (a Step-1 trade log) is given, trades per window are counted.
+    """
+    x = equity.astype(float).to_numpy()
+    index = pd.DatetimeIndex(equity.index)
+    windows = list(windows)
+    labels = [w[0] for w in windows]
+    starts = [w[1] for w in windows]
+    ends = [w[2] for w in windows]
+    if not index.is_monotonic_increasing:
+        raise ValueError("window_metrics requires a sorted (increasing) index.")
+    lo, hi = [], []
+    for s, e in zip(starts, ends):
+        if isinstance(s, str) or isinstance(e, str):
+            # strings keep .loc partial-date semantics
+            w = resolve_window(index, s, e)
+            lo.append(w.start); hi.append(w.stop)
+        else:
+            lo.append(-1); hi.append(-1)
+    lo_a = np.asarray(lo, dtype=np.int64)
+    hi_a = np.asarray(hi, dtype=np.int64)
+    ts_rows = np.flatnonzero(lo_a < 0)
+    if len(ts_rows):
+        # Timestamp bounds: one vectorized binary search (same as .loc[start:end])
+        s_b = [_align_bound(starts[i], index) for i in ts_rows]
+        e_b = [_align_bound(ends[i], index) for i in ts_rows]
+        s_pos = index.searchsorted(pd.DatetimeIndex([index[0] if b is None else b for b in s_b]), side="left")
+        e_pos = index.searchsorted(pd.DatetimeIndex([index[-1] if b is None else b for b in e_b]), side="right")
+        lo_a[ts_rows] = np.where([b is None for b in s_b], 0, s_pos)
+        hi_a[ts_rows] = np.where([b is None for b in e_b], len(index), e_pos)
+        hi_a = np.maximum(hi_a, lo_a)
+    n_bars = hi_a - lo_a
+    m = len(lo_a)
+
+    # CAGR from the window endpoints and calendar days
+    g = np.full(m, np.nan)
+    days_all = _day_numbers(index)
+    ok = n_bars >= 2
+    if ok.any():
+        a, b = lo_a[ok], hi_a[ok] - 1
+        days = days_all[b] - days_all[a]
+        total = x[b] / x[a]
+        # Python float pow, as in cagr() (numpy's pow may differ in the last ulp)
+        g[ok] = [float(tt) ** (365.0 / int(d)) - 1.0 if d > 0 else float("nan") for tt, d in zip(total.tolist(), days.tolist())]
+
+    # MDD: running max inside each window
+    mdd = np.full(m, np.nan)
+    has = n_bars >= 1
+    rows = np.flatnonzero(has)
+    if len(rows):
+        width = int(n_bars[rows].max())
+        per_chunk = max(1, int(max_bytes) // max(1, 3 * 8 * width))
+        tiny = np.finfo(float).tiny
+        for c0 in range(0, len(rows), per_chunk):
+            r = rows[c0 : c0 + per_chunk]
+            pos = lo_a[r, None] + np.arange(width)[None, :]
+            inside = pos < hi_a[r, None]
+            vals = x[np.minimum(pos, len(x) - 1)]
+            peak = np.maximum.accumulate(vals, axis=1)
+            dd = 1.0 - (vals / np.maximum(peak, tiny))
+            dd[~inside] = np.nan
+            with np.errstate(invalid="ignore"):
+                mdd[r] = np.nanmax(dd, axis=1)
+
+    valid = np.isfinite(g) & np.isfinite(mdd)
+    score = np.where(valid, g - float(dd_penalty) * mdd, -np.inf)
+
+    out = pd.DataFrame(
+        {
+            "window": labels,
+            "start": starts,
+            "end": ends,
+            "n_bars": n_bars,
+            "cagr": g,
+            "max_dd": mdd,
+            "score": score,
+        }
+    )
+    if trades is not None:
+        if trades.empty:
+            out["n_trades"] = 0
+        else:
+            t_idx = pd.DatetimeIndex(pd.to_datetime(trades["timestamp"]))
+            out["n_trades"] = [len(resolve_window(t_idx, s, e)) for _, s, e in windows]
+    return out
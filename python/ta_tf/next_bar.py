@@ -0,0 +1,163 @@
+"""Next-bar action plan, computed as soon as a bar closes.
+
+``step(t)`` decides at Open(t) from the context of bar t-1 only, so once the
+last bar of the data manager has closed everything about the next bar is known
+except its prices: the signal target, the stop levels (as functions of the
+next open), whether a short is forced to cover and whether a pyramid unit is
+added. ``plan_next_bar`` computes that overnight, so a live loop can pre-stage
+orders and act at the open without indicator work.
+
+Within the bar the trader's order is kept: forced cover, then the intrabar
+stop, then the signal target (entries get no stop on their entry bar), then
+pyramiding.
+
+The trader's trailing reference is updated with the bar's own close before the
+stop test (MATLAB port), so the exact backtest stop level is only final at the
+close: ``stop_price(open)`` is the level a resting order can carry at the open,
+``stop_price(open, close)`` the one the backtest uses (never looser). In KRW
+accounting the fill itself is at the tick-rounded level.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from .data_manager import OhlcvDataManager
+from .trader import TickerTraderStep1
+
+
+@dataclass(frozen=True)
+class NextBarPlan:
+    """What ``step`` will do on the bar after ``after``, given its prices."""
+
+    symbol: str
+    bar: int  # index the next bar will have in the data manager
+    after: datetime  # timestamp of the last closed bar
+    valid: bool  # decision context valid (otherwise the position is held)
+    pos: int  # position carried into the bar
+    units: int
+    target: int  # signal target at the open (unless forced cover or stop)
+    entry_price: float  # episode entry price carried in (NaN if flat)
+    hist_ref: float  # trailing extreme before the bar (hist_max long, hist_min short)
+    daily_stop: float
+    trail_stop: float
+    force_cover_from: Optional[date]  # first date a carried short is force-covered
+    max_units: int
+    pyramid_step_return: float
+
+    def forced_cover(self, ts) -> bool:
+        """The carried short is covered at the open of a bar dated ``ts``."""
+        return self.force_cover_from is not None and ts.date() >= self.force_cover_from
+
+    def stop_price(self, open_: float, close: Optional[float] = None) -> float:
+        """Stop level of the carried position for a bar opening at ``open_``
+        (NaN when nothing is carried). Pass ``close`` for the backtest level."""
+        if self.pos == 0 or self.units == 0:
+            return float("nan")
+        ref = open_ if close is None else close
+        if self.pos == 1:
+            hist = max(self.hist_ref, max(open_, ref))
+            return max(open_ * (1.0 - self.daily_stop), hist * (1.0 - self.trail_stop))
+        hist = min(self.hist_ref, min(open_, ref))
+        return min(open_ * (1.0 + self.daily_stop), hist * (1.0 + self.trail_stop))
+
+    def stop_hit(self, open_: float, high: float, low: float, close: float) -> bool:
+        """Intrabar stop test of ``step`` on the bar's OHLC."""
+        px = self.stop_price(open_, close)
+        if self.pos == 1:
+            return low <= px
+        if self.pos == -1:
+            return high >= px
+        return False
+
+    def adds_unit(self, open_: float) -> bool:
+        """A pyramid unit is added at the open (when no stop/forced cover fired)."""
+        if not self.valid or self.target == 0:
+            return False
+        if self.target != self.pos:
+            # fresh entry at the open: one unit, episode return 0
+            return self.max_units > 1 and 0.0 >= self.pyramid_step_return
+        if self.units >= self.max_units or self.entry_price != self.entry_price:
+            return False
+        return float(self.pos) * (open_ / self.entry_price - 1.0) >= self.pyramid_step_return
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["after"] = self.after.isoformat()
+        d["force_cover_from"] = self.force_cover_from.isoformat() if self.force_cover_from else None
+        return d
+
+
+class _OpenEnded:
+    """Data manager view with one more (unknown) bar, so ``step`` accepts the last one."""
+
+    def __init__(self, dm: OhlcvDataManager):
+        self._dm = dm
+
+    def __len__(self) -> int:
+        return len(self._dm) + 1
+
+    def get_open(self, i: int) -> float:
+        return self._dm.get_open(i) if i < len(self._dm) else float("nan")
+
+    def __getattr__(self, name):
+        return getattr(self._dm, name)
+
+
+def _shadow(trader: TickerTraderStep1) -> TickerTraderStep1:
+    """``trader`` stepped through the last closed bar, on copies of its state."""
+    sh = copy.copy(trader)
+    sh.dm = _OpenEnded(trader.dm)
+    sh.state = replace(trader.state)
+    sh.trade_log = []
+    sh.equity_curve = []
+    sh.tape = None
+    for t in range(trader.next_bar, len(trader.dm)):
+        sh.step(t)
+    return sh
+
+
+def plan_next_bar(trader: TickerTraderStep1, timestamp: Optional[datetime] = None) -> NextBarPlan:
+    """Plan for the bar after the last one in ``trader.dm``.
+
+    The trader is not modified: bars it has not stepped yet (normally only the
+    last closed one, see ``run_pending``) are stepped on a copy. ``timestamp``
+    (the next bar's, if known) only fills ``PrevContext.timestamp``.
+    """
+    dm = trader.dm
+    sh = _shadow(trader)
+    st = sh.state
+    u = len(dm)
+    ctx = dm.get_next_context(timestamp)
+    valid = bool(ctx.valid) and u >= 2
+    target = int(sh._decide(sh, u, ctx)) if valid else int(st.pos)
+
+    cfg, cost = trader.strat_cfg, trader.cost_model.cfg
+    force_from = None
+    if cost.enforce_short_max_hold and st.pos == -1 and st.entry_time is not None:
+        force_from = st.entry_time.date() + timedelta(days=int(cost.short_max_hold_days))
+    long_ = st.pos == 1
+    return NextBarPlan(
+        symbol=trader.symbol,
+        bar=u,
+        after=dm.get_bar_timestamp(u - 1),
+        valid=valid,
+        pos=int(st.pos),
+        units=int(st.units),
+        target=target,
+        entry_price=float(st.entry_price),
+        hist_ref=float(st.hist_max if long_ else st.hist_min),
+        daily_stop=float(cfg.long_daily_stop if long_ else cfg.short_daily_stop),
+        trail_stop=float(cfg.long_trail_stop if long_ else cfg.short_trail_stop),
+        force_cover_from=force_from,
+        max_units=max(1, int(cfg.max_units)),
+        pyramid_step_return=float(cfg.pyramid_step_return),
+    )
+
+
+def plan_universe(traders: Iterable[TickerTraderStep1]) -> dict[str, NextBarPlan]:
+    """``plan_next_bar`` for every trader, keyed by symbol."""
+    return {tr.symbol: plan_next_bar(tr) for tr in traders}
@@ -7,17 +7,19 @@ For later phases, it is recommended to replace this with a mature library.
 from __future__ import annotations
 
 import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
 from .backtest import _run_core
-from .config import CostConfig, IndicatorConfig, StrategyConfig
+from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
 from .data_manager import OhlcvDataManager
-from .data_provider import OhlcvFrame
+from .data_provider import OhlcvFrame, resolve_window
 from .metrics import cagr, max_drawdown
+from .trader import TickerTraderStep1
 
 
 @dataclass(frozen=True)
@@ -37,6 +39,93 @@ def _score_equity(eq: pd.Series, dd_penalty: float) -> tuple[float, float, float
     return score, float(g), float(mdd)
 
 
+def evaluate_config(
+    dm: OhlcvDataManager,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    dd_penalty: float = 0.5,
+    flat_start: bool = False,
+) -> tuple[float, float, float]:
+    """Score one config on an already-built data manager: (score, cagr, max_dd).
+
+    ``flat_start`` starts flat at ``start_dt`` instead of trading through the
+    warmup (cheap low-fidelity score, see ta_tf.halving).
+    """
+    trimmed = start_dt is not None and end_dt is not None
+    trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=cost_cfg, bt_cfg=scoring_backtest_config(dm))
+    trader.run_full_backtest(window=dm.window(start_dt, end_dt) if trimmed else None, jump=True, flat_start=flat_start)
+    return score_trader(trader, start_dt, end_dt, dd_penalty=dd_penalty)
+
+
+def scoring_backtest_config(dm: OhlcvDataManager) -> BacktestConfig:
+    """BacktestConfig used for all optimizer scoring runs."""
+    return BacktestConfig(symbol=dm.symbol, initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0)
+
+
+def score_trader(
+    trader: TickerTraderStep1,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    dd_penalty: float = 0.5,
+) -> tuple[float, float, float]:
+    """(score, cagr, max_dd) of a finished run, on the ``[start_dt, end_dt]`` window."""
+    eq = pd.DataFrame(trader.equity_curve, columns=["Date", "Equity"]).set_index("Date")["Equity"]
+    if start_dt is not None and end_dt is not None:
+        eq = eq.iloc[resolve_window(eq.index, start_dt, end_dt).as_slice()]
+    return _score_equity(eq, dd_penalty=dd_penalty)
+
+
+# Worker-side state for evaluate_batch: the data manager is shipped once per
+# process (pool initializer) instead of once per config.
+_BATCH_CTX: dict = {}
+
+
+def _batch_init(dm, cost_cfg, start_dt, end_dt, dd_penalty, flat_start=False) -> None:
+    _BATCH_CTX.update(dm=dm, cost_cfg=cost_cfg, start_dt=start_dt, end_dt=end_dt, dd_penalty=dd_penalty, flat_start=flat_start)
+
+
+def _batch_eval(cfgs: Sequence[StrategyConfig]) -> list[tuple[float, float, float]]:
+    c = _BATCH_CTX
+    return [
+        evaluate_config(c["dm"], x, c["cost_cfg"], c["start_dt"], c["end_dt"], c["dd_penalty"], flat_start=c["flat_start"])
+        for x in cfgs
+    ]
+
+
+def evaluate_batch(
+    dm: OhlcvDataManager,
+    configs: Sequence[StrategyConfig],
+    cost_cfg: CostConfig = CostConfig(),
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    dd_penalty: float = 0.5,
+    workers: int = 1,
+    chunk_size: int = 16,
+    flat_start: bool = False,
+) -> list[tuple[float, float, float]]:
+    """Score many configs against one shared data manager (indicators built once).
+
+    Returns ``(score, cagr, max_dd)`` per config, in input order.
+    """
+    configs = list(configs)
+    if int(workers) <= 1 or len(configs) <= 1:
+        _batch_init(dm, cost_cfg, start_dt, end_dt, dd_penalty, flat_start)
+        return _batch_eval(configs)
+
+    chunks = [configs[i : i + int(chunk_size)] for i in range(0, len(configs), max(1, int(chunk_size)))]
+    out: list[tuple[float, float, float]] = []
+    with ProcessPoolExecutor(
+        max_workers=int(workers),
+        initializer=_batch_init,
+        initargs=(dm, cost_cfg, start_dt, end_dt, dd_penalty, flat_start),
+    ) as ex:
+        for part in ex.map(_batch_eval, chunks):
+            out.extend(part)
+    return out
+
+
 def random_search_step1(
     frame: OhlcvFrame,
     train_start: str,
@@ -64,10 +153,8 @@ def random_search_step1(
 
     results: list[OptResult] = []
 
-    # Slice frame to training window (by index)
-    df = frame.df
-    df_train = df.loc[train_start:train_end].copy()
-    frame_train = OhlcvFrame(df=df_train, symbol=frame.symbol)
+    # Slice frame to training window (positional view, no copy)
+    frame_train = frame.slice(frame.window(train_start, train_end))
 
     for k in range(int(n_evals)):
         cfg = StrategyConfig(
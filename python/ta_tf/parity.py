@@ -0,0 +1,200 @@
+"""Batch parity checks of the Python port against MATLAB optimizer results.
+
+The MATLAB optimizer writes one ``opt_results_*.xlsx`` per run: a ``Results``
+sheet with one row per evaluated config (``Eval``, ``EquityEnd``, ``TotRet``,
+``CAGR``, ``MaxDD``, trade counts, ``ParamsJson``). ``read_opt_results`` reads
+a workbook once and converts every ``ParamsJson`` row to a ``StrategyConfig``;
+``run_parity`` replays all rows on one shared data manager (shipped once per
+worker process) and reports the Python metrics next to the MATLAB ones, plus
+curve errors (RMSE/MAE/MaxAbs/Corr of the normalized equity) for rows that
+have an exported MATLAB equity curve.
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import BacktestConfig, CostConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .data_provider import resolve_window
+from .metrics import cagr, max_drawdown
+from .trader import TickerTraderStep1
+
+# (python column, MATLAB column candidates)
+METRIC_COLUMNS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("TotRet", ("TotRet",)),
+    ("CAGR", ("CAGR",)),
+    ("MaxDD", ("MaxDD",)),
+    ("Trades", ("Trades", "TradesTr")),
+)
+
+CURVE_COLUMNS = ["Aligned", "RMSE", "MAE", "MaxAbs", "Corr"]
+
+
+def matlab_trade_count(trade_log) -> int:
+    """Trades as MATLAB's ``TradesTr``: ENTER + EXIT rows of the trader log.
+
+    Entries (``SignalEntry``) and exits (``SignalExit``, ``STOP:*``,
+    ``FORCED_COVER*``); a flip counts twice. ``PyramidAdd`` resizes an open
+    position (the MATLAB trader has no pyramiding) and is not counted.
+    """
+    return sum(
+        1
+        for e in trade_log
+        if e.reason in ("SignalEntry", "SignalExit") or e.reason.startswith(("STOP:", "FORCED_COVER"))
+    )
+
+
+def read_opt_results(xlsx_path: str | Path, sheet: str | int = 0) -> pd.DataFrame:
+    """All rows of a MATLAB optimizer workbook, with a parsed ``config`` column.
+
+    Adds ``Rank`` (1-based row order, as ``compare_to_reference --rank``).
+    """
+    df = pd.read_excel(xlsx_path, sheet_name=sheet)
+    if "ParamsJson" not in df.columns:
+        raise ValueError(f"{xlsx_path}: XLSX must contain a ParamsJson column.")
+    df = df.reset_index(drop=True)
+    df.insert(0, "Rank", np.arange(1, len(df) + 1))
+    df["config"] = [StrategyConfig.from_params_dict(json.loads(s)) for s in df["ParamsJson"].astype(str)]
+    return df
+
+
+def curve_errors(sim: pd.Series, ref: pd.Series) -> dict[str, float]:
+    """Errors between two equity curves, each normalized to its first aligned point."""
+    idx = ref.index.intersection(sim.index)
+    out = {"Aligned": float(len(idx)), "RMSE": np.nan, "MAE": np.nan, "MaxAbs": np.nan, "Corr": np.nan}
+    if len(idx) == 0:
+        return out
+    refa = ref.loc[idx].astype(float)
+    sima = sim.loc[idx].astype(float)
+    refn = refa / refa.iloc[0]
+    simn = sima / sima.iloc[0]
+    diff = (simn - refn).to_numpy()
+    out["RMSE"] = float(np.sqrt(np.mean(diff**2)))
+    out["MAE"] = float(np.mean(np.abs(diff)))
+    out["MaxAbs"] = float(np.max(np.abs(diff)))
+    if len(idx) > 2:
+        out["Corr"] = float(np.corrcoef(refn.to_numpy(), simn.to_numpy())[0, 1])
+    return out
+
+
+def error_summary(a: pd.Series, b: pd.Series) -> dict[str, float]:
+    """RMSE/MAE/MaxAbs/Corr of ``a - b`` over rows where both are finite."""
+    x = pd.to_numeric(a, errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(b, errors="coerce").to_numpy(dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    out = {"N": float(ok.sum()), "RMSE": np.nan, "MAE": np.nan, "MaxAbs": np.nan, "Corr": np.nan}
+    if not ok.any():
+        return out
+    d = x[ok] - y[ok]
+    out["RMSE"] = float(np.sqrt(np.mean(d**2)))
+    out["MAE"] = float(np.mean(np.abs(d)))
+    out["MaxAbs"] = float(np.max(np.abs(d)))
+    if ok.sum() > 2 and np.std(x[ok]) > 0 and np.std(y[ok]) > 0:
+        out["Corr"] = float(np.corrcoef(x[ok], y[ok])[0, 1])
+    return out
+
+
+# Worker-side state, as in optimize.evaluate_batch.
+_PARITY_CTX: dict = {}
+
+
+def _parity_init(dm, cost_cfg, bt_cfg, start_dt, end_dt) -> None:
+    _PARITY_CTX.update(dm=dm, cost_cfg=cost_cfg, bt_cfg=bt_cfg, start_dt=start_dt, end_dt=end_dt)
+
+
+def _parity_eval(cfgs: Sequence[StrategyConfig]) -> list[tuple[pd.Series, int]]:
+    c = _PARITY_CTX
+    return [run_equity(c["dm"], x, c["cost_cfg"], c["bt_cfg"], c["start_dt"], c["end_dt"]) for x in cfgs]
+
+
+def run_equity(
+    dm: OhlcvDataManager,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    bt_cfg: BacktestConfig,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+) -> tuple[pd.Series, int]:
+    """Equity curve of one config on ``[start_dt, end_dt]`` and its trade count
+    (:func:`matlab_trade_count`)."""
+    trimmed = start_dt is not None and end_dt is not None
+    trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=cost_cfg, bt_cfg=bt_cfg)
+    trader.run_full_backtest(window=dm.window(start_dt, end_dt) if trimmed else None, jump=True)
+    eq = pd.DataFrame(trader.equity_curve, columns=["Date", "Equity"]).set_index("Date")["Equity"]
+    if trimmed:
+        eq = eq.iloc[resolve_window(eq.index, start_dt, end_dt).as_slice()]
+    return eq, matlab_trade_count(trader.trade_log)
+
+
+def run_parity(
+    dm: OhlcvDataManager,
+    results: pd.DataFrame,
+    cost_cfg: CostConfig,
+    bt_cfg: BacktestConfig,
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    ref_curves: Optional[Mapping[int, pd.Series]] = None,
+    workers: int = 1,
+    chunk_size: int = 16,
+) -> pd.DataFrame:
+    """One row per workbook row: MATLAB metrics, Python metrics (``py_*``),
+    differences (``d_*``) and, for ranks in ``ref_curves``, curve errors."""
+    configs = list(results["config"])
+    if int(workers) <= 1 or len(configs) <= 1:
+        _parity_init(dm, cost_cfg, bt_cfg, start_dt, end_dt)
+        curves = _parity_eval(configs)
+    else:
+        step = max(1, int(chunk_size))
+        chunks = [configs[i : i + step] for i in range(0, len(configs), step)]
+        curves = []
+        with ProcessPoolExecutor(
+            max_workers=int(workers),
+            initializer=_parity_init,
+            initargs=(dm, cost_cfg, bt_cfg, start_dt, end_dt),
+        ) as ex:
+            for part in ex.map(_parity_eval, chunks):
+                curves.extend(part)
+
+    keep = [c for c in ("Rank", "Eval", "Score", "EquityEnd") if c in results.columns]
+    out = results[keep].copy()
+    ref_curves = ref_curves or {}
+    rows = []
+    for rank, (eq, trades) in zip(results["Rank"], curves):
+        ok = len(eq) >= 2
+        row = {
+            "py_EquityEnd": float(eq.iloc[-1]) * bt_cfg.initial_capital / bt_cfg.initial_equity if len(eq) else np.nan,
+            "py_TotRet": float(eq.iloc[-1] / eq.iloc[0] - 1.0) if ok else np.nan,
+            "py_CAGR": cagr(eq) if ok else np.nan,
+            "py_MaxDD": max_drawdown(eq) if len(eq) else np.nan,
+            "py_Trades": float(trades),
+        }
+        ref = ref_curves.get(int(rank))
+        curve = curve_errors(eq, ref) if ref is not None else dict.fromkeys(CURVE_COLUMNS, np.nan)
+        rows.append({**row, **curve})
+    py = pd.DataFrame(rows, index=out.index)
+
+    for name, candidates in METRIC_COLUMNS:
+        src = next((c for c in candidates if c in results.columns), None)
+        out[name] = results[src].astype(float) if src else np.nan
+        out[f"py_{name}"] = py[f"py_{name}"]
+        out[f"d_{name}"] = out[f"py_{name}"] - out[name]
+    out["py_EquityEnd"] = py["py_EquityEnd"]
+    for c in CURVE_COLUMNS:
+        out[c] = py[c]
+    out["params"] = results["ParamsJson"]
+    return out
+
+
+def parity_summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Per metric: RMSE/MAE/MaxAbs/Corr of Python vs MATLAB across all rows."""
+    rows = []
+    for name, _ in METRIC_COLUMNS:
+        rows.append({"metric": name, **error_summary(table[f"py_{name}"], table[name])})
+    return pd.DataFrame(rows, columns=["metric", "N", "RMSE", "MAE", "MaxAbs", "Corr"])
@@ -0,0 +1,188 @@
+"""Accounting-only replay of a recorded Step-1 signal tape.
+
+The trader's target path and stop exits depend only on prices, indicators and
+StrategyConfig; CostConfig only changes cash and, through sizing, share
+counts. Record the tape once (``record_tape``), then re-apply costs for many
+CostConfigs with ``replay_accounting`` - a Python loop over fills only, with
+borrow accrual and mark-to-market between fills done as array operations.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .accounting import (
+    equity_path,
+    equity_value,
+    fill_flatten,
+    fill_flatten_krw,
+    fill_rebalance,
+    fill_rebalance_krw,
+    krw_borrow_costs,
+)
+from .config import BacktestConfig, CostConfig, StrategyConfig
+from .cost_model import KRXCostModel
+from .data_manager import OhlcvDataManager
+from .data_provider import BarWindow, resolve_window
+from .metrics import cagr, max_drawdown
+from .trader import TickerTraderStep1
+from .types import SignalTape, TradeEvent
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    """Accounting outcome of a tape under one CostConfig."""
+
+    equity: pd.Series  # normalized equity indexed by bar timestamp
+    trade_log: list[TradeEvent]
+    cash: float
+    shares: int
+
+
+def record_tape(
+    dm: OhlcvDataManager,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    bt_cfg: BacktestConfig,
+    window: Optional[BarWindow] = None,
+) -> SignalTape:
+    """Run the trader once and return its cost-independent tape."""
+    trader = TickerTraderStep1(dm=dm, strat_cfg=strat_cfg, cost_cfg=cost_cfg, bt_cfg=bt_cfg, record_tape=True)
+    trader.run_full_backtest(window=window)
+    return trader.tape
+
+
+def replay_accounting(tape: SignalTape, cost_cfg: CostConfig) -> ReplayResult:
+    """Re-apply cash/share accounting of ``tape`` under ``cost_cfg``.
+
+    Bit-identical to re-running the trader with ``cost_cfg``. Raises
+    ValueError if ``cost_cfg`` changes the forced-cover rule, which is part of
+    the signal path rather than accounting.
+    """
+    if bool(cost_cfg.enforce_short_max_hold) != bool(tape.enforce_short_max_hold) or (
+        tape.enforce_short_max_hold and int(cost_cfg.short_max_hold_days) != int(tape.short_max_hold_days)
+    ):
+        raise ValueError("Short max-hold settings change the signal path; record a new tape instead.")
+
+    cost_model = KRXCostModel(cost_cfg)
+    rate = float(cost_model.short_borrow_daily_rate())
+    krw = bool(tape.integer_krw)
+    rate_exact = cost_model.short_borrow_daily_fraction()
+    rebalance = fill_rebalance_krw if krw else fill_rebalance
+    flatten = fill_flatten_krw if krw else fill_flatten
+    base = tape.initial_capital if tape.initial_capital > 0 else 1.0
+    init_eq = float(tape.initial_equity)
+
+    n = len(tape.timestamps)
+    val_px = np.asarray(tape.valuation_price, dtype=float)
+    borrow_c = np.asarray(tape.borrow_close, dtype=float)
+    equity = np.empty(n, dtype=float)
+
+    cash = int(tape.initial_capital) if krw else float(tape.initial_capital)
+    shares = 0
+    trade_log: list[TradeEvent] = []
+    events = tape.events
+
+    def _eq_norm(price: float) -> float:
+        return float(init_eq * (equity_value(cash, shares, price) / base))
+
+    e = 0
+    start = 0
+    while start < n:
+        # Apply fills scheduled on bar `start`.
+        while e < len(events) and events[e].bar == start:
+            ev = events[e]
+            e += 1
+            rates = cost_model.transaction_cost_rates(ev.side)
+            if ev.kind == "REBALANCE":
+                fill = rebalance(cash, shares, ev.side, ev.price, ev.frac, rates)
+                if fill is None:
+                    continue
+                cash, shares = fill.cash, fill.shares
+                pos_after = int(np.sign(shares)) if shares != 0 else int(ev.target_pos)
+                units_after = int(ev.units_after)
+            else:
+                fill = flatten(cash, shares, ev.side, ev.price, rates)
+                if fill is None:
+                    continue
+                cash, shares = fill.cash, 0
+                pos_after, units_after = 0, 0
+            trade_log.append(
+                TradeEvent(
+                    timestamp=tape.timestamps[start],
+                    symbol=tape.symbol,
+                    side=ev.side,
+                    reason=ev.reason,
+                    price=float(fill.price),
+                    position_after=pos_after,
+                    units_after=units_after,
+                    fee_paid=float(fill.fee),
+                    tax_paid=float(fill.tax),
+                    qty=int(fill.qty),
+                    notional=float(fill.notional),
+                    cash_after=float(cash),
+                    equity_after=_eq_norm(fill.price),
+                )
+            )
+
+        # Bars [start, stop) carry no fills after the first one: constant shares.
+        stop = events[e].bar if e < len(events) else n
+        stop = max(stop, start + 1)
+        seg = slice(start, stop)
+        if shares < 0 and krw:
+            cash_path = cash - np.cumsum(krw_borrow_costs(abs(shares), borrow_c[seg], rate_exact))
+            cash = int(cash_path[-1])
+        elif shares < 0:
+            c = borrow_c[seg]
+            cost = float(abs(shares)) * c * rate
+            cost = np.where(np.isfinite(c), cost, 0.0)
+            # sequential subtraction keeps the trader's rounding order
+            cash_path = np.subtract.accumulate(np.concatenate([[cash], cost]))[1:]
+            cash = float(cash_path[-1])
+        else:
+            cash_path = np.full(stop - start, cash)
+        equity[seg] = equity_path(cash_path, shares, val_px[seg], init_eq, base)
+        start = stop
+
+    return ReplayResult(
+        equity=pd.Series(equity, index=pd.DatetimeIndex(tape.timestamps, name="Date"), name="Equity"),
+        trade_log=trade_log,
+        cash=cash if krw else float(cash),
+        shares=int(shares),
+    )
+
+
+def sweep_costs(
+    tape: SignalTape,
+    cost_cfgs: Sequence[CostConfig],
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    dd_penalty: float = 0.5,
+) -> pd.DataFrame:
+    """Score the tape under each CostConfig (one row per config)."""
+    rows = []
+    for cfg in cost_cfgs:
+        res = replay_accounting(tape, cfg)
+        eq = res.equity
+        if start_dt is not None and end_dt is not None:
+            eq = eq.iloc[resolve_window(eq.index, start_dt, end_dt).as_slice()]
+        g = cagr(eq)
+        mdd = max_drawdown(eq)
+        rows.append(
+            {
+                "stt_rate": cfg.stt_rate,
+                "commission_rate": cfg.commission_rate,
+                "short_borrow_annual_rate": cfg.short_borrow_annual_rate,
+                "short_borrow_day_count": cfg.short_borrow_day_count,
+                "score": float(g - dd_penalty * mdd),
+                "cagr": float(g),
+                "max_dd": float(mdd),
+                "final_equity": float(eq.iloc[-1]) if len(eq) else float("nan"),
+                "n_trades": len(res.trade_log),
+            }
+        )
+    return pd.DataFrame(rows)
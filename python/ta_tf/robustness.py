@@ -0,0 +1,189 @@
+"""Bootstrap / Monte Carlo robustness on return and trade streams.
+
+Resampled paths are built as 2D NumPy arrays (paths x steps) with a seeded
+generator and processed in chunks so memory stays bounded regardless of the
+number of paths:
+- stationary block bootstrap (Politis-Romano) of per-bar returns
+- trade-order shuffles (or iid resampling) of per-trade returns
+
+Every path is summarized by CAGR, MDD and the optimizer score
+``cagr - dd_penalty * mdd``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    """Per-path metrics of a resampling run."""
+
+    method: str
+    cagr: np.ndarray
+    max_dd: np.ndarray
+    score: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return int(len(self.score))
+
+    def ci(self, level: float = 0.90) -> pd.DataFrame:
+        """Two-sided percentile intervals: one row per metric (lo, median, hi)."""
+        a = (1.0 - float(level)) / 2.0
+        rows = {}
+        for name in ("cagr", "max_dd", "score"):
+            x = getattr(self, name)
+            lo, med, hi = np.nanquantile(x, [a, 0.5, 1.0 - a])
+            rows[name] = {"lo": float(lo), "median": float(med), "hi": float(hi)}
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def daily_returns(equity: pd.Series) -> np.ndarray:
+    """Simple per-bar returns of an equity curve."""
+    x = equity.astype(float).to_numpy()
+    if len(x) < 2:
+        return np.empty(0, dtype=float)
+    return x[1:] / x[:-1] - 1.0
+
+
+def trade_returns(trades: pd.DataFrame, initial_equity: float = 1.0) -> np.ndarray:
+    """Per-trade returns from a Step-1 trade log.
+
+    Uses ``equity_after`` of consecutive flattening events (``position_after == 0``),
+    so each return covers one round trip including costs and borrow accrual.
+    """
+    if trades is None or trades.empty:
+        return np.empty(0, dtype=float)
+    eq = trades.loc[trades["position_after"] == 0, "equity_after"].astype(float).to_numpy()
+    if len(eq) == 0:
+        return np.empty(0, dtype=float)
+    prev = np.concatenate([[float(initial_equity)], eq[:-1]])
+    return eq / prev - 1.0
+
+
+def _summarize(cum_log: np.ndarray, years: float, dd_penalty: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CAGR/MDD/score per row of cumulative log-equity paths (starting at 1)."""
+    # Drawdowns are measured against a running peak that includes the start (log 0).
+    buf = np.maximum(cum_log, 0.0)
+    np.maximum.accumulate(buf, axis=1, out=buf)
+    np.subtract(cum_log, buf, out=buf)
+    mdd = 1.0 - np.exp(np.min(buf, axis=1))
+    mdd = np.maximum(mdd, 0.0)
+    if years > 0:
+        g = np.exp(cum_log[:, -1] / years) - 1.0
+    else:
+        g = np.full(len(cum_log), np.nan)
+    return g, mdd, g - float(dd_penalty) * mdd
+
+
+def _chunk_rows(n_steps: int, max_bytes: int) -> int:
+    # ~4 float64/int64 temporaries of shape (rows, steps) are alive at once.
+    return max(1, int(max_bytes) // max(1, 4 * 8 * int(n_steps)))
+
+
+def stationary_block_bootstrap(
+    returns: np.ndarray,
+    n_paths: int = 10_000,
+    mean_block: float = 20.0,
+    years: Optional[float] = None,
+    periods_per_year: float = 252.0,
+    dd_penalty: float = 0.5,
+    seed: int = 7,
+    max_bytes: int = 64 * 1024**2,
+) -> BootstrapResult:
+    """Stationary block bootstrap of per-bar returns.
+
+    Blocks start at uniform random bars and have geometric lengths with mean
+    ``mean_block`` (wrapping around the end of the sample). ``years`` is the calendar span
+    used for CAGR; defaults to ``len(returns) / periods_per_year``.
+    """
+    r = np.asarray(returns, dtype=float)
+    r = r[np.isfinite(r)]
+    n = len(r)
+    if n == 0:
+        raise ValueError("returns must contain at least one finite value")
+    lr = np.log1p(r)
+    # A block starts inside a row of n steps, so start + offset < 2n: index a
+    # doubled series instead of wrapping with a modulo.
+    lr2 = np.concatenate([lr, lr])
+    yrs = float(years) if years is not None else n / float(periods_per_year)
+    p_new = 1.0 / max(1.0, float(mean_block))
+
+    rng = np.random.default_rng(int(seed))
+    out_g, out_mdd, out_s = [], [], []
+    rows = _chunk_rows(n, max_bytes)
+    done = 0
+    while done < int(n_paths):
+        m = min(rows, int(n_paths) - done)
+        new_block = rng.random((m, n), dtype=np.float32) < p_new
+        new_block[:, 0] = True
+        # Flattened row-major, each row starts a block, so blocks never span
+        # paths. Position -> source bar is (random block start) + (offset in block).
+        flat = new_block.ravel()
+        block_pos = np.flatnonzero(flat)
+        shift = rng.integers(0, n, size=len(block_pos), dtype=np.int64) - block_pos
+        block_id = np.cumsum(flat, dtype=np.int32)
+        block_id -= 1
+        idx = shift[block_id]
+        idx += np.arange(m * n, dtype=np.int64)
+        cum = np.cumsum(lr2[idx].reshape(m, n), axis=1)
+        g, mdd, s = _summarize(cum, yrs, dd_penalty)
+        out_g.append(g); out_mdd.append(mdd); out_s.append(s)
+        done += m
+
+    return BootstrapResult(
+        method=f"stationary_block(mean={float(mean_block):g})",
+        cagr=np.concatenate(out_g),
+        max_dd=np.concatenate(out_mdd),
+        score=np.concatenate(out_s),
+    )
+
+
+def trade_shuffle_bootstrap(
+    trade_rets: np.ndarray,
+    years: float,
+    n_paths: int = 10_000,
+    with_replacement: bool = False,
+    dd_penalty: float = 0.5,
+    seed: int = 7,
+    max_bytes: int = 64 * 1024**2,
+) -> BootstrapResult:
+    """Reorder (or resample) per-trade returns into new equity paths.
+
+    A pure shuffle keeps the total return, so CAGR is constant and only the
+    drawdown distribution moves; ``with_replacement=True`` resamples trades iid.
+    Drawdowns are measured at trade granularity.
+    """
+    r = np.asarray(trade_rets, dtype=float)
+    r = r[np.isfinite(r)]
+    n = len(r)
+    if n == 0:
+        raise ValueError("trade_rets must contain at least one finite value")
+    lr = np.log1p(r)
+
+    rng = np.random.default_rng(int(seed))
+    out_g, out_mdd, out_s = [], [], []
+    rows = _chunk_rows(n, max_bytes)
+    done = 0
+    while done < int(n_paths):
+        m = min(rows, int(n_paths) - done)
+        if with_replacement:
+            idx = rng.integers(0, n, size=(m, n), dtype=np.int64)
+        else:
+            idx = rng.permuted(np.broadcast_to(np.arange(n, dtype=np.int64), (m, n)), axis=1)
+        cum = np.cumsum(lr[idx], axis=1)
+        g, mdd, s = _summarize(cum, float(years), dd_penalty)
+        out_g.append(g); out_mdd.append(mdd); out_s.append(s)
+        done += m
+
+    return BootstrapResult(
+        method="trade_resample" if with_replacement else "trade_shuffle",
+        cagr=np.concatenate(out_g),
+        max_dd=np.concatenate(out_mdd),
+        score=np.concatenate(out_s),
+    )
@@ -0,0 +1,198 @@
+"""Parameter-neighborhood sensitivity analysis for Step-1 configs.
+
+Given a (typically optimized) ``StrategyConfig``, build a perturbation lattice
+around it (+-k grid steps per numeric knob, flips for booleans, optionally a
+few joint perturbations), evaluate the whole neighborhood as one batch on a
+shared data manager, and summarize how fast the score falls off.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, fields, replace
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import CostConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .checkpoint import CheckpointedReference
+from .optimize import evaluate_batch, scoring_backtest_config
+
+
+# Grid steps per knob. Mirrors the Step-1 optimizer grids
+# (scripts/optimize_2020_2024_single.py) with duplicates removed.
+DEFAULT_GRID: dict[str, list] = {
+    "spread_enter_pct": [0.0015, 0.0020, 0.0030, 0.0040, 0.0050],
+    "spread_exit_pct": [0.0003, 0.0007, 0.0010, 0.0015],
+    "atr_enter_k": [0.10, 0.15, 0.25, 0.35, 0.50, 0.70],
+    "atr_exit_k": [0.05, 0.10, 0.20],
+    "confirm_days": [1, 2, 3, 4],
+    "min_hold_bars": [1, 3, 5, 7],
+    "cooldown_bars": [0, 2, 5, 10],
+    "long_daily_stop": [0.02, 0.03, 0.05, 0.08],
+    "long_trail_stop": [0.06, 0.10, 0.15],
+    "short_daily_stop": [0.02, 0.03, 0.05, 0.08],
+    "short_trail_stop": [0.06, 0.10, 0.15],
+    "use_atr_filter": [False, True],
+    "use_long_trend_filter": [False, True],
+    "use_short_trend_filter": [False, True],
+    "enable_short": [False, True],
+    "use_prev_close_filter": [False, True],
+    "use_macd_regime_filter": [False, True],
+    "use_macd_exit": [False, True],
+}
+
+
+@dataclass(frozen=True)
+class SensitivityReport:
+    """Neighborhood evaluation around a center config."""
+
+    center: StrategyConfig
+    center_score: float
+    points: pd.DataFrame  # one row per lattice point (param, step, value, score, cagr, max_dd)
+    gradients: pd.DataFrame  # one row per parameter
+    robustness: float  # share of neighbors within `tol` of the center score
+
+
+def _axis_values(name: str, center, grid: Sequence, k: int) -> list[tuple[int, object]]:
+    """(step, value) pairs for one knob, excluding the center itself."""
+    if isinstance(center, bool):
+        return [(1, not center)]
+    vals = sorted(set(grid) | {center})
+    pos = vals.index(center)
+    out = []
+    for step in range(-int(k), int(k) + 1):
+        j = pos + step
+        if step == 0 or j < 0 or j >= len(vals):
+            continue
+        v = vals[j]
+        out.append((step, int(v) if isinstance(center, int) else float(v)))
+    return out
+
+
+def build_lattice(
+    center: StrategyConfig,
+    k: int = 1,
+    grid: Optional[dict[str, Sequence]] = None,
+    n_joint: int = 0,
+    seed: int = 7,
+) -> list[tuple[str, int, object, StrategyConfig]]:
+    """Return ``(param, step, value, config)`` for every neighbor of ``center``.
+
+    One-at-a-time moves along each knob of ``grid`` plus ``n_joint`` random
+    joint moves (param ``"*joint"``) where every knob shifts by a random step
+    in ``[-k, k]``.
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    names = [f.name for f in fields(StrategyConfig) if f.name in grid]
+    axes = {n: _axis_values(n, getattr(center, n), grid[n], k) for n in names}
+
+    out: list[tuple[str, int, object, StrategyConfig]] = []
+    for n in names:
+        for step, v in axes[n]:
+            out.append((n, step, v, replace(center, **{n: v})))
+
+    rng = random.Random(int(seed))
+    for _ in range(int(n_joint)):
+        kw = {}
+        for n in names:
+            if axes[n] and rng.random() < 0.5:
+                kw[n] = rng.choice(axes[n])[1]
+        if kw:
+            out.append(("*joint", 0, len(kw), replace(center, **kw)))
+    return out
+
+
+def neighborhood_sensitivity(
+    dm: OhlcvDataManager,
+    center: StrategyConfig,
+    cost_cfg: CostConfig = CostConfig(),
+    start_dt: Optional[pd.Timestamp] = None,
+    end_dt: Optional[pd.Timestamp] = None,
+    dd_penalty: float = 0.5,
+    k: int = 1,
+    grid: Optional[dict[str, Sequence]] = None,
+    n_joint: int = 0,
+    tol: float = 0.02,
+    seed: int = 7,
+    workers: int = 1,
+    checkpoint_every: int = 0,
+) -> SensitivityReport:
+    """Evaluate the lattice around ``center`` in one batch and summarize it.
+
+    Gradients are central differences in score per grid step (one-sided at the
+    grid edge; booleans report the flip delta). ``tol`` is in score units.
+    ``checkpoint_every > 0`` (single process) runs the center once with a
+    checkpoint every that many bars and resumes each neighbor from the last
+    checkpoint before it can diverge; scores are identical.
+    """
+    lattice = build_lattice(center, k=k, grid=grid, n_joint=n_joint, seed=seed)
+
+    # Many moves collapse onto the same config (e.g. knobs of a disabled
+    # branch); evaluate each distinct config once.
+    unique: list[StrategyConfig] = [center]
+    slot = {center: 0}
+    for _, _, _, cfg in lattice:
+        if cfg not in slot:
+            slot[cfg] = len(unique)
+            unique.append(cfg)
+
+    if checkpoint_every > 0 and workers <= 1:
+        trimmed = start_dt is not None and end_dt is not None
+        ref = CheckpointedReference(
+            dm,
+            center,
+            cost_cfg,
+            scoring_backtest_config(dm),
+            window=dm.window(start_dt, end_dt) if trimmed else None,
+            every=checkpoint_every,
+        )
+        scored = [ref.evaluate(cfg, start_dt, end_dt, dd_penalty=dd_penalty) for cfg in unique]
+    else:
+        scored = evaluate_batch(dm, unique, cost_cfg, start_dt, end_dt, dd_penalty=dd_penalty, workers=workers)
+    center_score = float(scored[0][0])
+
+    rows = []
+    for name, step, value, cfg in lattice:
+        sc, g, mdd = scored[slot[cfg]]
+        rows.append({"param": name, "step": step, "value": value, "score": sc, "cagr": g, "max_dd": mdd})
+    points = pd.DataFrame(rows, columns=["param", "step", "value", "score", "cagr", "max_dd"])
+
+    grad_rows = []
+    axis = points[points["param"] != "*joint"]
+    for name, g in axis.groupby("param", sort=False):
+        by_step = dict(zip(g["step"], g["score"]))
+        up, dn = by_step.get(1), by_step.get(-1)
+        if up is not None and dn is not None:
+            grad = (up - dn) / 2.0
+        elif up is not None:
+            grad = up - center_score
+        elif dn is not None:
+            grad = center_score - dn
+        else:
+            grad = float("nan")
+        sc = g["score"].to_numpy(dtype=float)
+        grad_rows.append(
+            {
+                "param": name,
+                "center_value": getattr(center, name),
+                "grad_per_step": float(grad),
+                "max_drop": float(center_score - np.min(sc)),
+                "mean_drop": float(center_score - np.mean(sc)),
+            }
+        )
+    gradients = pd.DataFrame(grad_rows, columns=["param", "center_value", "grad_per_step", "max_drop", "mean_drop"])
+    gradients = gradients.sort_values("max_drop", ascending=False, kind="mergesort").reset_index(drop=True)
+
+    nb = points["score"].to_numpy(dtype=float)
+    robustness = float(np.mean(nb >= center_score - float(tol))) if len(nb) else float("nan")
+
+    return SensitivityReport(
+        center=center,
+        center_score=center_score,
+        points=points,
+        gradients=gradients,
+        robustness=robustness,
+    )
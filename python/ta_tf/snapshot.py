@@ -0,0 +1,78 @@
+"""Snapshot / restore of a Step-1 run for incremental (e.g. nightly) updates.
+
+A snapshot is a gzip-compressed JSON file holding:
+- the trader state (cash, shares, position state, cooldown, logs)
+- the tail of the data manager (bars + indicator columns + EMA state) that is
+  needed to extend indicators and decisions to new bars
+
+Resuming = ``load_snapshot`` -> ``dm.append(new_bars)`` -> ``run_pending``.
+On tick-grid (integer) prices the result is identical to a full re-run.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from .config import BacktestConfig, CostConfig, StrategyConfig
+from .data_manager import OhlcvDataManager
+from .trader import TickerTraderStep1
+
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_tail_bars(trader: TickerTraderStep1) -> int:
+    """Trailing bars to keep so every later decision sees the same inputs."""
+    cfg = trader.strat_cfg
+    return int(trader.dm.history_bars() + max(1, int(cfg.confirm_days)) + 2)
+
+
+def save_snapshot(path: str | Path, trader: TickerTraderStep1) -> Path:
+    """Write the trader + data-manager tail to ``path`` (gzip JSON)."""
+    dm = trader.dm
+    tail = dm.tail(snapshot_tail_bars(trader))
+    shift = len(dm) - len(tail)
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "dm": tail.export_state(),
+        "trader": trader.export_state(index_shift=shift),
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+        json.dump(payload, f, separators=(",", ":"))
+    tmp.replace(path)
+    return path
+
+
+def load_snapshot(path: str | Path) -> TickerTraderStep1:
+    """Rebuild a trader (attached to the restored data-manager tail)."""
+    with gzip.open(Path(path), "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    if int(payload.get("version", 0)) != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {payload.get('version')}")
+
+    dm = OhlcvDataManager.from_state(payload["dm"])
+    d = payload["trader"]
+    trader = TickerTraderStep1(
+        dm=dm,
+        strat_cfg=StrategyConfig(**d["strat_cfg"]),
+        cost_cfg=CostConfig(**d["cost_cfg"]),
+        bt_cfg=BacktestConfig(**d["bt_cfg"]),
+    )
+    trader.restore_state(d)
+    return trader
+
+
+def resume(trader: TickerTraderStep1, new_bars: pd.DataFrame) -> int:
+    """Append ``new_bars`` to the trader's data manager and process them.
+
+    Bars at or before the last known timestamp are ignored, so re-sending an
+    overlapping window is harmless. Returns the number of bars stepped.
+    """
+    trader.dm.append(new_bars)
+    return trader.run_pending()
@@ -0,0 +1,206 @@
+"""Low-overhead runtime telemetry: latency histograms, counters, gauges.
+
+``LatencyHistogram`` is HDR-style: fixed log-linear buckets over integer
+nanoseconds (32 sub-buckets per power of two, so any recorded value is within
+~3% of its bucket), recorded with one ``bit_length`` and a list increment. No
+allocation per sample, memory is constant however long the process runs.
+
+``Telemetry`` groups named histograms, counters and gauges; ``snapshot()``
+returns a JSON-friendly dict (statistics of an empty histogram are ``None``,
+so snapshots stay strict JSON) and ``write_json`` / ``write_prometheus`` write it
+atomically (tmp file + rename) for a scraper (e.g. node_exporter's textfile
+collector). ``TelemetryExporter`` does that every ``interval_s`` from an
+asyncio task, with the file I/O in a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+_SUB_BITS = 5
+_SUB = 1 << _SUB_BITS  # sub-buckets per power of two
+_MAX_NS = (1 << 40) - 1  # ~18 minutes; larger values land in the last bucket
+_N_BUCKETS = (_MAX_NS.bit_length() - _SUB_BITS) * _SUB + _SUB
+
+
+def _bucket(v: int) -> int:
+    shift = v.bit_length() - _SUB_BITS - 1
+    if shift <= 0:
+        return v
+    return shift * _SUB + (v >> shift)
+
+
+def _bucket_bounds(i: int) -> tuple[int, int]:
+    """[low, high) in ns of bucket ``i``."""
+    if i < 2 * _SUB:
+        return i, i + 1
+    shift = i // _SUB - 1
+    low = (i - shift * _SUB) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram over nanoseconds."""
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        v = ns if 0 <= ns <= _MAX_NS else (0 if ns < 0 else _MAX_NS)
+        self.counts[_bucket(v)] += 1
+        if self.count == 0 or v < self.min_ns:
+            self.min_ns = v
+        if v > self.max_ns:
+            self.max_ns = v
+        self.count += 1
+        self.total_ns += v
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Value (ns) at or below which ``q`` percent of samples fall (bucket upper
+        edge); None without samples."""
+        if self.count == 0:
+            return None
+        rank = max(1, int(round(self.count * float(q) / 100.0)))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    return float(min(_bucket_bounds(i)[1] - 1, self.max_ns))
+        return float(self.max_ns)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        if other.count:
+            self.min_ns = other.min_ns if self.count == 0 else min(self.min_ns, other.min_ns)
+            self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def summary_us(self) -> dict:
+        """Count, mean, min/max and percentiles in microseconds, plus non-empty buckets
+        (statistics None while empty)."""
+        us = 1e-3
+        if self.count == 0:
+            return {"count": 0, **dict.fromkeys(("mean", "min", "max", "p50", "p90", "p99", "p999")), "buckets": []}
+        return {
+            "count": self.count,
+            "mean": self.total_ns / self.count * us,
+            "min": self.min_ns * us,
+            "max": self.max_ns * us,
+            "p50": self.percentile(50) * us,
+            "p90": self.percentile(90) * us,
+            "p99": self.percentile(99) * us,
+            "p999": self.percentile(99.9) * us,
+            # [upper edge (us), count]
+            "buckets": [[_bucket_bounds(i)[1] * us, c] for i, c in enumerate(self.counts) if c],
+        }
+
+
+class Telemetry:
+    """Named latency histograms, counters and gauges of one process."""
+
+    def __init__(self):
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.started = time.time()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = LatencyHistogram()
+        return h
+
+    def record(self, name: str, ns: int) -> None:
+        self.histogram(name).record(ns)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        return {
+            "time": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            "uptime_s": now - self.started,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "latency_us": {k: h.summary_us() for k, h in self.histograms.items()},
+        }
+
+    def write_json(self, path: str | Path, snap: Optional[dict] = None) -> Path:
+        # allow_nan=False: a bare NaN token is not JSON and breaks strict parsers
+        return _atomic_write(Path(path), json.dumps(snap or self.snapshot(), indent=1, allow_nan=False))
+
+    def write_prometheus(self, path: str | Path, snap: Optional[dict] = None, prefix: str = "ta_tf") -> Path:
+        """Prometheus text exposition: summaries in seconds, counters, gauges."""
+        snap = snap or self.snapshot()
+        lines = []
+        for name, v in snap["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {v}")
+        for name, v in snap["gauges"].items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {v}")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for stage, s in snap["latency_us"].items():
+            for q, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99"), ("0.999", "p999")):
+                v = f"{s[key] * 1e-6:.9g}" if s["count"] else "NaN"  # NaN is valid in the text format
+                lines.append(f'{prefix}_latency_seconds{{stage="{stage}",quantile="{q}"}} {v}')
+            total = s["mean"] * s["count"] * 1e-6 if s["count"] else 0.0
+            lines.append(f'{prefix}_latency_seconds_sum{{stage="{stage}"}} {total:.9g}')
+            lines.append(f'{prefix}_latency_seconds_count{{stage="{stage}"}} {s["count"]}')
+        return _atomic_write(Path(path), "\n".join(lines) + "\n")
+
+
+def _atomic_write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+class TelemetryExporter:
+    """Periodic snapshot export (``<path>.json`` and/or ``.prom``) from an asyncio task."""
+
+    def __init__(self, telemetry: Telemetry, json_path: Optional[str | Path] = None, prom_path: Optional[str | Path] = None, interval_s: float = 5.0):
+        self.telemetry = telemetry
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.interval_s = max(0.05, float(interval_s))
+        self.exports = 0
+
+    async def export(self) -> None:
+        snap = self.telemetry.snapshot()  # taken on the loop thread, written off it
+        if self.json_path:
+            await asyncio.to_thread(self.telemetry.write_json, self.json_path, snap)
+        if self.prom_path:
+            await asyncio.to_thread(self.telemetry.write_prometheus, self.prom_path, snap)
+        self.exports += 1
+
+    async def run(self) -> None:
+        """Export every ``interval_s`` until cancelled (one last export on cancel)."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval_s)
+                await self.export()
+        except asyncio.CancelledError:
+            await self.export()
+            raise
@@ -9,7 +9,7 @@ This is a direct conceptual port of the MATLAB `ticker_trader.step()` loop:
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import List, Optional, Tuple
 
@@ -18,7 +18,19 @@ import numpy as np
 from .config import BacktestConfig, CostConfig, StrategyConfig
 from .cost_model import KRXCostModel
 from .data_manager import OhlcvDataManager
-from .types import PrevContext, TradeEvent
+from .data_provider import BarWindow
+from .decision_codegen import compile_decision
+from .accounting import (
+    equity_value,
+    fill_flatten,
+    fill_flatten_krw,
+    fill_rebalance,
+    fill_rebalance_krw,
+    krw_borrow_costs,
+)
+from .event_jump import run_event_jump
+from .indicator_plan import required_indicators
+from .types import PrevContext, SignalTape, TapeEvent, TradeEvent
 
 
 def _is_finite(x: float) -> bool:
@@ -61,8 +73,11 @@ class TickerTraderStep1:
         strat_cfg: StrategyConfig,
         cost_cfg: CostConfig,
         bt_cfg: BacktestConfig,
+        record_tape: bool = False,
     ):
         self.dm = dm
+        # build only the indicators this config's decision reads (ta_tf.indicator_plan)
+        dm.require(required_indicators(strat_cfg))
         self.symbol = bt_cfg.symbol
         self.bt_cfg = bt_cfg
         self.strat_cfg = strat_cfg
@@ -72,8 +87,11 @@ class TickerTraderStep1:
         self.initial_capital = float(bt_cfg.initial_capital)
         self.initial_equity = float(bt_cfg.initial_equity)
 
-        # Cash + shares accounting (shares signed: +long, -short)
-        self.cash = float(self.initial_capital)
+        # Cash + shares accounting (shares signed: +long, -short); whole won in KRW mode
+        self._krw = str(bt_cfg.accounting).upper() == "KRW"
+        if self._krw:
+            self.initial_capital = int(round(self.initial_capital))
+        self.cash = self.initial_capital if self._krw else float(self.initial_capital)
         self.shares = int(0)
 
         self.equity = float(self.initial_equity)  # normalized by initial_capital
@@ -83,11 +101,30 @@ class TickerTraderStep1:
         self.equity_curve: List[Tuple[datetime, float]] = []
 
         self._short_borrow_daily = self.cost_model.short_borrow_daily_rate()
+        self._short_borrow_daily_exact = self.cost_model.short_borrow_daily_fraction()
         self._max_units = max(1, int(strat_cfg.max_units))
+        # Decision of this config, port of MATLAB ticker_trader.decide_target()
+        # (source: ta_tf.decision_codegen.decision_source).
+        self._decide = compile_decision(strat_cfg)
+
+        # First bar index not processed yet (for incremental re-runs).
+        self.next_bar = 0
+
+        # Optional cost-independent record of the run (see ta_tf.replay).
+        self.tape: Optional[SignalTape] = None
+        if record_tape:
+            self.tape = SignalTape(
+                symbol=self.symbol,
+                initial_capital=self.initial_capital,
+                initial_equity=self.initial_equity,
+                integer_krw=self._krw,
+                enforce_short_max_hold=bool(cost_cfg.enforce_short_max_hold),
+                short_max_hold_days=int(cost_cfg.short_max_hold_days),
+            )
 
     def _equity_value(self, price: float) -> float:
-        """Current equity in KRW given a valuation price."""
-        return float(self.cash + float(self.shares) * float(price))
+        """Current equity in KRW given a valuation price (exact int in KRW mode on the grid)."""
+        return equity_value(self.cash, self.shares, price)
 
     def _equity_norm(self, price: float) -> float:
         """Normalized equity (starts at initial_equity)."""
@@ -96,18 +133,49 @@ class TickerTraderStep1:
 
     # ---------- public API ----------
 
-    def run_full_backtest(self) -> None:
-        """Run full history in the data manager."""
+    def run_full_backtest(self, window: BarWindow | None = None, jump: bool = False, flat_start: bool = False) -> None:
+        """Run full history in the data manager.
+
+        If ``window`` is given, the simulation still starts at bar 0 (state and
+        warmup are path-dependent) but stops after ``window.stop - 1``; bars
+        past the window cannot affect anything inside it.
+
+        ``flat_start=True`` (with a window) starts flat at ``window.start``
+        instead: indicators still see the history before it, but no trading
+        happens there. Cheaper, not identical to the default.
+
+        ``jump=True`` only steps bars where the position can change and fills
+        the bars in between in bulk (see ta_tf.event_jump); same results.
+        """
+        start = int(window.start) if flat_start and window is not None else 0
+        if jump:
+            run_event_jump(self, window=window, start=start)
+            return
         n = len(self.dm)
+        stop = n - 1 if window is None else min(n - 1, int(window.stop))
         # we need t and t+1 opens, so stop at n-2
-        for t in range(0, max(0, n - 1)):
+        for t in range(start, max(start, stop)):
+            self.step(t)
+
+    def run_pending(self) -> int:
+        """Process every bar not yet stepped (e.g. after ``dm.append``).
+
+        Returns the number of bars processed. Together with
+        :meth:`export_state` / :meth:`restore_state` this gives the same
+        result as a full re-run over the extended history.
+        """
+        n = len(self.dm)
+        start = self.next_bar
+        for t in range(start, max(start, n - 1)):
             self.step(t)
+        return max(0, n - 1 - start)
 
     def step(self, t: int) -> None:
         """Process bar index t, consistent with MATLAB signature: step(tIdx)."""
         n = len(self.dm)
         if t < 2 or t > n - 2:
             return
+        self.next_bar = t + 1
 
         ts = self.dm.get_bar_timestamp(t)
         O, H, L, C = self.dm.get_ohlc(t)
@@ -138,7 +206,7 @@ class TickerTraderStep1:
             return
 
         # 5) Signal decision
-        target = self._decide_target(t, ctx)
+        target = self._decide(self, t, ctx)
 
         # 6) Apply target at Open(t)
         if target != self.state.pos:
@@ -152,9 +220,14 @@ class TickerTraderStep1:
 
         # 7) Daily short borrow interest (cash deduction) at end of bar.
         # Use current borrowed balance (abs(shares) * close) * rate/day_count.
+        if self.tape is not None:
+            self.tape.borrow_close.append(float(C))
         if self.shares < 0 and _is_finite(C):
-            borrow_cost = float(abs(self.shares)) * float(C) * float(self._short_borrow_daily)
-            self.cash -= borrow_cost
+            if self._krw:
+                self.cash -= int(krw_borrow_costs(abs(self.shares), [C], self._short_borrow_daily_exact)[0])
+            else:
+                borrow_cost = float(abs(self.shares)) * float(C) * float(self._short_borrow_daily)
+                self.cash -= borrow_cost
 
         # 8) Record equity according to valuation mode.
         if str(self.bt_cfg.valuation_mode).upper() == "CLOSE":
@@ -163,9 +236,62 @@ class TickerTraderStep1:
             P = self.dm.get_open(t + 1)
         self._append_equity(ts, valuation_price=P)
 
+    # ---------- snapshot / restore ----------
+
+    def export_state(self, index_shift: int = 0) -> dict:
+        """JSON-friendly trader state.
+
+        ``index_shift`` is subtracted from bar indices (entry, cooldown,
+        next bar) when the state is paired with ``dm.tail(...)``.
+        """
+        st = asdict(self.state)
+        st["entry_time"] = st["entry_time"].isoformat() if st["entry_time"] is not None else None
+        if st["entry_index"] is not None:
+            st["entry_index"] = int(st["entry_index"]) - int(index_shift)
+        st["cooldown_until_index"] = int(st["cooldown_until_index"]) - int(index_shift)
+
+        trades = []
+        for ev in self.trade_log:
+            d = asdict(ev)
+            d["timestamp"] = ev.timestamp.isoformat()
+            trades.append(d)
+
+        return {
+            "symbol": self.symbol,
+            "strat_cfg": asdict(self.strat_cfg),
+            "cost_cfg": asdict(self.cost_model.cfg),
+            "bt_cfg": asdict(self.bt_cfg),
+            "cash": self.cash if self._krw else float(self.cash),
+            "shares": int(self.shares),
+            "equity": float(self.equity),
+            "next_bar": int(self.next_bar) - int(index_shift),
+            "state": st,
+            "trade_log": trades,
+            "equity_curve": [[ts.isoformat(), float(v)] for ts, v in self.equity_curve],
+        }
+
+    def restore_state(self, d: dict) -> None:
+        """Load state produced by :meth:`export_state` (configs are not changed)."""
+        st = dict(d["state"])
+        st["entry_time"] = datetime.fromisoformat(st["entry_time"]) if st["entry_time"] is not None else None
+        self.state = _PositionState(**st)
+        self.cash = int(d["cash"]) if self._krw else float(d["cash"])
+        self.shares = int(d["shares"])
+        self.equity = float(d["equity"])
+        self.next_bar = int(d["next_bar"])
+        self.trade_log = [TradeEvent(**{**x, "timestamp": datetime.fromisoformat(x["timestamp"])}) for x in d["trade_log"]]
+        self.equity_curve = [(datetime.fromisoformat(ts), float(v)) for ts, v in d["equity_curve"]]
+
     # ---------- internal helpers ----------
 
     def _append_equity(self, ts: datetime, valuation_price: float) -> None:
+        if self.tape is not None:
+            tp = self.tape
+            tp.timestamps.append(ts)
+            tp.valuation_price.append(float(valuation_price))
+            # bars that exit before the borrow step accrue nothing
+            if len(tp.borrow_close) < len(tp.timestamps):
+                tp.borrow_close.append(float("nan"))
         # Update normalized equity field for compatibility
         self.equity = self._equity_norm(valuation_price)
         self.equity_curve.append((ts, float(self.equity)))
@@ -245,111 +371,6 @@ class TickerTraderStep1:
             return dd >= cfg.give_up_drawdown_pct
         return False
 
-    def _decide_target(self, t: int, ctx: PrevContext) -> int:
-        # Port of MATLAB ticker_trader.decide_target()
-        cfg = self.strat_cfg
-
-        # Cooldown block on new entries
-        if self.state.pos == 0 and t <= self.state.cooldown_until_index:
-            return 0
-
-        week = ctx.sma_week_prev
-        fast = ctx.sma_fast_prev
-        slow = ctx.sma_slow_prev
-        trend = ctx.long_term_trend_prev
-        atr = ctx.atr_prev
-        close_prev = ctx.close_prev
-
-        if not (_is_finite(week) and _is_finite(fast) and _is_finite(slow)):
-            return 0
-
-        long_stack = (week > fast) and (fast > slow)
-        short_stack = (slow > fast) and (fast > week)
-
-        sep_long = (week - fast)   # >0 helps long
-        sep_short = (fast - week)  # >0 helps short
-        den = max(abs(fast), np.finfo(float).tiny)
-
-        if cfg.use_atr_filter and _is_finite(atr) and atr > 0:
-            enter_long_ok = sep_long >= (cfg.atr_enter_k * atr)
-            exit_long_ok = sep_long <= (cfg.atr_exit_k * atr)
-            enter_short_ok = sep_short >= (cfg.atr_enter_k * atr)
-            exit_short_ok = sep_short <= (cfg.atr_exit_k * atr)
-        else:
-            enter_long_ok = (sep_long / den) >= cfg.spread_enter_pct
-            exit_long_ok = (sep_long / den) <= cfg.spread_exit_pct
-            enter_short_ok = (sep_short / den) >= cfg.spread_enter_pct
-            exit_short_ok = (sep_short / den) <= cfg.spread_exit_pct
-
-        # trend filters
-        trend_long_ok = (trend == 1) if cfg.use_long_trend_filter else True
-        trend_short_ok = (trend == -1) if cfg.use_short_trend_filter else True
-
-        macd_bull, macd_bear = self._macd_state(ctx)
-        macd_long_ok = macd_bull if cfg.use_macd_regime_filter else True
-        macd_short_ok = macd_bear if cfg.use_macd_regime_filter else True
-
-        # confirmation: MATLAB calls check_confirm_*(t-1, confN)
-        conf_n = max(1, int(cfg.confirm_days))
-        long_conf = self._check_confirm_long(t - 1, conf_n)
-        short_conf = self._check_confirm_short(t - 1, conf_n)
-
-        # prev-close gating (optional)
-        prev_close_long_ok = True
-        prev_close_short_ok = True
-        if cfg.use_prev_close_filter and _is_finite(close_prev):
-            ref_ma = week if cfg.prev_close_filter_ref == "week" else fast
-            if _is_finite(ref_ma):
-                prev_close_long_ok = close_prev >= ref_ma
-                prev_close_short_ok = close_prev <= ref_ma
-
-        long_entry = long_stack and enter_long_ok and trend_long_ok and macd_long_ok and long_conf and prev_close_long_ok
-        short_entry = short_stack and enter_short_ok and trend_short_ok and macd_short_ok and short_conf and cfg.enable_short and prev_close_short_ok
-
-        # exits: MATLAB uses cross of fast vs week, not full stack break
-        long_exit_cross = (fast > week)
-        short_exit_cross = (week > fast)
-
-        held = 0
-        if self.state.pos != 0 and self.state.entry_index is not None:
-            held = t - self.state.entry_index
-        can_exit = held >= max(0, int(cfg.min_hold_bars))
-
-        macd_exit_long = bool(cfg.use_macd_exit and can_exit and macd_bear)
-        macd_exit_short = bool(cfg.use_macd_exit and can_exit and macd_bull)
-
-        prev_close_exit_long = False
-        prev_close_exit_short = False
-        if cfg.use_prev_close_filter and can_exit and _is_finite(close_prev):
-            ref_ma = week if cfg.prev_close_filter_ref == "week" else fast
-            if _is_finite(ref_ma):
-                prev_close_exit_long = close_prev < ref_ma
-                prev_close_exit_short = close_prev > ref_ma
-
-        if self.state.pos == 0:
-            if long_entry:
-                return 1
-            if short_entry:
-                return -1
-            return 0
-
-        if self.state.pos == 1:
-            if can_exit and (long_exit_cross or exit_long_ok or macd_exit_long or prev_close_exit_long):
-                return 0
-            return 1
-
-        # pos == -1
-        if can_exit and (short_exit_cross or exit_short_ok or macd_exit_short or prev_close_exit_short):
-            return 0
-        return -1
-
-    def _macd_state(self, ctx: PrevContext) -> Tuple[bool, bool]:
-        """Return (bull, bear) regime flags."""
-        h = ctx.macd_hist_prev
-        if not _is_finite(h):
-            return False, False
-        return h > 0, h < 0
-
     def _check_confirm_long(self, p: int, conf_n: int) -> bool:
         """Match MATLAB check_confirm_long(p, confN).
 
@@ -357,11 +378,13 @@ class TickerTraderStep1:
         """
         if p - conf_n + 1 < 0:
             return False
-        df = self.dm.df
+        week = self.dm.column("smaWeek")
+        fast = self.dm.column("smaFast")
+        slow = self.dm.column("smaSlow")
         for i in range(p - conf_n + 1, p + 1):
-            w = float(df["smaWeek"].iloc[i])
-            f = float(df["smaFast"].iloc[i])
-            s = float(df["smaSlow"].iloc[i])
+            w = float(week[i])
+            f = float(fast[i])
+            s = float(slow[i])
             if not (_is_finite(w) and _is_finite(f) and _is_finite(s)):
                 return False
             if not (w > f and f > s):
@@ -371,11 +394,13 @@ class TickerTraderStep1:
     def _check_confirm_short(self, p: int, conf_n: int) -> bool:
         if p - conf_n + 1 < 0:
             return False
-        df = self.dm.df
+        week = self.dm.column("smaWeek")
+        fast = self.dm.column("smaFast")
+        slow = self.dm.column("smaSlow")
         for i in range(p - conf_n + 1, p + 1):
-            w = float(df["smaWeek"].iloc[i])
-            f = float(df["smaFast"].iloc[i])
-            s = float(df["smaSlow"].iloc[i])
+            w = float(week[i])
+            f = float(fast[i])
+            s = float(slow[i])
             if not (_is_finite(w) and _is_finite(f) and _is_finite(s)):
                 return False
             if not (s > f and f > w):
@@ -461,29 +486,19 @@ class TickerTraderStep1:
             frac = max(0.0, float(delta_frac))
         frac = max(0.0, min(1.0, frac))
 
-        eq_val = self._equity_value(price)
-        alloc = eq_val * frac
-        if not _is_finite(price) or price <= 0 or alloc <= 0:
-            return
+        if self.tape is not None:
+            self.tape.events.append(
+                TapeEvent(
+                    bar=len(self.equity_curve), kind="REBALANCE", side=side_u, price=float(price), reason=reason,
+                    target_pos=int(target_pos), frac=frac, units_after=int(self.state.units),
+                )
+            )
 
-        qty_abs = int(alloc // float(price))
-        if qty_abs <= 0:
+        fill = (fill_rebalance_krw if self._krw else fill_rebalance)(self.cash, self.shares, side_u, price, frac, rates)
+        if fill is None:
             return
-
-        notional = float(qty_abs) * float(price)
-        fee = float(rates.fee_rate) * notional
-        tax = float(rates.tax_rate) * notional
-
-        if side_u == "BUY":
-            # Buy shares (either long entry, or short cover add if ever used)
-            self.cash -= (notional + fee + tax)
-            self.shares += qty_abs
-            qty_signed = qty_abs
-        else:
-            # Sell shares (either long exit add? or short entry/add)
-            self.cash += (notional - fee - tax)
-            self.shares -= qty_abs
-            qty_signed = -qty_abs
+        self.cash = fill.cash
+        self.shares = fill.shares
 
         # Keep state.pos consistent with shares sign
         self.state.pos = int(np.sign(self.shares)) if self.shares != 0 else int(target_pos)
@@ -494,39 +509,31 @@ class TickerTraderStep1:
                 symbol=self.symbol,
                 side=side_u,
                 reason=reason,
-                price=float(price),
+                price=float(fill.price),
                 position_after=int(self.state.pos),
                 units_after=int(self.state.units),
-                fee_paid=float(fee),
-                tax_paid=float(tax),
-                qty=int(qty_signed),
-                notional=float(notional),
+                fee_paid=float(fill.fee),
+                tax_paid=float(fill.tax),
+                qty=int(fill.qty),
+                notional=float(fill.notional),
                 cash_after=float(self.cash),
-                equity_after=float(self._equity_norm(price)),
+                equity_after=float(self._equity_norm(fill.price)),
             )
         )
 
     def _execute_flatten(self, ts: datetime, side: str, price: float, reason: str) -> None:
         """Close any open position at a given price."""
-        if self.shares == 0:
-            return
         side_u = side.upper()
-        rates = self.cost_model.transaction_cost_rates(side_u)
-
-        qty_abs = abs(int(self.shares))
-        notional = float(qty_abs) * float(price)
-        fee = float(rates.fee_rate) * notional
-        tax = float(rates.tax_rate) * notional
-
-        if side_u == "SELL":
-            # sell long holdings
-            self.cash += (notional - fee - tax)
-            qty_signed = -qty_abs
-        else:
-            # buy to cover short
-            self.cash -= (notional + fee + tax)
-            qty_signed = qty_abs
+        if self.tape is not None:
+            self.tape.events.append(
+                TapeEvent(bar=len(self.equity_curve), kind="FLATTEN", side=side_u, price=float(price), reason=reason)
+            )
 
+        flatten = fill_flatten_krw if self._krw else fill_flatten
+        fill = flatten(self.cash, self.shares, side_u, price, self.cost_model.transaction_cost_rates(side_u))
+        if fill is None:
+            return
+        self.cash = fill.cash
         self.shares = 0
 
         self.trade_log.append(
@@ -535,14 +542,14 @@ class TickerTraderStep1:
                 symbol=self.symbol,
                 side=side_u,
                 reason=reason,
-                price=float(price),
+                price=float(fill.price),
                 position_after=0,
                 units_after=0,
-                fee_paid=float(fee),
-                tax_paid=float(tax),
-                qty=int(qty_signed),
-                notional=float(notional),
+                fee_paid=float(fill.fee),
+                tax_paid=float(fill.tax),
+                qty=int(fill.qty),
+                notional=float(fill.notional),
                 cash_after=float(self.cash),
-                equity_after=float(self._equity_norm(price)),
+                equity_after=float(self._equity_norm(fill.price)),
             )
         )
@@ -5,7 +5,7 @@ The guiding principle is to keep the runtime objects small and explicit.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 
@@ -64,3 +64,45 @@ class TradeEvent:
     notional: float = 0.0
     cash_after: float = 0.0
     equity_after: float = 0.0  # normalized by initial_capital
+
+
+@dataclass(frozen=True)
+class TapeEvent:
+    """An execution request recorded before accounting (cost-independent).
+
+    ``bar`` is the position in the tape's per-bar arrays; events are applied
+    before that bar's borrow accrual and valuation.
+    """
+
+    bar: int
+    kind: str  # 'REBALANCE' / 'FLATTEN'
+    side: str  # 'BUY'/'SELL'
+    price: float
+    reason: str
+    target_pos: int = 0
+    frac: float = 1.0
+    units_after: int = 0
+
+
+@dataclass
+class SignalTape:
+    """Cost-independent record of one Step-1 run.
+
+    The position path and stop exits depend only on prices, indicators and
+    StrategyConfig; the tape stores them so accounting can be replayed under
+    other CostConfigs (see ``ta_tf.replay``).
+    """
+
+    symbol: str
+    initial_capital: float
+    initial_equity: float
+    timestamps: list = field(default_factory=list)
+    valuation_price: list = field(default_factory=list)
+    # Close used for short borrow accrual on that bar; NaN where the bar
+    # exits early (stop / forced cover / invalid context) and accrues nothing.
+    borrow_close: list = field(default_factory=list)
+    events: list = field(default_factory=list)
+    integer_krw: bool = False  # BacktestConfig.accounting == "KRW"
+    # Cost settings that feed back into the signal path (forced cover).
+    enforce_short_max_hold: bool = False
+    short_max_hold_days: int = 90
@@ -0,0 +1,193 @@
+"""Universe scan: run the Step-1 trader over every ticker of a panel.
+
+The panel is read once and split per ticker. Tickers are fed to a process
+pool with a bounded number of in-flight tasks, so the next symbols' frames are
+already queued while the current ones simulate.
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+import pandas as pd
+
+from .backtest import run_step1
+from .config import BacktestConfig, CostConfig, IndicatorConfig, StrategyConfig
+from .cross_section import CrossSectionEngine
+from .data_provider import OhlcvFrame, resolve_window
+from .optimize import _score_equity
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """Ranked per-ticker summary plus optional equity curves."""
+
+    summary: pd.DataFrame
+    curves: dict[str, pd.Series]
+
+
+def load_params_file(path: str | Path) -> StrategyConfig | dict[str, StrategyConfig]:
+    """Load one StrategyConfig or a per-ticker mapping from JSON.
+
+    Accepted layouts:
+    - ``{"spread_enter_pct": ...}`` (``best_params.json``) or MATLAB ParamsJson keys
+    - ``{"005930": {...}, "000660": {...}}`` (per-ticker)
+    """
+    d = json.loads(Path(path).read_text(encoding="utf-8"))
+    if d and all(isinstance(v, dict) for v in d.values()):
+        return {str(k): _strategy_from_dict(v) for k, v in d.items()}
+    return _strategy_from_dict(d)
+
+
+def _strategy_from_dict(d: dict) -> StrategyConfig:
+    names = {f.name for f in fields(StrategyConfig)}
+    if d and all(k in names for k in d):
+        return StrategyConfig(**d)
+    return StrategyConfig.from_params_dict(d)
+
+
+def _scan_one(
+    frame: OhlcvFrame,
+    ind_cfg: IndicatorConfig,
+    strat_cfg: StrategyConfig,
+    cost_cfg: CostConfig,
+    start_dt: Optional[pd.Timestamp],
+    end_dt: Optional[pd.Timestamp],
+    dd_penalty: float,
+    keep_curve: bool,
+) -> tuple[dict, Optional[pd.Series]]:
+    res = run_step1(frame, ind_cfg, strat_cfg, cost_cfg, start_dt=start_dt, end_dt=end_dt)
+    return _summary_row(frame.symbol, res.equity, len(res.trades), dd_penalty), (res.equity if keep_curve else None)
+
+
+def _summary_row(symbol: str, eq: pd.Series, n_trades: int, dd_penalty: float) -> dict:
+    score, g, mdd = _score_equity(eq, dd_penalty=dd_penalty)
+    return {
+        "symbol": symbol,
+        "score": score,
+        "cagr": g,
+        "max_dd": mdd,
+        "final_equity": float(eq.iloc[-1]) if len(eq) else float("nan"),
+        "n_trades": int(n_trades),
+        "n_bars": int(len(eq)),
+    }
+
+
+def _config_for(strat_cfg: StrategyConfig | Mapping[str, StrategyConfig], symbol: str) -> Optional[StrategyConfig]:
+    if isinstance(strat_cfg, StrategyConfig):
+        return strat_cfg
+    return strat_cfg.get(symbol) or strat_cfg.get(symbol.lstrip("0"))
+
+
+SUMMARY_COLUMNS = ["symbol", "score", "cagr", "max_dd", "final_equity", "n_trades", "n_bars"]
+
+
+def _rank(rows: list[dict]) -> pd.DataFrame:
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values("score", ascending=False, kind="mergesort")
+    summary.insert(0, "rank", range(1, len(summary) + 1))
+    return summary.reset_index(drop=True)
+
+
+def scan_universe(
+    frames: Iterable[OhlcvFrame],
+    strat_cfg: StrategyConfig | Mapping[str, StrategyConfig] = StrategyConfig(),
+    ind_cfg: IndicatorConfig = IndicatorConfig(),
+    cost_cfg: CostConfig = CostConfig(),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    dd_penalty: float = 0.5,
+    workers: int = 1,
+    prefetch: int = 2,
+    keep_curves: bool = False,
+) -> ScanResult:
+    """Run Step-1 on every frame and rank tickers by score (best first).
+
+    ``strat_cfg`` may be a mapping ``symbol -> StrategyConfig``; tickers not in
+    the mapping are skipped. ``frames`` may be a lazy iterator: at most
+    ``workers + prefetch`` frames are materialized at any time.
+    """
+    start_dt = pd.to_datetime(start) if start else None
+    end_dt = pd.to_datetime(end) if end else None
+
+    def _jobs():
+        for fr in frames:
+            cfg = _config_for(strat_cfg, fr.symbol)
+            if cfg is None or len(fr.df) == 0:
+                continue
+            yield (fr, ind_cfg, cfg, cost_cfg, start_dt, end_dt, float(dd_penalty), bool(keep_curves))
+
+    rows: list[dict] = []
+    curves: dict[str, pd.Series] = {}
+
+    def _collect(out: tuple[dict, Optional[pd.Series]]) -> None:
+        row, eq = out
+        rows.append(row)
+        if eq is not None:
+            curves[row["symbol"]] = eq
+
+    if int(workers) <= 1:
+        for job in _jobs():
+            _collect(_scan_one(*job))
+    else:
+        max_in_flight = int(workers) + max(0, int(prefetch))
+        with ProcessPoolExecutor(max_workers=int(workers)) as ex:
+            pending = set()
+            for job in _jobs():
+                pending.add(ex.submit(_scan_one, *job))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        _collect(fut.result())
+            for fut in pending:
+                _collect(fut.result())
+
+    return ScanResult(summary=_rank(rows), curves=curves)
+
+
+def scan_universe_cross(
+    frames: Iterable[OhlcvFrame],
+    strat_cfg: StrategyConfig | Mapping[str, StrategyConfig] = StrategyConfig(),
+    ind_cfg: IndicatorConfig = IndicatorConfig(),
+    cost_cfg: CostConfig = CostConfig(),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    dd_penalty: float = 0.5,
+    keep_curves: bool = False,
+) -> tuple[ScanResult, CrossSectionEngine]:
+    """``scan_universe`` on one ``CrossSectionEngine`` (same summary, one process).
+
+    Also returns the engine, for ``portfolio_equity`` and the per-symbol logs.
+    """
+    start_dt = pd.to_datetime(start) if start else None
+    end_dt = pd.to_datetime(end) if end else None
+    cfgs: dict[str, StrategyConfig] = {}
+    kept: list[OhlcvFrame] = []
+    for fr in frames:
+        cfg = _config_for(strat_cfg, fr.symbol)
+        if cfg is not None and len(fr.df):
+            cfgs[fr.symbol] = cfg
+            kept.append(fr)
+
+    bt_cfg = BacktestConfig(initial_capital=1_000_000_000.0, valuation_mode="CLOSE", initial_equity=1.0)
+    eng = CrossSectionEngine.from_frames(kept, cfgs, ind_cfg, cost_cfg, bt_cfg)
+    trimmed = start_dt is not None and end_dt is not None
+    eng.run(end_dt if trimmed else None)
+
+    rows: list[dict] = []
+    curves: dict[str, pd.Series] = {}
+    for j, sym in enumerate(eng.symbols):
+        eq = pd.DataFrame(eng.equity_curve(j), columns=["Date", "Equity"]).set_index("Date")["Equity"]
+        log = eng.trade_log(j)
+        n_trades = len(log)
+        if trimmed:
+            eq = eq.iloc[resolve_window(eq.index, start_dt, end_dt).as_slice()]
+            if log:
+                n_trades = len(resolve_window(pd.DatetimeIndex([pd.Timestamp(x.timestamp) for x in log]), start_dt, end_dt))
+        rows.append(_summary_row(sym, eq, n_trades, dd_penalty))
+        if keep_curves:
+            curves[sym] = eq
+    return ScanResult(summary=_rank(rows), curves=curves), eng